@@ -1,9 +1,10 @@
 import abc
 import logging
+from contextlib import contextmanager
 from enum import Enum
-from typing import List, Tuple, Union, Dict, Optional
-from nempy.user_data import AccountData
-from nempy.sym.constants import BlockchainStatuses, Fees, TransactionStatus
+from typing import List, Tuple, Union, Dict, Optional, Iterator
+from nempy.user_data import AccountData, SigningSession
+from nempy.sym.constants import BlockchainStatuses, Fees, TransactionStatus, TransactionMetrics
 
 from .sym import api as sym
 from .sym import network
@@ -76,8 +77,47 @@ class XYMEngine(NEMEngine):
         self.node_selector.network_type = account.network_type
         self.transaction = sym.Transaction()
         self.timing = self.transaction.timing
+        self.session: Optional[SigningSession] = None
         super().__init__(self.node_selector.url, account)
 
+    def unlock(self, password: str, idle_timeout: Optional[float] = 300) -> SigningSession:
+        """
+        Decrypts the account once for subsequent sends, which then do not need the password
+
+        Parameters
+        ----------
+        password
+            Password for decrypting secret account data
+        idle_timeout
+            Seconds without sending after which the account is locked again, None - never
+        Returns
+        -------
+        SigningSession
+            The session used for signing
+        Raises
+        ------
+        ValueError
+            `DecoderStatus.WRONG_PASS` if the account cannot be decrypted with the password
+        """
+        self.lock()
+        self.session = SigningSession(self.account, password, idle_timeout)
+        return self.session
+
+    def lock(self):
+        """Wipes the keys of the signing session"""
+        if self.session is not None:
+            self.session.wipe()
+            self.session = None
+
+    @contextmanager
+    def signing_session(self, password: str) -> Iterator[SigningSession]:
+        """The unlocked session or, if the account is locked, a session for one call that is wiped after it"""
+        if self.session is not None and self.session.is_active():
+            yield self.session
+            return
+        with SigningSession(self.account, password, idle_timeout=None) as session:
+            yield session
+
     def send_tokens(
         self,
         recipient_address: str,
@@ -133,7 +173,7 @@ class XYMEngine(NEMEngine):
 
         Example:
         ```py
-        from nempy.user_data import AccountData
+        from nempy.user_data import AccountData, SigningSession
         from nempy.engine import XYMEngine
         from nempy.sym.network import NetworkType
         from nempy.sym.constants import Fees
@@ -151,33 +191,254 @@ class XYMEngine(NEMEngine):
         print(status.name, status.value)
         ```
         """
-        recipient_address = recipient_address.replace("-", "")
-        mosaics = [
-            sym.Mosaic(mosaic_id=mosaic[0], amount=mosaic[1]) for mosaic in mosaics
-        ]
-        if is_encrypted:
-            address_info = network.get_accounts_info(address=recipient_address)
-            if address_info is None:
-                return None, EngineStatusCode.INVALID_ACCOUNT_INFO
-            public_key = address_info["account"]["publicKey"]
-            message = sym.EncryptMessage(
-                message, self.account.decrypt(password).private_key, public_key
-            )
-        else:
-            message = sym.PlainMessage(message)
-        entity_hash, payload = self.transaction.create(
-            pr_key=self.account.decrypt(password).private_key,
-            recipient_address=recipient_address,
-            mosaics=mosaics,
-            message=message,
-            deadline=deadline,
-            fee_type=fee_type,
-        )
+        signed = self.sign_tokens(recipient_address, mosaics, message, is_encrypted, password, fee_type, deadline)
+        if signed is None:
+            return None, EngineStatusCode.INVALID_ACCOUNT_INFO
+        entity_hash, payload = signed
         is_sent = network.send_transaction(payload)
         if is_sent:
             return entity_hash, EngineStatusCode.ACCEPTED
         return None, EngineStatusCode.ANNOUNCE_ERROR
 
+    def sign_tokens(
+        self,
+        recipient_address: str,
+        mosaics: List[Tuple[str, float]],
+        message: Union[str, bytes] = "",
+        is_encrypted=False,
+        password: str = "",
+        fee_type: Fees = Fees.SLOWEST,
+        deadline: Optional[Dict[str, float]] = None,
+    ) -> Optional[Tuple[str, bytes]]:
+        """
+        Signs the transfer of `send_tokens` without announcing it, the parameters are the same
+
+        Returns
+        -------
+        A hash of the transaction and the announce payload,
+        None if the public key of the recipient of an encrypted message is unknown
+        """
+        with self.signing_session(password) as session:
+            recipient_address = recipient_address.replace("-", "")
+            mosaics = [
+                sym.Mosaic(mosaic_id=mosaic[0], amount=mosaic[1]) for mosaic in mosaics
+            ]
+            if is_encrypted:
+                public_key = network.public_keys.lookup(recipient_address)
+                if public_key is None:
+                    return None
+                message = sym.EncryptMessage(
+                    message, session.private_key, public_key
+                )
+            else:
+                message = sym.PlainMessage(message)
+            return self.transaction.create(
+                pr_key=session.key_pair,
+                recipient_address=recipient_address,
+                mosaics=mosaics,
+                message=message,
+                deadline=deadline,
+                fee_type=fee_type,
+            )
+
+    def send_payouts(
+        self,
+        payouts: List[Tuple[str, List[Tuple[str, float]]]],
+        message: Union[str, bytes] = "",
+        password: str = "",
+        fee_type: Fees = Fees.SLOWEST,
+        deadline: Optional[Dict[str, float]] = None,
+    ) -> List[Tuple[Optional[str], EngineStatusCode]]:
+        """
+        Sends funds to many recipients, packing the transfers into aggregate complete transactions
+        with up to `maxTransactionsPerAggregate` (100 by default) transfers each
+
+        Parameters
+        ----------
+        payouts
+            Pairs of the recipient address and its mosaics, for example:
+        ```py
+        [
+            ("TDPFLBK4NSCKUBGAZDWQWCUFNJOJB33Y5R5AWPQ", [("@symbol.xym", 0.1)]),
+            ("TBRLISEH5QYAKK76EFIGHWQE4DHDYOJAWNYKZBA", [("@symbol.xym", 0.2)])
+        ]
+        ```
+        message
+            Plain message for each transfer
+        password
+            Password for decrypting secret account data
+        fee_type
+            Fee type of each aggregate
+        deadline
+            Deadline of each aggregate, see `send_tokens`
+        Returns
+        -------
+        List[Tuple[Optional[str], EngineStatusCode]]
+            A hash of each aggregate or None and its status
+        """
+        resolved = {}
+        specs = []
+        for recipient_address, mosaics in payouts:
+            specs.append({
+                "recipient_address": recipient_address,
+                "mosaics": self.resolve_mosaics(mosaics, resolved),
+                "message": sym.PlainMessage(message),
+            })
+        results = []
+        with self.signing_session(password) as session:
+            for entity_hash, payload in self.transaction.create_batches(
+                pr_key=session.key_pair,
+                specs=specs,
+                fee_type=fee_type,
+                deadline=deadline,
+            ):
+                if network.send_transaction(payload):
+                    results.append((entity_hash, EngineStatusCode.ACCEPTED))
+                else:
+                    results.append((None, EngineStatusCode.ANNOUNCE_ERROR))
+        return results
+
+    def send_encrypted(
+        self,
+        recipients: List[Tuple[str, List[Tuple[str, float]]]],
+        message: Union[str, bytes],
+        password: str = "",
+        fee_type: Fees = Fees.SLOWEST,
+        deadline: Optional[Dict[str, float]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[Tuple[Optional[str], EngineStatusCode]]:
+        """
+        Sends one encrypted message to many recipients with a separate transfer for each.
+        Public keys are prefetched with bulk requests, messages are encrypted and transfers are signed
+        in pools of processes
+
+        Parameters
+        ----------
+        recipients
+            Pairs of the recipient address and its mosaics, see `send_payouts`
+        message
+            Message encrypted for each recipient
+        password
+            Password for decrypting secret account data
+        fee_type
+            Fee type of each transfer
+        deadline
+            Deadline of each transfer, see `send_tokens`
+        max_workers
+            Number of processes, by default the number of processors
+        Returns
+        -------
+        List[Tuple[Optional[str], EngineStatusCode]]
+            A hash of each transfer or None and its status in the order of `recipients`
+        """
+        with self.signing_session(password) as session:
+            recipients = [(address.replace("-", ""), mosaics) for address, mosaics in recipients]
+            network.public_keys.prefetch(address for address, _ in recipients)
+            results: List[Tuple[Optional[str], EngineStatusCode]] = [
+                (None, EngineStatusCode.INVALID_ACCOUNT_INFO)
+            ] * len(recipients)
+            known = [i for i, (address, _) in enumerate(recipients) if network.public_keys.get(address) is not None]
+            if not known:
+                return results
+            messages = sym.EncryptMessage.many(
+                message,
+                session.private_key,
+                [network.public_keys.get(recipients[i][0]) for i in known],
+                max_workers,
+            )
+            resolved = {}
+            specs = [
+                {
+                    "recipient_address": recipients[i][0],
+                    "mosaics": self.resolve_mosaics(recipients[i][1], resolved),
+                    "message": encrypted_message,
+                    "fee_type": fee_type,
+                    "deadline": deadline,
+                }
+                for i, encrypted_message in zip(known, messages)
+            ]
+            signed = self.transaction.create_many(session.private_key, specs, max_workers)
+            for i, (entity_hash, payload) in zip(known, signed):
+                if network.send_transaction(payload):
+                    results[i] = (entity_hash, EngineStatusCode.ACCEPTED)
+                else:
+                    results[i] = (None, EngineStatusCode.ANNOUNCE_ERROR)
+        return results
+
+    @staticmethod
+    def resolve_mosaics(mosaics: List[Tuple[str, float]], resolved: Dict[str, int]) -> List[sym.Mosaic]:
+        """Builds mosaics, aliases and divisibility are resolved once per mosaic ID through `resolved`"""
+        result = []
+        for mosaic_id, amount in mosaics:
+            if mosaic_id not in resolved:
+                resolved[mosaic_id] = sym.Mosaic(mosaic_id=mosaic_id, amount=0)[0]
+            result.append(sym.Mosaic(mosaic_id=hex(resolved[mosaic_id])[2:].upper().zfill(16), amount=amount))
+        return result
+
+    def sweep(
+        self,
+        deposits: List[AccountData],
+        password: str = "",
+        recipient_address: Optional[str] = None,
+        mosaic_ids: Optional[List[str]] = None,
+        fee_type: Fees = Fees.SLOWEST,
+        deadline: Optional[Dict[str, float]] = None,
+    ) -> List[Tuple[Optional[str], EngineStatusCode]]:
+        """
+        Moves the whole balances of the deposit accounts to one address with aggregate complete transactions.
+        Fees are paid by the engine account, deposit accounts cosign locally, up to 25 accounts per aggregate
+
+        Parameters
+        ----------
+        deposits
+            Unlocked (decrypted) deposit accounts
+        password
+            Password for decrypting secret data of the engine account that pays fees
+        recipient_address
+            Address receiving the funds, by default the engine account
+        mosaic_ids
+            IDs of the swept mosaics, by default all mosaics of the accounts
+        fee_type
+            Fee type of each aggregate
+        deadline
+            Deadline of each aggregate, see `send_tokens`
+        Returns
+        -------
+        List[Tuple[Optional[str], EngineStatusCode]]
+            A hash of each aggregate or None and its status
+        """
+        if any(deposit.is_encrypted() for deposit in deposits):
+            raise ValueError("Deposit accounts must be decrypted")
+        recipient_address = (recipient_address or self.account.address).replace("-", "")
+        keys = {deposit.address: deposit.private_key for deposit in deposits}
+        # balances of all accounts are read with bulk requests
+        infos = network.get_accounts_infos(keys.keys())
+        specs = []
+        for address, pr_key in keys.items():
+            if address == recipient_address or address not in infos:
+                continue
+            mosaics = [
+                (int(mosaic["id"], 16), int(mosaic["amount"]))
+                for mosaic in infos[address]["account"]["mosaics"]
+                if int(mosaic["amount"]) > 0 and (mosaic_ids is None or mosaic["id"] in mosaic_ids)
+            ]
+            if mosaics:
+                specs.append({"recipient_address": recipient_address, "mosaics": mosaics, "signer_pr_key": pr_key})
+        results = []
+        with self.signing_session(password) as session:
+            for entity_hash, payload in self.transaction.create_batches(
+                pr_key=session.key_pair,
+                specs=specs,
+                fee_type=fee_type,
+                deadline=deadline,
+                batch_size=TransactionMetrics.MAX_COSIGNATURES_PER_AGGREGATE,
+            ):
+                if network.send_transaction(payload):
+                    results.append((entity_hash, EngineStatusCode.ACCEPTED))
+                else:
+                    results.append((None, EngineStatusCode.ANNOUNCE_ERROR))
+        return results
+
     def check_status(self) -> BlockchainStatuses:
         """ Checking the status of a blockchain node
 
@@ -278,3 +539,25 @@ class XYMEngine(NEMEngine):
         ```
         """
         return network.check_transaction_state(transaction_hash)
+
+    @staticmethod
+    def check_transactions_confirmation(transaction_hashes: List[str]) -> Dict[str, network.TransactionStatusInfo]:
+        """
+        Determines the current statuses of many transactions with a few bulk requests
+
+        Parameters
+        ----------
+        transaction_hashes
+            Transaction hashes as string hexadecimal representation
+
+        Returns
+        -------
+        Dict[str, TransactionStatusInfo]
+            Statuses by transaction hash with the group and error code. For example:
+        ```py
+        {
+            "84BDE34A...20AE7532": TransactionStatusInfo(group=TransactionStatus.FAILED, code="Failure_Core_Past_Deadline", ...)
+        }
+        ```
+        """
+        return network.check_transaction_states(transaction_hashes)
@@ -0,0 +1,338 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Optional, Dict, List
+
+import requests
+from pydantic import BaseModel
+from requests.exceptions import RequestException
+
+from . import network
+from .constants import Fees, NetworkType, TransactionStatus
+
+logger = logging.getLogger(__name__)
+
+#: order of announcing transactions with close deadlines, the most expensive first
+FEE_PRIORITIES = {Fees.FAST: 0, Fees.AVERAGE: 1, Fees.SLOW: 2, Fees.SLOWEST: 3, Fees.ZERO: 4}
+
+
+class AnnouncerMetrics(BaseModel):
+    """Statistics of the announce pipeline"""
+    submitted: int = 0
+    announced: int = 0
+    rebroadcasts: int = 0
+    retries: int = 0
+    throttled: int = 0  #: answers 429 / 503 of the node
+    failed: int = 0
+    confirmed: int = 0
+    expired: int = 0
+    queue_depth: int = 0
+    in_flight: int = 0
+    average_latency: float = 0.0  #: seconds of the announce request
+    max_latency: float = 0.0
+    started_at: float = 0.0
+
+    def add_latency(self, latency: float):
+        self.max_latency = max(self.max_latency, latency)
+        self.average_latency += (latency - self.average_latency) / max(self.announced, 1)
+
+    @property
+    def throughput(self) -> float:
+        """Announced transactions per minute"""
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        return self.announced * 60 / elapsed if elapsed > 0 else 0.0
+
+
+class AnnounceItem:
+    """Signed transaction waiting for announcement or confirmation"""
+
+    def __init__(self, entity_hash: str, payload: bytes, deadline: int, fee_type: Fees):
+        self.hash = entity_hash
+        self.payload = payload
+        self.deadline = deadline
+        self.fee_type = fee_type
+        self.attempts = 0
+        self.announced_at: Optional[float] = None
+
+    def priority(self) -> tuple:
+        # deadlines within the same 10 seconds are considered equal, then the fee type decides
+        return self.deadline // 10000, FEE_PRIORITIES.get(self.fee_type, len(FEE_PRIORITIES))
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second to one node, can be paused by the node (Retry-After)"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes a token. Returns 0 on success, otherwise the number of seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class Announcer:
+    """Queue of signed transactions announced with bounded concurrency and a rate limit per node.
+    Announced transactions are rebroadcast until they are confirmed or their deadline passes.
+    """
+
+    DEFAULT_RETRY_AFTER = 5  #: seconds, if the node has not specified Retry-After
+    MAX_BACKOFF = 60
+
+    def __init__(self,
+                 url: Optional[str] = None,
+                 network_type: Optional[NetworkType] = None,
+                 max_concurrency: int = 8,
+                 rate_limit: float = 10,
+                 rebroadcast_interval: float = 30):
+        """
+        Parameters
+        ----------
+        url
+            URL node in the form of http://ngl-dual-001.testnet.symboldev.network:3000.
+            By default, the selected node is used
+        network_type
+            Network type for calculating the network time
+        max_concurrency
+            Maximum number of simultaneous announce requests
+        rate_limit
+            Maximum announce requests per second to one node
+        rebroadcast_interval
+            Interval in seconds to check the statuses of announced transactions and rebroadcast lost ones
+        """
+        self.url = url
+        self.timing = network.Timing(network_type)
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.rebroadcast_interval = rebroadcast_interval
+        self._metrics = AnnouncerMetrics()  # changed only under `condition`, see `metrics`
+        self.queue: List[tuple] = []  # heap by priority
+        self.delayed: List[tuple] = []  # heap by the time of the next attempt
+        self.unconfirmed: Dict[str, AnnounceItem] = {}
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.stop_event = threading.Event()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.threads: List[threading.Thread] = []
+
+    @property
+    def metrics(self) -> AnnouncerMetrics:
+        """A consistent snapshot of the statistics"""
+        with self.condition:
+            return self._metrics.copy()
+
+    def count(self, counter: str, value: int = 1):
+        """Changes a counter of the statistics, they are updated from several threads"""
+        with self.condition:
+            setattr(self._metrics, counter, getattr(self._metrics, counter) + value)
+
+    def start(self) -> 'Announcer':
+        self.stop_event.clear()
+        with self.condition:
+            self._metrics.started_at = time.time()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self.threads = [threading.Thread(target=self.dispatching, daemon=True),
+                        threading.Thread(target=self.rebroadcasting, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        logger.debug('Announcer started')
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        logger.debug(f'Announcer stopped: {self.metrics}')
+
+    def __enter__(self) -> 'Announcer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def submit(self, entity_hash: str, payload: bytes, deadline: int, fee_type: Fees = Fees.SLOWEST):
+        """
+        Puts a signed transaction into the queue
+
+        Parameters
+        ----------
+        entity_hash
+            Transaction hash
+        payload
+            Signed payload, as returned by `Transaction.create`
+        deadline
+            Transaction deadline in network milliseconds (see `Timing.calc_deadline`)
+        fee_type
+            Fee type of the transaction, affects the order of announcement
+        """
+        item = AnnounceItem(entity_hash.upper(), payload, deadline, fee_type)
+        self.count('submitted')
+        self.push(item)
+
+    def push(self, item: AnnounceItem, delay: float = 0):
+        with self.condition:
+            if delay > 0:
+                heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.counter), item))
+            else:
+                heapq.heappush(self.queue, (item.priority(), next(self.counter), item))
+            self._metrics.queue_depth = len(self.queue) + len(self.delayed)
+            self.condition.notify()
+
+    def pop(self) -> Optional[AnnounceItem]:
+        """Waits for the next transaction, moving the delayed ones whose time has come to the queue"""
+        with self.condition:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, _, item = heapq.heappop(self.delayed)
+                    heapq.heappush(self.queue, (item.priority(), next(self.counter), item))
+                if self.queue:
+                    _, _, item = heapq.heappop(self.queue)
+                    self._metrics.queue_depth = len(self.queue) + len(self.delayed)
+                    # counted until the outcome of the item is known
+                    self._metrics.in_flight += 1
+                    return item
+                timeout = self.delayed[0][0] - now if self.delayed else None
+                self.condition.wait(timeout)
+        return None
+
+    def limiter(self, url: str) -> RateLimiter:
+        if url not in self.limiters:
+            self.limiters[url] = RateLimiter(self.rate_limit)
+        return self.limiters[url]
+
+    def dispatching(self):
+        while (item := self.pop()) is not None:
+            if item.deadline < self.timing.now():
+                self.expire(item)
+                self.done()
+                continue
+            url = self.url or network.node_selector.url
+            while (wait := self.limiter(url).acquire()) > 0:
+                if self.stop_event.wait(wait):
+                    # the item stays in the queue for the next start
+                    self.push(item)
+                    self.done()
+                    return
+            self.slots.acquire()
+            self.executor.submit(self.announce, item, url)
+
+    def done(self):
+        self.count('in_flight', -1)
+
+    def announce(self, item: AnnounceItem, url: str):
+        try:
+            self.request(item, url)
+        except Exception as e:
+            logger.exception(e)
+            self.count('failed')
+        finally:
+            self.slots.release()
+            self.done()
+
+    def request(self, item: AnnounceItem, url: str):
+        item.attempts += 1
+        started = time.time()
+        try:
+            headers = {'Content-type': 'application/json'}
+            answer = requests.put(f'{url}/transactions', data=item.payload, headers=headers, timeout=10)
+        except RequestException as e:
+            logger.warning(f'Announce of {item.hash} failed: {e}')
+            self.count('retries')
+            self.push(item, min(2 ** item.attempts, self.MAX_BACKOFF))
+            return
+        if answer.status_code == HTTPStatus.ACCEPTED:
+            with self.condition:
+                if item.announced_at is not None:
+                    self._metrics.rebroadcasts += 1
+                item.announced_at = time.time()
+                self._metrics.announced += 1
+                self._metrics.add_latency(item.announced_at - started)
+                self.unconfirmed[item.hash] = item
+        elif answer.status_code in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE):
+            retry_after = answer.headers.get('Retry-After', '')
+            retry_after = float(retry_after) if retry_after.isdigit() else self.DEFAULT_RETRY_AFTER
+            logger.warning(f'Node {url} is throttling, retry after {retry_after}s')
+            self.count('throttled')
+            self.limiter(url).pause(retry_after)
+            self.push(item, retry_after)
+        else:
+            logger.error(f'Transaction {item.hash} was rejected: {answer.status_code} {answer.text}')
+            self.count('failed')
+
+    def expire(self, item: AnnounceItem):
+        logger.warning(f'Transaction {item.hash} has expired')
+        self.count('expired')
+
+    def rebroadcasting(self):
+        while not self.stop_event.wait(self.rebroadcast_interval):
+            self.check()
+
+    def check(self):
+        """Checks the statuses of the announced transactions, the lost ones are queued again"""
+        with self.condition:
+            items = dict(self.unconfirmed)
+        if not items:
+            return
+        try:
+            # the statuses are checked on the node the transactions were announced to
+            states = network.check_transaction_states(items.keys(), url=self.url)
+        except (RequestException, network.SymbolNetworkException) as e:
+            logger.error(e)
+            return
+        now = self.timing.now()
+        for entity_hash, state in states.items():
+            item = items[entity_hash]
+            if state.group == TransactionStatus.CONFIRMED_ADDED:
+                self.count('confirmed')
+            elif state.group == TransactionStatus.FAILED:
+                logger.error(f'Transaction {entity_hash} failed: {state.code}')
+                self.count('failed')
+            elif item.deadline < now:
+                self.expire(item)
+            elif state.group == TransactionStatus.NOT_FOUND:
+                # the node has lost the transaction - announce it again
+                self.push(item)
+            else:
+                continue
+            with self.condition:
+                self.unconfirmed.pop(entity_hash, None)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all transactions are confirmed, failed or expired"""
+        started = time.monotonic()
+        while True:
+            with self.condition:
+                pending = len(self.queue) + len(self.delayed) + len(self.unconfirmed) + self._metrics.in_flight
+            if not pending:
+                return True
+            if timeout is not None and time.monotonic() - started > timeout:
+                return False
+            time.sleep(0.1)
@@ -3,16 +3,20 @@ import logging
 import re
 
 from binascii import unhexlify
-from typing import Union, Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Optional, List, Tuple, Iterable, Iterator
 
 from symbolchain.core.CryptoTypes import Hash256
 from symbolchain.core.CryptoTypes import PrivateKey
 from symbolchain.core.CryptoTypes import Signature, PublicKey
 from symbolchain.core.facade.SymFacade import SymFacade
 from symbolchain.core.sym.IdGenerator import generate_namespace_id
+from symbolchain.core.sym.KeyPair import KeyPair
+from symbolchain.core.sym.MerkleHashBuilder import MerkleHashBuilder
 
 from . import ed25519, network
 from .constants import Fees, FM, TransactionTypes, TransactionMetrics, HexSequenceSizes, NetworkType
+from .estimator import FeeEstimator
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +36,24 @@ class Dividers:
         return self.dividers.get(key, None)
 
 
+class Aliases:
+    """Accumulates mosaic IDs of namespace aliases for offline work"""
+    aliases = {}
+
+    def __iter__(self):
+        for key in self.aliases:
+            yield key
+
+    def set(self, key, value):
+        self.aliases[key] = value
+
+    def get(self, key):
+        return self.aliases.get(key, None)
+
+
 # class objects as singleton
 dividers = Dividers()
+aliases = Aliases()
 
 
 class Message(bytes):
@@ -70,12 +90,28 @@ class EncryptMessage(bytes):
         #  https://docs.symbolplatform.com/concepts/transfer-transaction.html#encrypted-message
         message = Message(message, True)
         hex_encrypted_message = ed25519.Ed25519.encrypt(sender_private_key, recipient_pub, message)
+        return cls.from_encrypted(hex_encrypted_message)
+
+    @classmethod
+    def from_encrypted(cls, hex_encrypted_message: bytes) -> 'EncryptMessage':
+        """Builds the message from an already encrypted one in hex"""
         if len(hex_encrypted_message) > ed25519.SignClass.PLAIN_MESSAGE_SIZE:
             raise OverflowError(f'Encrypted message length cannot exceed {ed25519.SignClass.PLAIN_MESSAGE_SIZE} bytes. Current length: {len(hex_encrypted_message)}')
         payload_message = b'\x01' + hex_encrypted_message
         cls.size = len(payload_message)
         return bytes.__new__(EncryptMessage, payload_message)
 
+    @classmethod
+    def many(cls,
+             message: Union[str, bytes],
+             sender_private_key: str,
+             recipient_pubs: Iterable[str],
+             max_workers: Optional[int] = None) -> List['EncryptMessage']:
+        """Encrypts one message for many recipients in a pool of processes, see `Ed25519.encrypt_many`"""
+        message = Message(message, True)
+        encrypted = ed25519.Ed25519.encrypt_many(sender_private_key, recipient_pubs, message, max_workers)
+        return [cls.from_encrypted(hex_encrypted_message) for hex_encrypted_message in encrypted]
+
 
 class Namespace(str):
     """Building namespace hashes"""
@@ -111,6 +147,9 @@ class Mosaic(tuple):
         """Gets the divisibility by mosaic ID"""
         if mosaic_id in dividers:
             return dividers.get(mosaic_id)
+        elif network.network_context.is_offline:
+            logger.error(f'Divisibility of `{mosaic_id}` is not in the offline snapshot')
+            return None
         else:
             divisibility = network.get_divisibility(mosaic_id)
             if divisibility is not None:
@@ -120,11 +159,16 @@ class Mosaic(tuple):
     @staticmethod
     def alias_to_mosaic_id(alis):
         """Translates aliases to mosaic id"""
+        if alis in aliases:
+            return aliases.get(alis)
+        if network.network_context.is_offline:
+            raise ValueError(f'Alias `{alis}` is not in the offline snapshot')
         namespace_id = Namespace(alis)
         namespace_info = network.get_namespace_info(namespace_id)
         if namespace_info is None or namespace_info == {}:
             raise ValueError(f'Failed to get mosaic_id by name `{alis}`')
         mosaic_id = namespace_info['namespace']['alias']['mosaicId']
+        aliases.set(alis, mosaic_id)
         return mosaic_id
 
 
@@ -137,21 +181,105 @@ class Transaction:
         self.size: int = -1  #: transaction size
         self.max_fee: int = -1  #: The maximum amount of network currency that the sender of the transaction is willing to pay to get the transaction accepted
 
-        self.network_type: NetworkType = network.get_node_network()
+        # network metadata is shared between transactions and refreshed in the background
+        self.network_type: NetworkType = network.network_context.network_type
         self.timing: network.Timing = network.Timing(self.network_type)
-        self.sym_facade: SymFacade = SymFacade(self.network_type.value)
+        self.sym_facade: SymFacade = network.network_context.sym_facade
+        self.fee_estimator: Optional[FeeEstimator] = None  #: if set, fees are estimated from recent blocks
 
     def create(self,
-               pr_key: str,
+               pr_key: Union[str, KeyPair],
                recipient_address: str,
                mosaics: Union[Mosaic, List[Mosaic], None] = None,
                message: Union[PlainMessage, EncryptMessage] = PlainMessage(''),
                fee_type: Fees = Fees.SLOWEST,
                deadline: Optional[dict] = None) -> Tuple[str, bytes]:
-        """Create a transaction"""
+        """Create a transaction. The signer is a private key or a key pair of an unlocked signing session"""
+
+        key_pair = Transaction.to_key_pair(pr_key)
+        transfer = self.prepare_transfer(recipient_address, mosaics, message, fee_type, deadline,
+                                         network.network_context.fee_multipliers)
+        self.size = transfer['size']
+        self.max_fee = transfer['fee']
 
+        entity_hash, payload_bytes = Transaction.sign_transfer(self.sym_facade, key_pair, transfer)
+
+        # print(transaction)
+        # print(hexlify(transaction.serialize()))
+        # print(answer.status_code, answer.text)
+        logger.debug(f'Transaction hash: {entity_hash}')
+
+        return entity_hash, payload_bytes
+
+    def create_many(self,
+                    pr_key: str,
+                    specs: Iterable[dict],
+                    max_workers: Optional[int] = None,
+                    chunk_size: int = 256) -> Iterator[Tuple[str, bytes]]:
+        """
+        Creates many transfers from one signer, signing and hashing them in a pool of processes
+
+        Parameters
+        ----------
+        pr_key
+            Private key of the signer
+        specs
+            Transfers as dictionaries with the keys of the `create` arguments:
+            `recipient_address` and optional `mosaics`, `message`, `fee_type`, `deadline`
+        max_workers
+            Number of processes, by default the number of processors. 1 signs in the current process
+        chunk_size
+            Number of transfers sent to a process at a time, a single chunk is signed in the current process
+        Returns
+        -------
+        Iterator[Tuple[str, bytes]]
+            Pairs of the transaction hash and payload in the order of `specs`
+        """
+        # mosaics, messages, fees and deadlines are resolved here once, processes only sign
+        fee_multipliers = network.network_context.fee_multipliers
+        transfers = [self.prepare_transfer(fee_multipliers=fee_multipliers, **spec) for spec in specs]
+        if max_workers == 1 or len(transfers) <= chunk_size:
+            key_pair = self.to_key_pair(pr_key)
+            for transfer in transfers:
+                yield Transaction.sign_transfer(self.sym_facade, key_pair, transfer)
+            return
+        chunks = [transfers[i:i + chunk_size] for i in range(0, len(transfers), chunk_size)]
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_signer,
+                                 initargs=(self.network_type.value, pr_key)) as executor:
+            for signed in executor.map(_sign_transfers, chunks):
+                yield from signed
+
+    def prepare_transfer(self,
+                         recipient_address: str,
+                         mosaics: Union[Mosaic, List[Mosaic], None] = None,
+                         message: Union[PlainMessage, EncryptMessage] = PlainMessage(''),
+                         fee_type: Fees = Fees.SLOWEST,
+                         deadline: Optional[dict] = None,
+                         fee_multipliers: Optional[dict] = None) -> dict:
+        """Checks the transfer parameters and calculates its size, fee and deadline.
+        The result contains only simple types and can be passed to another process"""
         if deadline is None:
             deadline = {'minutes': 2}
+        mosaics = Transaction.sort_mosaics(mosaics)
+        size = self.MIN_TRANSACTION_SIZE + len(message) + sum(mosaic.size for mosaic in mosaics)
+        return {
+            'recipient_address': SymFacade.Address(recipient_address.replace('-', '')).bytes,
+            'mosaics': [tuple(mosaic) for mosaic in mosaics],
+            'fee': self.calc_fee(size, fee_type, fee_multipliers),
+            'deadline': self.timing.calc_deadline(**deadline),
+            'message': bytes(message),
+            'size': size
+        }
+
+    @staticmethod
+    def to_key_pair(pr_key: Union[str, KeyPair]) -> KeyPair:
+        if isinstance(pr_key, KeyPair):
+            return pr_key
+        return SymFacade.KeyPair(PrivateKey(unhexlify(pr_key)))
+
+    @staticmethod
+    def sort_mosaics(mosaics: Union[Mosaic, List[Mosaic], None]) -> List[Mosaic]:
         if mosaics is None:
             mosaics = []
         if not isinstance(mosaics, list) and isinstance(mosaics, Mosaic):
@@ -161,45 +289,135 @@ class Transaction:
         if len(mosaics) > 1:
             # sorting mosaic by ID (blockchain requirement)
             mosaics = sorted(mosaics, key=lambda tup: tup[0])
+        return mosaics
+
+    def create_aggregate(self,
+                         pr_key: Union[str, KeyPair],
+                         specs: List[dict],
+                         fee_type: Fees = Fees.SLOWEST,
+                         deadline: Optional[dict] = None) -> Tuple[str, bytes]:
+        """
+        Creates an aggregate complete transaction from transfers. The aggregate is signed and its fee
+        is paid by `pr_key`. Transfers of other accounts are cosigned locally with their keys
+
+        Parameters
+        ----------
+        pr_key
+            Private key of the signer of the aggregate
+        specs
+            Inner transfers as dictionaries with the key `recipient_address`
+            and optional `mosaics`, `message` and `signer_pr_key` (by default the signer of the aggregate)
+        fee_type
+            Fee type of the aggregate
+        deadline
+            Deadline of the aggregate, 2 minutes by default
+        Returns
+        -------
+        Tuple[str, bytes]
+            The hash and payload of the aggregate
+        """
+        max_transactions = network.network_context.max_transactions_per_aggregate
+        if not 0 < len(specs) <= max_transactions:
+            raise ValueError(f'Aggregate must contain from 1 to {max_transactions} transactions')
+        if deadline is None:
+            deadline = {'minutes': 2}
+        key_pair = Transaction.to_key_pair(pr_key)
+        signers = {}
+        cosigners = {}
+        for spec in specs:
+            signer_pr_key = spec.get('signer_pr_key')
+            if signer_pr_key is None or signer_pr_key in signers:
+                continue
+            signer = Transaction.to_key_pair(signer_pr_key)
+            signers[signer_pr_key] = signer
+            if signer.public_key != key_pair.public_key:
+                cosigners[signer.public_key.bytes] = signer
+        if len(cosigners) > TransactionMetrics.MAX_COSIGNATURES_PER_AGGREGATE:
+            raise ValueError(f'Aggregate can have up to {TransactionMetrics.MAX_COSIGNATURES_PER_AGGREGATE} cosignatures')
+
+        aggregate = self.sym_facade.transaction_factory.create({
+            'type': 'aggregateComplete',
+            'signer_public_key': key_pair.public_key,
+            'fee': 0,
+            'deadline': self.timing.calc_deadline(**deadline)
+        })
+        merkle_hash_builder = MerkleHashBuilder()
+        for spec in specs:
+            signer = signers.get(spec.get('signer_pr_key'), key_pair)
+            embedded = self.sym_facade.transaction_factory.create_embedded({
+                'type': 'transfer',
+                'signer_public_key': signer.public_key,
+                'recipient_address': SymFacade.Address(spec['recipient_address'].replace('-', '')).bytes,
+                'mosaics': [tuple(mosaic) for mosaic in Transaction.sort_mosaics(spec.get('mosaics'))],
+                'message': bytes(spec.get('message', PlainMessage('')))
+            })
+            merkle_hash_builder.update(Hash256(hashlib.sha3_256(embedded.serialize()).digest()))
+            aggregate.transactions.append(embedded)
+        aggregate.transactions_hash = merkle_hash_builder.final().bytes
+
+        # the fee covers the cosignatures that are attached after signing
+        self.size = aggregate.get_size() + len(cosigners) * TransactionMetrics.COSIGNATURE_SIZE
+        self.max_fee = self.calc_fee(self.size, fee_type, network.network_context.fee_multipliers)
+        aggregate.fee = self.max_fee
+
+        signature = self.sym_facade.sign_transaction(key_pair, aggregate)
+        entity_hash = Transaction.entity_hash_gen(signature, key_pair.public_key, aggregate,
+                                                  self.sym_facade.network.generation_hash_seed)
+        for cosigner in cosigners.values():
+            cosignature = cosigner.sign(unhexlify(entity_hash))
+            aggregate.cosignatures.append((0, cosigner.public_key.bytes, cosignature.bytes))
+        payload_bytes = self.sym_facade.transaction_factory.attach_signature(aggregate, signature)
+        logger.debug(f'Aggregate hash: {entity_hash}, transactions: {len(specs)}, cosignatures: {len(cosigners)}')
+        return entity_hash, payload_bytes
 
-        key_pair = self.sym_facade.KeyPair(PrivateKey(unhexlify(pr_key)))
-
-        deadline = self.timing.calc_deadline(**deadline)
+    def create_batches(self,
+                       pr_key: Union[str, KeyPair],
+                       specs: Iterable[dict],
+                       fee_type: Fees = Fees.SLOWEST,
+                       deadline: Optional[dict] = None,
+                       batch_size: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+        """Packs transfers into aggregate complete transactions of `batch_size` transfers each,
+        by default `maxTransactionsPerAggregate` of the network, see `create_aggregate`"""
+        if batch_size is None:
+            batch_size = network.network_context.max_transactions_per_aggregate
+        specs = list(specs)
+        for i in range(0, len(specs), batch_size):
+            yield self.create_aggregate(pr_key, specs[i:i + batch_size], fee_type, deadline)
 
+    @staticmethod
+    def sign_transfer(sym_facade: SymFacade, key_pair, transfer: dict) -> Tuple[str, bytes]:
+        """Builds, signs and hashes the transfer prepared by `prepare_transfer`"""
         descriptor = {
             'type': 'transfer',
-            'recipient_address': SymFacade.Address(recipient_address.replace('-', '')).bytes,
+            'recipient_address': transfer['recipient_address'],
             'signer_public_key': key_pair.public_key,
-            'mosaics': mosaics,
-            'fee': self.max_fee,
-            'deadline': deadline,
-            'message': message
+            'mosaics': transfer['mosaics'],
+            'fee': transfer['fee'],
+            'deadline': transfer['deadline'],
+            'message': transfer['message']
         }
+        transaction = sym_facade.transaction_factory.create(descriptor)
 
-        self.size = self.MIN_TRANSACTION_SIZE + descriptor['message'].size + sum(mosaic.size for mosaic in descriptor['mosaics'])
-        self.max_fee = Transaction.calc_max_fee(self.size, fee_type)
-        descriptor['fee'] = self.max_fee
-
-        transaction = self.sym_facade.transaction_factory.create(descriptor)
-
-        signature = self.sym_facade.sign_transaction(key_pair, transaction)
+        signature = sym_facade.sign_transaction(key_pair, transaction)
         entity_hash = Transaction.entity_hash_gen(signature, key_pair.public_key, transaction,
-                                                  self.sym_facade.network.generation_hash_seed)
-
-        payload_bytes = self.sym_facade.transaction_factory.attach_signature(transaction, signature)
-
-        # print(transaction)
-        # print(hexlify(transaction.serialize()))
-        # print(answer.status_code, answer.text)
-        logger.debug(f'Transaction hash: {entity_hash}')
+                                                  sym_facade.network.generation_hash_seed)
 
+        payload_bytes = sym_facade.transaction_factory.attach_signature(transaction, signature)
         return entity_hash, payload_bytes
 
+    def calc_fee(self, transaction_size: int, fee_type: Fees, fee_multipliers: Optional[dict] = None) -> int:
+        """The fee estimated from recent blocks, if the fee estimator is set and filled, otherwise `calc_max_fee`"""
+        if self.fee_estimator is not None:
+            max_fee = self.fee_estimator.calc_max_fee(transaction_size, fee_type)
+            if max_fee is not None:
+                return max_fee
+        return Transaction.calc_max_fee(transaction_size, fee_type, fee_multipliers)
+
     @staticmethod
-    def calc_max_fee(transaction_size: int, fee_type: Fees):
-        """Calculation of the transaction fee"""
+    def calc_max_fee(transaction_size: int, fee_type: Fees, fee_multipliers: Optional[dict] = None):
+        """Calculation of the transaction fee. Without `fee_multipliers`, they are requested from the network"""
         # network fee multipliers
-        nfm = network.get_fee_multipliers()
+        nfm = fee_multipliers if fee_multipliers is not None else network.get_fee_multipliers()
         if nfm is None:
             raise ValueError(f'Failed to get fee multipliers from network. Unable to calculate fee')
         # https://github.com/nemgrouplimited/symbol-desktop-wallet/blob/507d4694a0ff55b0b039be0b5d061b47b2386fde/src/services/TransactionCommand.ts#L200
@@ -239,11 +457,12 @@ class Transaction:
         the signer public key, nemesis block generation hash, and the remaining transaction payload."""
         # https://symbol-docs.netlify.app/concepts/transaction.html
         tr_sr = transaction.serialize()
-        is_aggregate = transaction.type in [TransactionTypes.AGGREGATE_BONDED, TransactionTypes.AGGREGATE_COMPLETE]
-        # TODO check if it works correctly on aggregated transactions
+        # builders keep the type as `EntityTypeDto`, which is not comparable with `TransactionTypes` directly
+        transaction_type = getattr(transaction.type, 'value', transaction.type)
+        is_aggregate = transaction_type in [TransactionTypes.AGGREGATE_BONDED, TransactionTypes.AGGREGATE_COMPLETE]
         if is_aggregate:
-            raise NotImplementedError('Working with aggregated transactions has not been tested !!!')
-            transaction_body = tr_sr[TransactionMetrics.TRANSACTION_HEADER_SIZE:TransactionMetrics.TRANSACTION_BODY_INDEX + 32]
+            # only the header of the aggregate is hashed, inner transactions are covered by the transactions hash
+            transaction_body = tr_sr[TransactionMetrics.TRANSACTION_HEADER_SIZE:TransactionMetrics.AGGREGATE_HASHED_END]
         else:
             transaction_body = tr_sr[TransactionMetrics.TRANSACTION_HEADER_SIZE:]
         # https://symbol-docs.netlify.app/concepts/transaction.html#signing-a-transaction
@@ -251,3 +470,18 @@ class Transaction:
         # entity_hash = Hash256(hashlib.sha3_256(entity_hash_bytes).digest())
         entity_hash = hashlib.sha3_256(entity_hash_bytes).hexdigest().upper()
         return entity_hash
+
+
+# signer of the process pool of `Transaction.create_many`
+_signer: Optional[tuple] = None
+
+
+def _init_signer(network_type: str, pr_key: str):
+    global _signer
+    sym_facade = SymFacade(network_type)
+    _signer = sym_facade, sym_facade.KeyPair(PrivateKey(unhexlify(pr_key)))
+
+
+def _sign_transfers(transfers: List[dict]) -> List[Tuple[str, bytes]]:
+    sym_facade, key_pair = _signer
+    return [Transaction.sign_transfer(sym_facade, key_pair, transfer) for transfer in transfers]
@@ -7,6 +7,8 @@ NETWORK_GENERATION_HASH_SEED_TEST = '3B5E1FA6445653C971A50687E75E6D09FB30481055E
 EPOCH_TIME_MAINNET = datetime.datetime(2021, 3, 16, 0, 6, 25, tzinfo=datetime.timezone.utc)
 EPOCH_TIME_TESTNET = datetime.datetime(2021, 3, 25, 17, 56, 17, tzinfo=datetime.timezone.utc)
 
+PAST_DEADLINE_CODE = 'Failure_Core_Past_Deadline'
+
 
 class AccountValidationState(Enum):
     OK = 'The address is correct'
@@ -24,6 +26,7 @@ class TransactionStatus(Enum):
     UNCONFIRMED_ADDED = 'unconfirmed'
     CONFIRMED_ADDED = 'confirmed'
     PARTIAL_ADDED = 'partial'
+    FAILED = 'failed'
     # UNCONFIRMED_REMOVED = 3
     # PARTIAL_REMOVED = 4
 
@@ -38,9 +41,21 @@ class BlockchainStatuses(Enum):
     NO_NODES_AVAILABLE = 'No nodes available in the picklist (URL is None)'
 
 
+class ExecutorTypes(Enum):
+    INLINE = 'inline'
+    THREAD = 'thread'
+    PROCESS = 'process'
+
+
+class OverflowPolicies(Enum):
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    SPILL = 'spill'
+
+
 class HexSequenceSizes(IntEnum):
     ADDRESS = 39
-    PUBLIC_KEY = PRIVATE_KEY = 64
+    PUBLIC_KEY = PRIVATE_KEY = TRANSACTION_HASH = 64
     MOSAIC_ID = NAMESPACE_ID = 16
 
 
@@ -64,6 +79,10 @@ class FM(EnumMeta):
 class TransactionMetrics:
     TRANSACTION_HEADER_SIZE = 8 + 64 + 32 + 4
     TRANSACTION_BODY_INDEX = TRANSACTION_HEADER_SIZE + 1 + 1 + 2 + 8 + 8
+    AGGREGATE_HASHED_END = TRANSACTION_BODY_INDEX + 32  # the signed part of aggregates ends with the transactions hash
+    MAX_TRANSACTIONS_PER_AGGREGATE = 100  # default of `maxTransactionsPerAggregate`, see `NetworkContext`
+    MAX_COSIGNATURES_PER_AGGREGATE = 25  # network property `maxCosignaturesPerAggregate`
+    COSIGNATURE_SIZE = 8 + 32 + 64  # version, signer public key and signature
 
 
 class TransactionTypes(IntEnum):
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .constants import ExecutorTypes, OverflowPolicies
+
+logger = logging.getLogger(__name__)
+
+
+class DispatcherMetrics(BaseModel):
+    """Queue and handler statistics of the dispatcher"""
+    received: int = 0
+    processed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    spill_depth: int = 0
+    last_lag: float = 0.0  #: seconds between receiving the event and the end of its processing
+    average_lag: float = 0.0
+    max_lag: float = 0.0
+
+    def add_lag(self, lag: float):
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        # running average over all processed events
+        self.average_lag += (lag - self.average_lag) / max(self.processed + self.failed, 1)
+
+
+class SpillBuffer:
+    """File based FIFO for events that did not fit into the queue"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.is_temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='nempy-spill-', suffix='.jsonl')
+            os.close(fd)
+        self.path = path
+        self.file = open(self.path, 'w+')
+        self.read_offset = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, item: Tuple[float, dict]):
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(json.dumps(item) + '\n')
+        self.size += 1
+
+    def pop(self) -> Optional[Tuple[float, dict]]:
+        if not self.size:
+            return None
+        self.file.flush()
+        self.file.seek(self.read_offset)
+        line = self.file.readline()
+        self.read_offset = self.file.tell()
+        self.size -= 1
+        if not self.size:
+            # everything has been read back - the file can start from scratch
+            self.file.seek(0)
+            self.file.truncate()
+            self.read_offset = 0
+        received_at, event = json.loads(line)
+        return received_at, event
+
+    def close(self):
+        self.file.close()
+        if self.is_temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Dispatcher:
+    """A bounded queue between receiving events and their handlers.
+    Handlers are executed inline (in the event loop), in a pool of threads or in a pool of processes.
+    With the process pool, the callback must be picklable (a function at the module level).
+    """
+
+    def __init__(self,
+                 callback: Callable,
+                 executor: ExecutorTypes = ExecutorTypes.INLINE,
+                 max_queue_size: int = 1000,
+                 overflow_policy: OverflowPolicies = OverflowPolicies.BLOCK,
+                 spill_path: Optional[str] = None,
+                 workers: int = 1):
+        if max_queue_size <= 0:
+            raise ValueError('The queue size must be positive')
+        if executor == ExecutorTypes.INLINE and workers != 1:
+            raise ValueError('Inline execution is possible only with one worker')
+        self.callback = callback
+        self.executor_type = executor
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.workers = workers
+        self.metrics = DispatcherMetrics()
+        self.queue: Optional[asyncio.Queue] = None
+        self.spill: Optional[SpillBuffer] = None
+        self.executor: Optional[Executor] = None
+
+    def start(self) -> 'Dispatcher':
+        """Creates the queue and the executor, must be called inside a running event loop"""
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self.overflow_policy == OverflowPolicies.SPILL:
+            self.spill = SpillBuffer(self.spill_path)
+        if self.executor_type == ExecutorTypes.THREAD:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        elif self.executor_type == ExecutorTypes.PROCESS:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+    async def put(self, event: dict):
+        """Puts the event into the queue according to the overflow policy"""
+        self.metrics.received += 1
+        item = (time.time(), event)
+        if self.overflow_policy == OverflowPolicies.BLOCK:
+            await self.queue.put(item)
+        elif self.overflow_policy == OverflowPolicies.DROP_OLDEST:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.metrics.dropped += 1
+            self.queue.put_nowait(item)
+        elif self.overflow_policy == OverflowPolicies.SPILL:
+            self.refill()
+            # while the spill is not empty, new events go after it to keep the order
+            if self.queue.full() or len(self.spill):
+                self.spill.push(item)
+                self.metrics.spilled += 1
+            else:
+                self.queue.put_nowait(item)
+        else:
+            raise ValueError(f'Unknown overflow policy `{self.overflow_policy}`')
+        self.update_depth()
+
+    def refill(self):
+        """Moves events from the spill back to the queue while there is free space"""
+        if self.spill is None:
+            return
+        while len(self.spill) and not self.queue.full():
+            self.queue.put_nowait(self.spill.pop())
+
+    def update_depth(self):
+        self.metrics.queue_depth = self.queue.qsize()
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, self.metrics.queue_depth)
+        self.metrics.spill_depth = len(self.spill) if self.spill is not None else 0
+
+    async def handle(self, event: dict):
+        if self.executor is None:
+            self.callback(event)
+        else:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(self.executor, self.callback, event)
+
+    async def worker(self):
+        while True:
+            received_at, event = await self.queue.get()
+            try:
+                await self.handle(event)
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.exception(e)
+            else:
+                self.metrics.processed += 1
+            finally:
+                self.queue.task_done()
+            self.metrics.add_lag(time.time() - received_at)
+            self.refill()
+            self.update_depth()
+
+    async def run(self):
+        """Runs the handler workers until cancelled"""
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.close()
+
+    async def join(self):
+        """Waits until all events, including spilled ones, have been processed"""
+        while True:
+            await self.queue.join()
+            if self.spill is None or not len(self.spill):
+                break
+            self.refill()
@@ -12,15 +12,26 @@ import collections
 import hashlib
 import logging
 import os
-from base64 import b32decode, b32encode
+import re
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from base64 import b32encode
 from binascii import hexlify, unhexlify
 from operator import getitem, methodcaller
+from typing import Iterable, List, Optional, Tuple, Union
 
 from Crypto.Cipher import AES
 from Cryptodome.Hash import RIPEMD160
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519 as native_ed25519, x25519
+except ImportError:
+    native_ed25519 = x25519 = None
 from .constants import HexSequenceSizes, AccountValidationState
 
 logger = logging.getLogger(__name__)
@@ -34,6 +45,9 @@ q = 2 ** 255 - 19
 
 hash_len = 32
 
+Y_MASK = (1 << (b - 1)) - 1
+SCALAR_MASK = (1 << (b - 2)) - 8
+
 
 def check_hex(hex_sequence: str, size: HexSequenceSizes):
     try:
@@ -45,17 +59,150 @@ def check_hex(hex_sequence: str, size: HexSequenceSizes):
     return False
 
 
-def check_address(address: str) -> AccountValidationState:
+#: codes of `check_addresses` results: `ADDRESS_STATES[code]`
+ADDRESS_STATES = list(AccountValidationState)
+_OK, _LENGTH_FAILURE, _CHECKSUM_FAILURE = (ADDRESS_STATES.index(state) for state in (
+    AccountValidationState.OK, AccountValidationState.LENGTH_FAILURE, AccountValidationState.CHECKSUM_FAILURE))
+_BASE32_ADDRESS = re.compile('[A-Z2-7]{39}')
+# base32 digits of addresses as digits of `int(..., 32)`
+_BASE32_DIGITS = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', '0123456789abcdefghijklmnopqrstuv')
+
+
+def _address_state(address: str) -> int:
     if len(address) != 39:
-        return AccountValidationState.LENGTH_FAILURE
-    try:
-        raw = b32decode((address + '=').encode())
-        header, ripe, checksum = raw[:1], raw[1:1 + 20], raw[1 + 20:]
-        f_body = (checksum == hashlib.sha3_256(header + ripe).digest()[0:3])
-    except Exception as e:
-        logger.exception(e)
-        return AccountValidationState.CHECKSUM_FAILURE
-    return AccountValidationState.OK if f_body else AccountValidationState.CHECKSUM_FAILURE
+        return _LENGTH_FAILURE
+    # characters outside the alphabet are rejected before decoding, without exceptions
+    if not _BASE32_ADDRESS.fullmatch(address):
+        return _CHECKSUM_FAILURE
+    # 39 characters carry 195 bits, the last 3 of them are padding
+    raw = (int(address.translate(_BASE32_DIGITS), 32) >> 3).to_bytes(24, 'big')
+    return _OK if raw[21:] == hashlib.sha3_256(raw[:21]).digest()[:3] else _CHECKSUM_FAILURE
+
+
+def check_address(address: str) -> AccountValidationState:
+    return ADDRESS_STATES[_address_state(address)]
+
+
+def _check_addresses_chunk(addresses: List[str]) -> bytes:
+    return bytes(map(_address_state, addresses))
+
+
+def check_addresses(addresses: Iterable[str], max_workers: int = 1, chunk_size: int = 10000) -> bytearray:
+    """
+    Checks many addresses
+
+    Parameters
+    ----------
+    addresses
+        Addresses without hyphens
+    max_workers
+        Number of processes, 1 checks in the current process
+    chunk_size
+        Number of addresses sent to a process at a time, a single chunk is checked in the current process
+    Returns
+    -------
+    bytearray
+        A code for each address in the order of `addresses`, the state is `ADDRESS_STATES[code]`, 0 - correct
+    """
+    addresses = list(addresses)
+    if max_workers == 1 or len(addresses) <= chunk_size:
+        return bytearray(_check_addresses_chunk(addresses))
+    chunks = [addresses[i:i + chunk_size] for i in range(0, len(addresses), chunk_size)]
+    states = bytearray()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_states in executor.map(_check_addresses_chunk, chunks):
+            states += chunk_states
+    return states
+
+
+def _public_keys_chunk(task: Tuple[bytes, List[Union[str, bytes]]]) -> List[Optional[str]]:
+    prefix, public_keys = task
+    sha3_256 = hashlib.sha3_256
+    addresses = []
+    for public_key in public_keys:
+        try:
+            raw_key = unhexlify(public_key)
+        except ValueError:
+            raw_key = b''
+        if len(raw_key) != 32:
+            addresses.append(None)
+            continue
+        body = prefix + RIPEMD160.new(sha3_256(raw_key).digest()).digest()
+        addresses.append(b32encode(body + sha3_256(body).digest()[:3]).decode()[:-1])
+    return addresses
+
+
+def public_keys_to_addresses(public_keys: Iterable[Union[str, bytes]],
+                             main_net: bool = False,
+                             prefix: Optional[bytes] = None,
+                             max_workers: int = 1,
+                             chunk_size: int = 10000) -> List[Optional[str]]:
+    """
+    Derives the addresses of many public keys, see `Ed25519.get_address`
+
+    Parameters
+    ----------
+    public_keys
+        Public keys in hex
+    main_net
+        Addresses of the main network, otherwise of the test network
+    prefix
+        Network byte instead of the one of `main_net`
+    max_workers
+        Number of processes, 1 derives in the current process
+    chunk_size
+        Number of keys sent to a process at a time, a single chunk is derived in the current process
+    Returns
+    -------
+    List[Optional[str]]
+        Addresses in the order of `public_keys`, None for incorrect keys
+    """
+    prefix = prefix if prefix is not None else (b'\x68' if main_net else b'\x98')
+    public_keys = list(public_keys)
+    if max_workers == 1 or len(public_keys) <= chunk_size:
+        return _public_keys_chunk((prefix, public_keys))
+    chunks = [(prefix, public_keys[i:i + chunk_size]) for i in range(0, len(public_keys), chunk_size)]
+    addresses = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_addresses in executor.map(_public_keys_chunk, chunks):
+            addresses += chunk_addresses
+    return addresses
+
+
+def _verify_chunk(task: Tuple[str, List[Tuple[bytes, bytes, bytes]]]) -> List[bool]:
+    backend_name, items = task
+    set_backend(backend_name)
+    return backend.verify_many(items)
+
+
+def verify_signatures(items: Iterable[Tuple[bytes, bytes, bytes]],
+                      max_workers: int = 1,
+                      chunk_size: int = 256) -> List[bool]:
+    """
+    Verifies many ed25519 signatures with the selected backend
+
+    Parameters
+    ----------
+    items
+        Triples of the public key, the signed data and the signature as raw bytes
+    max_workers
+        Number of processes, 1 verifies in the current process
+    chunk_size
+        Number of signatures verified together, a single chunk is verified in the current process
+    Returns
+    -------
+    List[bool]
+        Result for each signature in the order of `items`
+    """
+    items = list(items)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if max_workers == 1 or len(chunks) <= 1:
+        return [is_valid for chunk in chunks for is_valid in backend.verify_many(chunk)]
+    result = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_result in executor.map(_verify_chunk, [(backend.name, chunk) for chunk in chunks]):
+            result += chunk_result
+    return result
 
 
 class Ed25519:
@@ -96,10 +243,7 @@ class Ed25519:
 
     def public_key(self, sk):
         """ compute the public key from the secret one """
-        h = self.to_hash(unhexlify(sk))
-        a = self.as_key(h)
-        c = self.outer(self.B, a)
-        return hexlify(self.point_to_bytes(c)).upper()
+        return hexlify(backend.public_key(unhexlify(sk))).upper()
 
     @staticmethod
     def get_address(public_key, main_net=False, prefix=None):
@@ -135,6 +279,48 @@ class Ed25519:
         encrypted_message = ecc.encrypt(unhexlify(_sk), unhexlify(_pk), _message)
         return hexlify(encrypted_message)
 
+    @staticmethod
+    def encrypt_many(private_key: Union[str, bytes],
+                     public_keys: Iterable[Union[str, bytes]],
+                     message: Union[str, bytes],
+                     max_workers: Optional[int] = None,
+                     chunk_size: int = 16) -> List[bytes]:
+        """
+        Encrypts one message for many recipients, the shared secrets are derived in a pool of processes
+
+        Parameters
+        ----------
+        private_key
+            Private key of the sender
+        public_keys
+            Public keys of the recipients
+        message
+            Message to encrypt
+        max_workers
+            Number of processes, by default the number of processors. 1 encrypts in the current process
+        chunk_size
+            Number of recipients sent to a process at a time, a single chunk is encrypted in the current process
+        Returns
+        -------
+        List[bytes]
+            Encrypted messages in hex in the order of `public_keys`, as returned by `encrypt`
+        """
+        _message = Ed25519.str2bytes(message)
+        public_keys = [unhexlify(Ed25519.str2bytes(public_key)) for public_key in public_keys]
+        _sk = unhexlify(Ed25519.str2bytes(private_key))
+        if max_workers == 1 or len(public_keys) <= chunk_size:
+            ecc = SignClass()
+            a = ecc.secret_scalar(_sk)
+            return [hexlify(ecc.encrypt(_sk, public_key, _message, a)) for public_key in public_keys]
+        chunks = [public_keys[i:i + chunk_size] for i in range(0, len(public_keys), chunk_size)]
+        encrypted = []
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_encryptor,
+                                 initargs=(_sk, _message)) as executor:
+            for encrypted_messages in executor.map(_encrypt_chunk, chunks):
+                encrypted += encrypted_messages
+        return encrypted
+
     @staticmethod
     def decrypt(private_key, public_key, msg_hex):
         _msg_hex = Ed25519.str2bytes(msg_hex)
@@ -145,6 +331,48 @@ class Ed25519:
         raw_msg = ecc.decrypt(unhexlify(_sk), unhexlify(_pk), unhexlify(_msg_hex))
         return raw_msg
 
+    @staticmethod
+    def decrypt_many(private_key: Union[str, bytes],
+                     messages: Iterable[Tuple[Union[str, bytes], Union[str, bytes]]],
+                     max_workers: Optional[int] = None,
+                     chunk_size: int = 4) -> List[Optional[bytes]]:
+        """
+        Decrypts many messages, grouped by counterparty so that each key is derived once.
+        Groups are spread across a pool of processes
+
+        Parameters
+        ----------
+        private_key
+            Own private key
+        messages
+            Pairs of the counterparty public key and the encrypted message in hex, as returned by `encrypt`
+        max_workers
+            Number of processes, by default the number of processors. 1 decrypts in the current process
+        chunk_size
+            Number of counterparties sent to a process at a time, a single chunk is decrypted in the current process
+        Returns
+        -------
+        List[Optional[bytes]]
+            Decrypted messages in the order of `messages`, None for messages that cannot be decrypted
+        """
+        _sk = unhexlify(Ed25519.str2bytes(private_key))
+        groups = {}
+        for i, (public_key, msg_hex) in enumerate(messages):
+            groups.setdefault(Ed25519.str2bytes(public_key).upper(), []).append((i, Ed25519.str2bytes(msg_hex)))
+        tasks = [(public_key, [msg_hex for _, msg_hex in group]) for public_key, group in groups.items()]
+        if max_workers == 1 or len(tasks) <= chunk_size:
+            decrypted = [_decrypt_messages(_sk, public_key, group) for public_key, group in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_decryptor,
+                                     initargs=(_sk,)) as executor:
+                decrypted = list(executor.map(_decrypt_group, tasks, chunksize=chunk_size))
+        result: List[Optional[bytes]] = [None] * sum(len(group) for group in groups.values())
+        for group, raw_messages in zip(groups.values(), decrypted):
+            for (i, _), raw_msg in zip(group, raw_messages):
+                result[i] = raw_msg
+        return result
+
     def recover(self, y):
         """ given a value y, recover the preimage x """
         p = (y * y - 1) * self.inverse(self.d * y * y + 1)
@@ -162,42 +390,149 @@ class Ed25519:
     def is_on_curve(self, P):
         return (P.y * P.y - P.x * P.x - 1 - self.d * P.x * P.x * P.y * P.y) % q == 0
 
+    @staticmethod
+    def to_extended(P):
+        return (P.x, P.y, 1, P.x * P.y % q)
+
+    @staticmethod
+    def to_affine(P):
+        (x, y, z, t) = P
+        zi = pow(z, -1, q)
+        return Point(x * zi % q, y * zi % q)
+
     def inner(self, P, Q):
         """ inner product on the curve, between two points """
-        x = (P.x * Q.y + Q.x * P.y) * self.inverse(1 + self.d * P.x * Q.x * P.y * Q.y)
-        y = (P.y * Q.y + P.x * Q.x) * self.inverse(1 - self.d * P.x * Q.x * P.y * Q.y)
-        return Point(x % q, y % q)
+        # extended coordinates without inversions, one inversion to return the affine point
+        return self.to_affine(SignClass().edwards_add(self.to_extended(P), self.to_extended(Q)))
 
     def outer(self, P, n):
         """ outer product on the curve, between a point and a scalar """
         if n == 0:
             return Point(0, 1)
-        Q = self.outer(P, n // 2)
-        Q = self.inner(Q, Q)
-        if n & 1:
-            Q = self.inner(Q, P)
-        return Q
+        ecc = SignClass()
+        if P == self.B:
+            return self.to_affine(ecc.scalarmult_B(n))
+        return self.to_affine(ecc.scalarmult(self.to_extended(P), n))
+
+    def secret_keys(self, count: int) -> List[bytes]:
+        """ pick many random secret keys """
+        return [self.secret_key() for _ in range(count)]
+
+    def public_keys(self, sks: Iterable[Union[str, bytes]]) -> List[bytes]:
+        """ compute the public keys of many secret ones """
+        sks = [unhexlify(sk) for sk in sks]
+        if backend is not PythonBackend:
+            return [hexlify(backend.public_key(sk)).upper() for sk in sks]
+        ecc = SignClass()
+        points = [ecc.scalarmult_B(ecc.secret_scalar(sk)) for sk in sks]
+        return [hexlify(encoded).upper() for encoded in ecc.encodepoints(points)]
 
     def point_to_bytes(self, P):
         return (P.y + ((P.x & 1) << 255)).to_bytes(b // 8, 'little')
 
 
+def _recover_x(y, d, I):
+    xx = (y * y - 1) * pow(d * y * y + 1, q - 2, q)
+    x = pow(xx, (q + 3) // 8, q)
+    if (x * x - xx) % q != 0:
+        x = (x * I) % q
+    if x % 2 != 0:
+        x = q - x
+    return x
+
+
+# curve constants are computed once per process
+_d = -121665 * pow(121666, q - 2, q) % q
+_I = pow(2, (q - 1) // 4, q)
+_By = 4 * pow(5, q - 2, q) % q
+_Bx = _recover_x(_By, _d, _I)
+
+
+class Precomputation:
+    """
+    Tables of `SignClass` shared by all instances of the process.
+    They are built on first use under a lock and can be saved to a compact blob and loaded back,
+    the blob of the `NEMPY_ED25519_TABLES` environment variable is loaded at import
+    """
+
+    MAGIC = b'NPED25519T1'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._Bpow = None
+        self._base_table = None
+
+    @property
+    def Bpow(self):
+        if self._Bpow is None:
+            with self.lock:
+                if self._Bpow is None:
+                    self._Bpow = SignClass().make_Bpow()
+        return self._Bpow
+
+    @property
+    def base_table(self):
+        if self._base_table is None:
+            Bpow = self.Bpow
+            with self.lock:
+                if self._base_table is None:
+                    self._base_table = SignClass().make_base_table(Bpow)
+        return self._base_table
+
+    def to_bytes(self) -> bytes:
+        """The fixed-base table as 32-byte little-endian coordinates after the magic bytes"""
+        return self.MAGIC + b''.join(coordinate.to_bytes(32, 'little')
+                                     for row in self.base_table for point in row for coordinate in point)
+
+    def from_bytes(self, blob: bytes):
+        size = SignClass.BASE_WINDOWS * 8 * 3 * 32
+        if not blob.startswith(self.MAGIC) or len(blob) != len(self.MAGIC) + size:
+            raise ValueError('Invalid ed25519 tables blob')
+        coordinates = [int.from_bytes(blob[i:i + 32], 'little') for i in range(len(self.MAGIC), len(blob), 32)]
+        points = [tuple(coordinates[i:i + 3]) for i in range(0, len(coordinates), 3)]
+        table = [points[i:i + 8] for i in range(0, len(points), 8)]
+        # a damaged or foreign blob is detected by the first point of the table, which is B itself
+        ecc = SignClass()
+        if table[0][0] != ecc.to_precomputed(ecc.B):
+            raise ValueError('Invalid ed25519 tables blob')
+        with self.lock:
+            self._base_table = table
+
+    def save(self, path: str):
+        with open(path, 'wb') as opened_file:
+            opened_file.write(self.to_bytes())
+
+    def load(self, path: str):
+        with open(path, 'rb') as opened_file:
+            self.from_bytes(opened_file.read())
+
+
 class SignClass:
     l = 2 ** 252 + 27742317777372353535851937790883648493
     ident = (0, 1, 1, 0)
-    Bpow = []
+    d = _d
+    I = _I
+    By = _By
+    Bx = _Bx
+    B = (_Bx, _By, 1, _Bx * _By % q)
+    #: radix-16 windows of the fixed-base multiplication, the scalars are reduced modulo l < 2^253
+    BASE_WINDOWS = 64
+    #: window width of the variable-base multiplication
+    WNAF_WIDTH = 5
     MAC_TAG_SIZE = 16
     IV_SIZE = 12
     PLAIN_MESSAGE_SIZE = 1023
 
     def __init__(self):
-        self.d = -121665 * self.inv(121666) % q
-        self.By = 4 * self.inv(5)
-        self.Bx = self.xrecover(self.By)
-        self.B = (self.Bx % q, self.By % q, 1, (self.Bx * self.By) % q)
-        self.I = pow(2, (q - 1) // 4, q)
         self.int2byte = methodcaller("to_bytes", 1, "big")
-        self.Bpow = self.make_Bpow()
+
+    @property
+    def Bpow(self):
+        return precomputation.Bpow
+
+    @property
+    def base_table(self):
+        return precomputation.base_table
 
     def make_Bpow(self):
         P = self.B
@@ -208,6 +543,21 @@ class SignClass:
 
         return Bpow
 
+    def make_base_table(self, Bpow):
+        """
+        Table of the fixed-base multiplication: for each of the 64 radix-16 windows
+        the multiples 1..8 of 16^j * B, where 16^j * B = Bpow[4 * j].
+        Points are stored affine as (y + x, y - x, 2 * d * x * y) for mixed addition
+        """
+        table = []
+        for j in range(self.BASE_WINDOWS):
+            P = Bpow[4 * j]
+            row = [P]
+            for _ in range(7):
+                row.append(self.edwards_add(row[-1], P))
+            table.append([self.to_precomputed(point) for point in row])
+        return table
+
     @staticmethod
     def to_hash(m):
         return hashlib.sha512(m).digest()
@@ -217,19 +567,9 @@ class SignClass:
         """
         $= z^{-1} \\ mod q$, for z != 0
         """
-        # Adapted from curve25519_athlon.c in djb's Curve25519.
-        z2 = z * z % q  # 2
-        z9 = self.pow2(z2, 2) * z % q  # 9
-        z11 = z9 * z2 % q  # 11
-        z2_5_0 = (z11 * z11) % q * z9 % q  # 31 == 2^5 - 2^0
-        z2_10_0 = self.pow2(z2_5_0, 5) * z2_5_0 % q  # 2^10 - 2^0
-        z2_20_0 = self.pow2(z2_10_0, 10) * z2_10_0 % q  # ...
-        z2_40_0 = self.pow2(z2_20_0, 20) * z2_20_0 % q
-        z2_50_0 = self.pow2(z2_40_0, 10) * z2_10_0 % q
-        z2_100_0 = self.pow2(z2_50_0, 50) * z2_50_0 % q
-        z2_200_0 = self.pow2(z2_100_0, 100) * z2_100_0 % q
-        z2_250_0 = self.pow2(z2_200_0, 50) * z2_50_0 % q  # 2^250 - 2^0
-        return self.pow2(z2_250_0, 5) * z11 % q  # 2^255 - 2^5 + 11 = q - 2
+        # the extended Euclidean algorithm of the interpreter is much faster than an addition chain in Python
+        z %= q
+        return pow(z, -1, q) if z else 0
 
     def pow2(self, x, p):
         """== pow(x, 2**p, q)"""
@@ -296,35 +636,177 @@ class SignClass:
         zi = self.inv(z)
         x = (x * zi) % q
         y = (y * zi) % q
-        bits = [(y >> i) & 1 for i in range(b - 1)] + [x & 1]
-        return b''.join([
-            self.int2byte(sum([bits[i * 8 + j] << j for j in range(8)]))
-            for i in range(b // 8)
-        ])
+        # y in the low 255 bits and the parity of x in the top bit
+        return (y | ((x & 1) << (b - 1))).to_bytes(b // 8, 'little')
+
+    def recover_x(self, y):
+        """One of the two x of the curve point with the given y, ValueError if there is no such point"""
+        # the square root of u / v with a single exponentiation, as in RFC 8032
+        yy = y * y % q
+        u = (yy - 1) % q
+        v = (self.d * yy + 1) % q
+        v3 = v * v % q * v % q
+        x = u * v3 % q * pow(u * v3 % q * v3 % q * v % q, (q - 5) // 8, q) % q
+        vxx = v * x % q * x % q
+        if vxx != u:
+            if vxx != (q - u) % q:
+                raise ValueError("decoding point that is not on curve")
+            x = x * self.I % q
+        return x
 
+    @staticmethod
+    def batch_inv(values):
+        """Inverses of many nonzero values with a single inversion (Montgomery's trick)"""
+        prefix = []
+        acc = 1
+        for value in values:
+            prefix.append(acc)
+            acc = acc * value % q
+        acc_inv = pow(acc, -1, q)
+        inverses = [0] * len(values)
+        for i in reversed(range(len(values))):
+            inverses[i] = prefix[i] * acc_inv % q
+            acc_inv = acc_inv * values[i] % q
+        return inverses
+
+    def encodepoints(self, points):
+        """Encodes many points with a single inversion"""
+        encoded = []
+        for (x, y, z, t), zi in zip(points, self.batch_inv([point[2] for point in points])):
+            x = (x * zi) % q
+            y = (y * zi) % q
+            encoded.append((y | ((x & 1) << (b - 1))).to_bytes(b // 8, 'little'))
+        return encoded
 
     def decodepoint(self, s):
-        y = sum(2 ** i * self.bit(s, i) for i in range(0, b - 1))
-        x = self.xrecover(y)
-        if x & 1 != self.bit(s, b - 1):
+        encoded = int.from_bytes(s[:b // 8], 'little')
+        y = encoded & Y_MASK
+        x = self.recover_x(y)
+        if x & 1 != encoded >> (b - 1):
             x = q - x
-        P = (x, y, 1, (x * y) % q)
-        if not self.isoncurve(P):
-            raise ValueError("decoding point that is not on curve")
-        return P
+        return (x, y, 1, (x * y) % q)
+
+    def decodepoints(self, keys):
+        """Decodes many public keys in their order, repeated keys are decoded once"""
+        keys = [bytes(key) for key in keys]
+        decoded = {key: self.decodepoint(key) for key in dict.fromkeys(keys)}
+        return [decoded[key] for key in keys]
 
     def decodeint(self, s):
-        return sum(2 ** i * self.bit(s, i) for i in range(0, b))
+        return int.from_bytes(s[:b // 8], 'little')
+
+    def to_precomputed(self, P):
+        (x, y, z, t) = P
+        zi = self.inv(z)
+        x = x * zi % q
+        y = y * zi % q
+        return ((y + x) % q, (y - x) % q, 2 * self.d * x * y % q)
+
+    @staticmethod
+    def edwards_madd(P, Q):
+        # 'madd-2008-hwcd-3' - addition of a point in the (y + x, y - x, 2 * d * t) form with Z = 1
+        (x1, y1, z1, t1) = P
+        (ypx2, ymx2, t2d2) = Q
+
+        a = (y1 - x1) * ymx2 % q
+        b = (y1 + x1) * ypx2 % q
+        c = t1 * t2d2 % q
+        dd = 2 * z1 % q
+        e = b - a
+        f = dd - c
+        g = dd + c
+        h = b + a
+
+        return (e * f % q, g * h % q, f * g % q, e * h % q)
+
+    @staticmethod
+    def edwards_neg(P):
+        (x, y, z, t) = P
+        return (-x % q, y, z, -t % q)
+
+    def scalarmult_B(self, e):
+        """
+        Fixed-base multiplication e * B with signed radix-16 digits from -7 to 8:
+        one table addition per window and no doublings
+        """
+        e %= self.l
+        table = self.base_table
+        Q = self.ident
+        for j in range(self.BASE_WINDOWS):
+            digit = e & 15
+            e >>= 4
+            if digit > 8:
+                digit -= 16
+                e += 1
+            if digit > 0:
+                Q = self.edwards_madd(Q, table[j][digit - 1])
+            elif digit < 0:
+                ypx, ymx, t2d = table[j][-digit - 1]
+                # the negative point swaps y + x and y - x
+                Q = self.edwards_madd(Q, (ymx, ypx, -t2d % q))
+        return Q
+
+    @staticmethod
+    def wnaf(e, w):
+        """Width-w non-adjacent form of e, the least significant digit first"""
+        digits = []
+        while e > 0:
+            if e & 1:
+                digit = e & ((1 << w) - 1)
+                if digit >= 1 << (w - 1):
+                    digit -= 1 << w
+                e -= digit
+            else:
+                digit = 0
+            digits.append(digit)
+            e >>= 1
+        return digits
 
     def scalarmult(self, P, e):
+        """Variable-base multiplication e * P with the sliding window over the wNAF of e"""
         if e == 0:
             return self.ident
-        Q = self.scalarmult(P, e // 2)
-        Q = self.edwards_double(Q)
-        if e & 1:
-            Q = self.edwards_add(Q, P)
+        # odd multiples P, 3P, ..., (2^(w-1) - 1)P
+        P2 = self.edwards_double(P)
+        odd = [P]
+        for _ in range((1 << (self.WNAF_WIDTH - 2)) - 1):
+            odd.append(self.edwards_add(odd[-1], P2))
+        Q = self.ident
+        for digit in reversed(self.wnaf(e, self.WNAF_WIDTH)):
+            Q = self.edwards_double(Q)
+            if digit > 0:
+                Q = self.edwards_add(Q, odd[digit >> 1])
+            elif digit < 0:
+                Q = self.edwards_add(Q, self.edwards_neg(odd[-digit >> 1]))
         return Q
 
+    def multi_scalarmult(self, pairs):
+        """
+        Sum of e * P for many pairs (P, e) with interleaved wNAF (Straus):
+        the doublings are shared by all points
+        """
+        tables = []
+        nafs = []
+        for P, e in pairs:
+            P2 = self.edwards_double(P)
+            odd = [P]
+            for _ in range((1 << (self.WNAF_WIDTH - 2)) - 1):
+                odd.append(self.edwards_add(odd[-1], P2))
+            tables.append(odd)
+            nafs.append(self.wnaf(e, self.WNAF_WIDTH))
+        Q = self.ident
+        for i in reversed(range(max((len(naf) for naf in nafs), default=0))):
+            Q = self.edwards_double(Q)
+            for odd, naf in zip(tables, nafs):
+                if i < len(naf) and naf[i]:
+                    digit = naf[i]
+                    Q = self.edwards_add(Q, odd[digit >> 1] if digit > 0 else self.edwards_neg(odd[-digit >> 1]))
+        return Q
+
+    @staticmethod
+    def is_identity(P):
+        (x, y, z, t) = P
+        return x % q == 0 and (y - z) % q == 0
 
     def isoncurve(self, P):
         (x, y, z, t) = P
@@ -336,19 +818,21 @@ class SignClass:
     def bit(h, i):
         return (getitem(h, i // 8) >> (i % 8)) & 1
 
-    def derive_shared_secret(self, your_sk: bytes, recipient_pk: bytes):
+    def secret_scalar(self, your_sk: bytes) -> int:
         h = self.to_hash(your_sk)
-        a = 2 ** (b - 2) + sum(2 ** i * self.bit(h, i) for i in range(3, b - 2))
-        A = self.decodepoint(recipient_pk)
-        shared_secret = self.encodepoint(self.scalarmult(A, a))
-        return shared_secret
+        # clamping: bits 3..253 of the hash and the bit 254 set
+        return (int.from_bytes(h[:b // 8], 'little') & SCALAR_MASK) | (1 << (b - 2))
 
-    def encrypt(self, your_sk, recipient_pk, message):
+    def derive_shared_secret(self, your_sk: bytes, recipient_pk: bytes, a: Optional[int] = None):
+        return backend.derive_shared_secret(your_sk, recipient_pk, a)
 
-        shared_secret = self.derive_shared_secret(your_sk, recipient_pk)
+    def derive_key(self, your_sk: bytes, peer_pk: bytes, a: Optional[int] = None) -> bytes:
+        """AES key of the pair of keys, the curve work is done once per pair thanks to `shared_keys`"""
+        if (derived_key := shared_keys.get(your_sk, peer_pk)) is not None:
+            return derived_key
+        shared_secret = self.derive_shared_secret(your_sk, peer_pk, a)
         # salt = os.urandom(32) did not understand why it does not work with not empty salt
         salt = b''
-        iv = os.urandom(12)
         info = b'catapult'
 
         derived_key = HKDF(
@@ -358,28 +842,320 @@ class SignClass:
             info=info,
             backend=default_backend()
         ).derive(shared_secret)
+        shared_keys.put(your_sk, peer_pk, bytearray(derived_key))
+        return derived_key
+
+    def encrypt(self, your_sk, recipient_pk, message, a: Optional[int] = None):
+        derived_key = self.derive_key(your_sk, recipient_pk, a)
+        iv = os.urandom(12)
 
         cipher = AES.new(derived_key, AES.MODE_GCM, iv)
         encrypted_msg, mac_tag = cipher.encrypt_and_digest(message)
         return mac_tag + iv + encrypted_msg
 
     def decrypt(self, your_sk, sender_pk, message):
-        shared_secret = self.derive_shared_secret(your_sk, sender_pk)
-        salt = b''
+        derived_key = self.derive_key(your_sk, sender_pk)
         mac_tag = message[0:self.MAC_TAG_SIZE]
         iv = message[len(mac_tag):len(mac_tag) + self.IV_SIZE]
-        info = b'catapult'
 
         encrypted_msg = message[self.MAC_TAG_SIZE + self.IV_SIZE:]
 
-        derived_key = HKDF(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            info=info,
-            backend=default_backend()
-        ).derive(shared_secret)
-
         cipher = AES.new(derived_key, AES.MODE_GCM, iv)
         plaintext = cipher.decrypt_and_verify(encrypted_msg, mac_tag)
         return plaintext
+
+
+class SharedKeyCache:
+    """
+    Bounded LRU cache of the AES keys derived for pairs of own private key and peer public key.
+    Private keys are not stored, entries are keyed by their fingerprint.
+    Keys are kept in `bytearray` and zeroed on eviction and wipe
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Parameters
+        ----------
+        maxsize
+            Maximum number of cached keys, 0 disables the cache
+        """
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.keys: 'collections.OrderedDict[Tuple[bytes, bytes], bytearray]' = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def fingerprint(private_key: bytes) -> bytes:
+        return hashlib.blake2b(private_key, digest_size=16, person=b'nempy-shared-key').digest()
+
+    def get(self, private_key: bytes, public_key: bytes) -> Optional[bytes]:
+        key = (self.fingerprint(private_key), bytes(public_key))
+        with self.lock:
+            derived_key = self.keys.get(key)
+            if derived_key is None:
+                self.misses += 1
+                return None
+            self.keys.move_to_end(key)
+            self.hits += 1
+            # a copy, so that a concurrent wipe does not zero the key in use
+            return bytes(derived_key)
+
+    def put(self, private_key: bytes, public_key: bytes, derived_key: bytearray):
+        if self.maxsize <= 0:
+            return
+        key = (self.fingerprint(private_key), bytes(public_key))
+        with self.lock:
+            self.keys[key] = derived_key
+            self.keys.move_to_end(key)
+            while len(self.keys) > self.maxsize:
+                _, evicted = self.keys.popitem(last=False)
+                self._zero(evicted)
+
+    def evict(self, private_key: Optional[bytes] = None, public_key: Optional[bytes] = None) -> int:
+        """Removes the keys of own private key and/or peer public key, returns the number of removed keys"""
+        fingerprint = self.fingerprint(private_key) if private_key is not None else None
+        with self.lock:
+            keys = [key for key in self.keys
+                    if (fingerprint is None or key[0] == fingerprint) and (public_key is None or key[1] == public_key)]
+            for key in keys:
+                self._zero(self.keys.pop(key))
+        return len(keys)
+
+    def wipe(self):
+        """Zeroes and removes all keys"""
+        with self.lock:
+            for derived_key in self.keys.values():
+                self._zero(derived_key)
+            self.keys.clear()
+
+    @staticmethod
+    def _zero(derived_key: bytearray):
+        derived_key[:] = bytes(len(derived_key))
+
+
+class PythonBackend:
+    """Curve arithmetic in pure Python, works everywhere"""
+    name = 'python'
+
+    @staticmethod
+    def public_key(private_key: bytes) -> bytes:
+        ecc = SignClass()
+        a = ecc.secret_scalar(private_key)
+        return ecc.encodepoint(ecc.scalarmult_B(a))
+
+    @staticmethod
+    def derive_shared_secret(private_key: bytes, public_key: bytes, a: Optional[int] = None) -> bytes:
+        """Encoded point a * A, where a is the clamped scalar of the private key and A is the public key"""
+        ecc = SignClass()
+        if a is None:
+            a = ecc.secret_scalar(private_key)
+        A = ecc.decodepoint(public_key)
+        return ecc.encodepoint(ecc.scalarmult(A, a))
+
+    @staticmethod
+    def verify_many(items: List[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+        """
+        Verifies signatures together with one multi-scalar multiplication,
+        if the batch fails its halves are verified to find the invalid signatures
+        """
+        ecc = SignClass()
+        parsed = [_parse_signature(ecc, *item) for item in items]
+        valid = [i for i, signature in enumerate(parsed) if signature is not None]
+        result = [False] * len(items)
+        if valid:
+            for i, is_valid in zip(valid, _verify_parsed(ecc, [parsed[i] for i in valid])):
+                result[i] = is_valid
+        return result
+
+
+class NativeBackend(PythonBackend):
+    """
+    Native Ed25519 and X25519 of the `cryptography` package with the same output as `PythonBackend`.
+    The shared secret is a full Edwards point Q = a * A, while X25519 gives only its Montgomery u.
+    A second exchange for the scalar a + 8 (or a - 8, both keep the clamped form) gives u(Q + P)
+    for the known point P = ±8A, and the Okeya-Sakurai formula recovers the sign of x from them.
+    Cases the formula does not cover (points of small order) fall back to Python
+    """
+    name = 'native'
+    #: coefficient A of the Montgomery form of the curve
+    MONTGOMERY_A = 486662
+
+    @staticmethod
+    def public_key(private_key: bytes) -> bytes:
+        if len(private_key) != 32:
+            return PythonBackend.public_key(private_key)
+        native_key = native_ed25519.Ed25519PrivateKey.from_private_bytes(private_key)
+        return native_key.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+    @staticmethod
+    def verify_many(items: List[Tuple[bytes, bytes, bytes]]) -> List[bool]:
+        """Verifies each signature natively, which is faster than the batch equation in Python"""
+        result = []
+        for public_key, message, signature in items:
+            try:
+                native_ed25519.Ed25519PublicKey.from_public_bytes(public_key).verify(signature, message)
+                result.append(True)
+            except (InvalidSignature, ValueError):
+                result.append(False)
+        return result
+
+    @staticmethod
+    def exchange(a: int, u: int) -> Optional[int]:
+        try:
+            native_key = x25519.X25519PrivateKey.from_private_bytes(a.to_bytes(32, 'little'))
+            public_key = x25519.X25519PublicKey.from_public_bytes(u.to_bytes(32, 'little'))
+            return int.from_bytes(native_key.exchange(public_key), 'little')
+        except ValueError:
+            # the result is zero for the points of small order
+            return None
+
+    @staticmethod
+    def derive_shared_secret(private_key: bytes, public_key: bytes, a: Optional[int] = None) -> bytes:
+        ecc = SignClass()
+        if a is None:
+            a = ecc.secret_scalar(private_key)
+        # the public key is decoded for validation as well
+        A = ecc.decodepoint(public_key)
+        step = 8 if (a + 8) >> (b - 1) == 0 else -8
+        P = ecc.edwards_double(ecc.edwards_double(ecc.edwards_double(A)))
+        if step < 0:
+            P = ecc.edwards_neg(P)
+        x_p, y_p, z_p, _ = P
+        z_inv = ecc.inv(z_p)
+        x_p, y_p = x_p * z_inv % q, y_p * z_inv % q
+        if x_p == 0 or A[1] == 1:
+            return PythonBackend.derive_shared_secret(private_key, public_key, a)
+        # Edwards to Montgomery: u = (1 + y) / (1 - y)
+        u_a = (1 + A[1]) * ecc.inv(1 - A[1]) % q
+        u_p = (1 + y_p) * ecc.inv(1 - y_p) % q
+        u = NativeBackend.exchange(a, u_a)
+        u_sum = NativeBackend.exchange(a + step, u_a)
+        if u is None or u_sum is None or u == u_p or (u + 1) % q == 0:
+            return PythonBackend.derive_shared_secret(private_key, public_key, a)
+        # Okeya-Sakurai: v(Q) = n / (2 * v(P)), and with v = sqrt(-486664) * u / x for both points
+        # x(Q) = -486664 * 2 * u(Q) * u(P) / (x(P) * n) without square roots
+        n = ((u_p * u + 1) * (u + u_p + 2 * NativeBackend.MONTGOMERY_A) - 2 * NativeBackend.MONTGOMERY_A
+             - (u - u_p) ** 2 * u_sum) % q
+        if n == 0:
+            return PythonBackend.derive_shared_secret(private_key, public_key, a)
+        x = -486664 * 2 * u * u_p * ecc.inv(x_p * n) % q
+        y = (u - 1) * ecc.inv(u + 1) % q
+        return (y | ((x & 1) << (b - 1))).to_bytes(b // 8, 'little')
+
+
+def _parse_signature(ecc: 'SignClass', public_key: bytes, message: bytes, signature: bytes) -> Optional[tuple]:
+    """Points A and R, scalars S and h of the signature or None if it is malformed"""
+    if len(public_key) != 32 or len(signature) != 64:
+        return None
+    S = int.from_bytes(signature[32:], 'little')
+    if S >= SignClass.l:
+        return None
+    try:
+        A = ecc.decodepoint(public_key)
+        R = ecc.decodepoint(signature[:32])
+    except ValueError:
+        return None
+    h = int.from_bytes(hashlib.sha512(signature[:32] + public_key + message).digest(), 'little') % SignClass.l
+    return A, R, S, h
+
+
+def _batch_equation(ecc: 'SignClass', parsed: List[tuple]) -> bool:
+    """
+    Checks the random linear combination of the equations S * B = R + h * A of all signatures:
+    8 * (sum(z * S) * B - sum(z * R) - sum(z * h * A)) = 0, a forged signature passes with probability 2^-128
+    """
+    zs = [secrets.randbits(128) | 1 for _ in parsed] if len(parsed) > 1 else [1]
+    s_sum = sum(z * S for z, (_, _, S, _) in zip(zs, parsed)) % SignClass.l
+    pairs = []
+    for z, (A, R, _, h) in zip(zs, parsed):
+        pairs.append((ecc.edwards_neg(R), z))
+        pairs.append((ecc.edwards_neg(A), z * h % SignClass.l))
+    T = ecc.edwards_add(ecc.scalarmult_B(s_sum), ecc.multi_scalarmult(pairs))
+    return ecc.is_identity(ecc.edwards_double(ecc.edwards_double(ecc.edwards_double(T))))
+
+
+def _verify_parsed(ecc: 'SignClass', parsed: List[tuple]) -> List[bool]:
+    if _batch_equation(ecc, parsed):
+        return [True] * len(parsed)
+    if len(parsed) == 1:
+        return [False]
+    # halves are checked separately to find the invalid signatures
+    middle = len(parsed) // 2
+    return _verify_parsed(ecc, parsed[:middle]) + _verify_parsed(ecc, parsed[middle:])
+
+
+def set_backend(name: str):
+    """Selects the backend of the curve arithmetic: `native` or `python`"""
+    global backend
+    backends = {PythonBackend.name: PythonBackend}
+    if native_ed25519 is not None:
+        backends[NativeBackend.name] = NativeBackend
+    if name not in backends:
+        raise ValueError(f'Unavailable crypto backend: {name}, available: {", ".join(backends)}')
+    backend = backends[name]
+    logger.debug(f'Crypto backend: {name}')
+
+
+backend = PythonBackend
+set_backend(os.getenv('NEMPY_CRYPTO_BACKEND', NativeBackend.name if native_ed25519 is not None else PythonBackend.name))
+
+# singleton with the tables shared by all `SignClass` instances
+precomputation = Precomputation()
+# singleton with the derived keys of recent counterparties
+shared_keys = SharedKeyCache()
+if (_tables_path := os.getenv('NEMPY_ED25519_TABLES')) and os.path.exists(_tables_path):
+    try:
+        precomputation.load(_tables_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f'Ed25519 tables were not loaded from {_tables_path}: {e}')
+
+# encryptor of the process pool of `Ed25519.encrypt_many`
+_encryptor: Optional[tuple] = None
+
+
+def _init_encryptor(private_key: bytes, message: bytes):
+    global _encryptor
+    ecc = SignClass()
+    # the scalar of the sender is the same for all recipients
+    _encryptor = ecc, private_key, ecc.secret_scalar(private_key), message
+
+
+def _encrypt_chunk(public_keys: List[bytes]) -> List[bytes]:
+    ecc, private_key, a, message = _encryptor
+    return [hexlify(ecc.encrypt(private_key, public_key, message, a)) for public_key in public_keys]
+
+
+# own private key of the process pool of `Ed25519.decrypt_many`
+_decryptor: Optional[bytes] = None
+
+
+def _init_decryptor(private_key: bytes):
+    global _decryptor
+    _decryptor = private_key
+
+
+def _decrypt_group(task: Tuple[bytes, List[bytes]]) -> List[Optional[bytes]]:
+    return _decrypt_messages(_decryptor, *task)
+
+
+def _decrypt_messages(private_key: bytes, public_key: bytes, messages: List[bytes]) -> List[Optional[bytes]]:
+    ecc = SignClass()
+    try:
+        peer_pk = unhexlify(public_key)
+        # the key is derived once and taken from the cache by every message
+        ecc.derive_key(private_key, peer_pk)
+    except ValueError as e:
+        logger.warning(f'Messages of {public_key.decode()} cannot be decrypted: {e}')
+        return [None] * len(messages)
+    decrypted = []
+    for msg_hex in messages:
+        try:
+            decrypted.append(ecc.decrypt(private_key, peer_pk, unhexlify(msg_hex)))
+        except ValueError:
+            # broken hex, a wrong key or a forged MAC tag
+            decrypted.append(None)
+    return decrypted
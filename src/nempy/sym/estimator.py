@@ -0,0 +1,108 @@
+import bisect
+import logging
+import threading
+from collections import deque
+from typing import Optional, Dict
+
+from . import network
+from .constants import Fees, FM
+
+logger = logging.getLogger(__name__)
+
+#: percentile of the fee multipliers of recent blocks for each fee type.
+#: A transaction whose multiplier is not lower than the block multiplier is eligible for the block,
+#: so the percentile is the share of recent blocks that would have included the transaction
+FEE_PERCENTILES = {Fees.SLOWEST: 0.1, Fees.SLOW: 0.35, Fees.AVERAGE: 0.65, Fees.FAST: 0.9}
+
+
+class FeeEstimator:
+    """Estimates fee multipliers from a rolling window of `feeMultiplier` of recent blocks.
+    The window is kept sorted on insertion, so the estimate for each fee type is taken by index without requests.
+    """
+
+    def __init__(self, window: int = 360, min_fee_multiplier: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        window
+            Number of recent blocks taken into account (360 blocks are about 3 hours)
+        min_fee_multiplier
+            The multiplier is never estimated below this value,
+            by default `minFeeMultiplier` of the node from the network context
+        """
+        if window <= 0:
+            raise ValueError('The window must be positive')
+        self.window = window
+        self._min_fee_multiplier = min_fee_multiplier
+        self.blocks = deque()  # multipliers in the order of blocks
+        self.sorted = []  # the same multipliers in ascending order
+        self.last_height = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.blocks)
+
+    @property
+    def min_fee_multiplier(self) -> int:
+        """The floor of the estimates, below it the nodes reject transactions"""
+        if self._min_fee_multiplier is not None:
+            return self._min_fee_multiplier
+        fee_multipliers = network.network_context.fee_multipliers
+        return fee_multipliers[FM.min] if fee_multipliers is not None else 0
+
+    def observe(self, fee_multiplier: int, height: Optional[int] = None):
+        """Adds the fee multiplier of a new block, displacing the oldest one"""
+        with self.lock:
+            if height is not None:
+                if height <= self.last_height:
+                    return
+                self.last_height = height
+            self.blocks.append(fee_multiplier)
+            bisect.insort(self.sorted, fee_multiplier)
+            if len(self.blocks) > self.window:
+                oldest = self.blocks.popleft()
+                del self.sorted[bisect.bisect_left(self.sorted, oldest)]
+
+    def on_block(self, event: dict):
+        """Callback for `Monitor` subscribed to the `block` channel"""
+        block = event['data']['block']
+        self.observe(int(block['feeMultiplier']), int(block['height']))
+
+    def load(self, blocks: Optional[int] = None):
+        """Fills the window with the recent blocks of the selected node"""
+        blocks = blocks or self.window
+        fetched = []
+        page_number = 1
+        while len(fetched) < blocks:
+            page = network.search_blocks(page_size=100, page_number=page_number, order='desc')
+            fetched += page
+            if len(page) < 100:
+                break
+            page_number += 1
+        # from old blocks to new ones
+        for block_info in reversed(fetched[:blocks]):
+            block = block_info['block']
+            self.observe(int(block['feeMultiplier']), int(block['height']))
+        logger.debug(f'Fee estimator loaded {len(fetched[:blocks])} blocks, last height: {self.last_height}')
+
+    def fee_multiplier(self, fee_type: Fees) -> Optional[int]:
+        """Estimated fee multiplier for the fee type or None if there are no blocks yet"""
+        if fee_type == Fees.ZERO:
+            return 0
+        with self.lock:
+            if not self.sorted:
+                return None
+            index = min(int(FEE_PERCENTILES[fee_type] * len(self.sorted)), len(self.sorted) - 1)
+            fee_multiplier = self.sorted[index]
+        # the network context is not read under the lock, it may request the node
+        return max(fee_multiplier, self.min_fee_multiplier)
+
+    def fee_multipliers(self) -> Dict[Fees, Optional[int]]:
+        return {fee_type: self.fee_multiplier(fee_type) for fee_type in Fees}
+
+    def calc_max_fee(self, transaction_size: int, fee_type: Fees) -> Optional[int]:
+        """Fee for the transaction of the given size or None if there are no blocks yet"""
+        fee_multiplier = self.fee_multiplier(fee_type)
+        if fee_multiplier is None:
+            return None
+        return fee_multiplier * transaction_size
@@ -1,22 +1,26 @@
 import asyncio
 import datetime
+import hashlib
 import json
 import logging
 import multiprocessing
+import os
 import threading
 import time
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from base64 import b32encode
 from binascii import unhexlify
 from http import HTTPStatus
-from typing import Optional, Union, List, Callable, Dict
+from typing import Optional, Union, List, Callable, Dict, Iterable
 from urllib.parse import urlparse
 from requests.exceptions import RequestException
 
 import requests
 import websockets
 from nempy.sym.constants import BlockchainStatuses, EPOCH_TIME_TESTNET, EPOCH_TIME_MAINNET, NetworkType, \
-    TransactionTypes, AccountValidationState
+    TransactionTypes, AccountValidationState, ExecutorTypes, OverflowPolicies
 from pydantic import BaseModel, StrictInt, StrictFloat
 from symbolchain.core.CryptoTypes import Hash256
 from symbolchain.core.facade.SymFacade import SymFacade
@@ -25,6 +29,7 @@ from websockets import exceptions
 
 from . import ed25519, constants, config
 from .constants import TransactionStatus
+from .dispatcher import Dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -96,9 +101,12 @@ def mosaic_id_to_name_n_real(mosaic_id: str, amount: int) -> Dict[str, float]:
 class Meta(BaseModel):
     """Transaction meta information"""
     height: int
-    hash: str
-    merkleComponentHash: str
+    hash: Optional[str] = None
+    merkleComponentHash: Optional[str] = None
     index: int
+    # only for transactions embedded in aggregates
+    aggregateHash: Optional[str] = None
+    aggregateId: Optional[str] = None
 
 
 class MosaicInfo(BaseModel):
@@ -111,25 +119,31 @@ class MosaicInfo(BaseModel):
 
 
 class TransactionInfo(BaseModel):
-    """Contains information about transactions of the blockchain network"""
-    size: int
-    signature: str
+    """Contains information about transactions of the blockchain network.
+    Embedded transactions have no size, signature, fee and deadline of their own"""
+    size: Optional[int] = None
+    signature: Optional[str] = None
     signerPublicKey: str
     version: int
     network: int
     type: Union[int, str]
-    maxFee: int
-    deadline: Union[int, datetime.datetime]
+    maxFee: Optional[int] = None
+    deadline: Optional[Union[int, datetime.datetime]] = None
     recipientAddress: str
     message: Optional[str]
     signer_address: Optional[str]
     mosaics: List[MosaicInfo]
+    is_encrypted: bool = False
 
     def humanization(self):
         """Converts information from the blockchain into a readable form"""
-        self.deadline = Timing().deadline_to_date(self.deadline)
+        if self.deadline is not None:
+            self.deadline = Timing().deadline_to_date(self.deadline)
         if self.message is not None:
-            self.message = unhexlify(self.message)[1:].decode('utf-8')
+            message = unhexlify(self.message)
+            # encrypted messages stay in hex, see `decrypt_messages`
+            self.is_encrypted = message[:1] == b'\x01'
+            self.message = message[1:].decode('utf-8')
         self.recipientAddress = b32encode(unhexlify(self.recipientAddress)).decode('utf-8')[:-1]
         self.mosaics = [MosaicInfo(**mosaic_id_to_name_n_real(mosaic.id, mosaic.amount)) for mosaic in self.mosaics]
         self.type = TransactionTypes.get_type_by_id(self.type).name
@@ -153,8 +167,9 @@ class TransactionResponse(BaseModel):
         mosaics = '\n'.join(mosaics)
         prepare.append(['Type:', self.transaction.type.title()])
         prepare.append(['Status:', self.status.title()])
-        prepare.append(['Hash:', f'{test_net_explorer}{self.meta.hash}'])
-        prepare.append(['Paid Fee:', f'{self.transaction.maxFee / 1000000}(XYM)'])
+        prepare.append(['Hash:', f'{test_net_explorer}{self.meta.hash or self.meta.aggregateHash}'])
+        if self.transaction.maxFee is not None:
+            prepare.append(['Paid Fee:', f'{self.transaction.maxFee / 1000000}(XYM)'])
         prepare.append(['Height:', self.meta.height])
         prepare.append(['Deadline:', self.transaction.deadline])
         prepare.append(['Signature:', self.transaction.signature])
@@ -233,6 +248,57 @@ def get_accounts_info(address: str) -> Optional[dict]:
         return answer.json()
 
 
+def _get_accounts_infos(addresses: List[str], url: str) -> List[dict]:
+    headers = {'Content-type': 'application/json'}
+    try:
+        answer = requests.post(f'{url}/accounts', json={'addresses': addresses}, headers=headers, timeout=10)
+        if answer.status_code != HTTPStatus.OK:
+            raise SymbolNetworkException(**answer.json())
+    except (RequestException, SymbolNetworkException) as e:
+        logger.exception(e)
+        raise
+    return answer.json()
+
+
+def get_accounts_infos(addresses: Iterable[str],
+                       chunk_size: int = 100,
+                       max_workers: int = 8) -> Dict[str, dict]:
+    """
+    Gets information about many accounts with the bulk `POST /accounts` request
+
+    Parameters
+    ----------
+    addresses
+        Account addresses
+    chunk_size
+        Number of addresses in one request
+    max_workers
+        Number of requests executed concurrently
+    Returns
+    -------
+    Dict[str, dict]
+        Account information by address, as returned by `get_accounts_info`.
+        Accounts unknown to the network are missing
+    """
+    addresses = list(dict.fromkeys(address.replace('-', '') for address in addresses))
+    for address, state in zip(addresses, ed25519.check_addresses(addresses)):
+        if state:
+            raise SymbolNetworkException('InvalidAddress',
+                                         f'Incorrect account address: `{address}`: {ed25519.ADDRESS_STATES[state]}')
+    if not addresses:
+        return {}
+    chunks = [addresses[i:i + chunk_size] for i in range(0, len(addresses), chunk_size)]
+    url = node_selector.url
+    infos = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for accounts in executor.map(lambda chunk: _get_accounts_infos(chunk, url), chunks):
+            for account_info in accounts:
+                # the node returns the raw address in hex
+                address = b32encode(unhexlify(account_info['account']['address'])).decode('utf-8')[:-1]
+                infos[address] = account_info
+    return infos
+
+
 def search_transactions(address: Optional[str] = None,
                         recipient_address: Optional[str] = None,
                         signer_public_key: Optional[str] = None,
@@ -248,7 +314,9 @@ def search_transactions(address: Optional[str] = None,
                         page_number: int = 1,
                         offset: Optional[str] = None,
                         order: str = 'desc',
-                        transaction_status: TransactionStatus = TransactionStatus.CONFIRMED_ADDED
+                        transaction_status: TransactionStatus = TransactionStatus.CONFIRMED_ADDED,
+                        humanization: bool = True,
+                        directory: Optional['PublicKeyDirectory'] = None
                         ) -> Optional[list]:
     params = {
         'address': address,
@@ -290,10 +358,74 @@ def search_transactions(address: Optional[str] = None,
                                            )
         _transaction.status = transaction_status.value
         transactions_response.append(_transaction)
-        _transaction.transaction.humanization()
+        if humanization:
+            _transaction.transaction.humanization()
+    if directory is not None:
+        # signers are collected only on request, deriving their addresses is not free
+        directory.on_transactions(transactions_response)
     return transactions_response
 
 
+def decrypt_messages(private_key: str,
+                     transactions: List[TransactionResponse],
+                     max_workers: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Decrypts the encrypted messages of the transactions of the account, for example of `search_transactions`.
+    Messages are grouped by counterparty: the signer of incoming transactions and the recipient of outgoing ones,
+    so each key is derived once, the groups are decrypted in a pool of processes
+
+    Parameters
+    ----------
+    private_key
+        Private key of the account
+    transactions
+        Transactions with or without humanization
+    max_workers
+        Number of processes, by default the number of processors
+    Returns
+    -------
+    List[Optional[str]]
+        Decrypted messages in the order of `transactions`,
+        None for plain messages and messages that cannot be decrypted
+    """
+    own_public_key = ed25519.Ed25519().public_key(private_key).decode()
+    encrypted = []
+    for i, transaction in enumerate(transactions):
+        info = transaction.transaction
+        if info.message is None:
+            continue
+        if info.is_encrypted:
+            msg_hex = info.message
+        elif info.message[:2] == '01':
+            msg_hex = unhexlify(info.message)[1:].decode('utf-8', errors='replace')
+        else:
+            continue
+        if info.signerPublicKey.upper() != own_public_key:
+            encrypted.append((i, info.signerPublicKey, msg_hex))
+            continue
+        recipient_address = info.recipientAddress
+        if len(recipient_address) != 39:
+            # the raw address in hex without humanization
+            recipient_address = b32encode(unhexlify(recipient_address)).decode('utf-8')[:-1]
+        encrypted.append((i, recipient_address, msg_hex))
+    # public keys of the recipients of outgoing messages
+    recipients = {counterparty for _, counterparty, _ in encrypted if len(counterparty) == 39}
+    if recipients:
+        public_keys.prefetch(recipients)
+    messages = []
+    for i, counterparty, msg_hex in encrypted:
+        public_key = public_keys.get(counterparty) if counterparty in recipients else counterparty
+        if public_key is not None:
+            messages.append((i, public_key, msg_hex))
+    decrypted = ed25519.Ed25519.decrypt_many(private_key, [(public_key, msg_hex) for _, public_key, msg_hex in messages],
+                                             max_workers=max_workers)
+    result: List[Optional[str]] = [None] * len(transactions)
+    for (i, _, _), raw_msg in zip(messages, decrypted):
+        if raw_msg is not None:
+            result[i] = raw_msg.decode('utf-8', errors='replace')
+    return result
+
+
 def get_namespace_info(namespace_id: str) -> Optional[dict]:
     endpoint = f'{node_selector.url}/namespaces/{namespace_id}'
     try:
@@ -336,32 +468,102 @@ def check_transaction_state(transaction_hash):
         return status
 
 
-def get_network_properties():
-    answer = requests.get(f'{node_selector.url}/network/properties')
+class TransactionStatusInfo(BaseModel):
+    """Transaction status from the bulk `/transactionStatus` request"""
+    hash: str
+    group: TransactionStatus
+    code: Optional[str] = None
+    deadline: Optional[int] = None
+    height: Optional[int] = None
+
+
+def _get_transaction_statuses(hashes: List[str], url: str) -> List[dict]:
+    headers = {'Content-type': 'application/json'}
+    try:
+        answer = requests.post(f'{url}/transactionStatus', json={'hashes': hashes}, headers=headers, timeout=10)
+        if answer.status_code != HTTPStatus.OK:
+            raise SymbolNetworkException(**answer.json())
+    except (RequestException, SymbolNetworkException) as e:
+        logger.exception(e)
+        raise
+    return answer.json()
+
+
+def check_transaction_states(hashes: Iterable[str],
+                             chunk_size: int = 100,
+                             max_workers: int = 8,
+                             url: Optional[str] = None) -> Dict[str, TransactionStatusInfo]:
+    """
+    Determines the statuses of many transactions with the bulk `/transactionStatus` request
+
+    Parameters
+    ----------
+    hashes
+        Transaction hashes as string hexadecimal representation
+    chunk_size
+        Number of hashes in one request
+    max_workers
+        Number of requests executed concurrently
+    url
+        Node to request, by default the selected node
+    Returns
+    -------
+    Dict[str, TransactionStatusInfo]
+        Statuses by transaction hash. Hashes unknown to the node have the `TransactionStatus.NOT_FOUND` group
+    """
+    hashes = list(dict.fromkeys(entity_hash.upper() for entity_hash in hashes))
+    for entity_hash in hashes:
+        if not ed25519.check_hex(entity_hash, constants.HexSequenceSizes.TRANSACTION_HASH):
+            raise SymbolNetworkException('InvalidArgument', f'Transaction hash `{entity_hash}` has an invalid format')
+    states = {entity_hash: TransactionStatusInfo(hash=entity_hash, group=TransactionStatus.NOT_FOUND)
+              for entity_hash in hashes}
+    if not hashes:
+        return states
+    chunks = [hashes[i:i + chunk_size] for i in range(0, len(hashes), chunk_size)]
+    # the node is selected once so that all chunks are answered by the same node
+    url = url or node_selector.url
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for statuses in executor.map(lambda chunk: _get_transaction_statuses(chunk, url), chunks):
+            for status in statuses:
+                info = TransactionStatusInfo(**status)
+                states[info.hash.upper()] = info
+    return states
+
+
+def get_network_properties(url: Optional[str] = None):
+    answer = requests.get(f'{url or node_selector.url}/network/properties')
     if answer.status_code == HTTPStatus.OK:
         network_properties = answer.json()
         return network_properties
     answer.raise_for_status()
 
 
-def get_node_network():
+def get_node_info(url: Optional[str] = None) -> Optional[dict]:
     try:
-        answer = requests.get(f'{node_selector.url}/node/info')
+        answer = requests.get(f'{url or node_selector.url}/node/info')
     except RequestException as e:
         logger.exception(e)
         raise
     if answer.status_code == HTTPStatus.OK:
-        fee_info = answer.json()
-        network_generation_hash_seed = fee_info['networkGenerationHashSeed']
-        if network_generation_hash_seed == constants.NETWORK_GENERATION_HASH_SEED_TEST:
-            return NetworkType.TEST_NET
-        elif network_generation_hash_seed == constants.NETWORK_GENERATION_HASH_SEED_PUBLIC:
-            return NetworkType.MAIN_NET
-        else:
-            return None
+        node_info = answer.json()
+        return node_info
     answer.raise_for_status()
 
 
+def network_type_by_seed(network_generation_hash_seed: str) -> Optional[NetworkType]:
+    if network_generation_hash_seed == constants.NETWORK_GENERATION_HASH_SEED_TEST:
+        return NetworkType.TEST_NET
+    elif network_generation_hash_seed == constants.NETWORK_GENERATION_HASH_SEED_PUBLIC:
+        return NetworkType.MAIN_NET
+    return None
+
+
+def get_node_network():
+    node_info = get_node_info()
+    if node_info is not None:
+        return network_type_by_seed(node_info['networkGenerationHashSeed'])
+
+
 def get_block_information(height: int):
     answer = requests.get(f'{node_selector.url}/blocks/{height}')
     if answer.status_code == HTTPStatus.OK:
@@ -370,9 +572,28 @@ def get_block_information(height: int):
     answer.raise_for_status()
 
 
-def get_fee_multipliers():
+def search_blocks(from_height: Optional[int] = None,
+                  to_height: Optional[int] = None,
+                  page_size: int = 100,
+                  page_number: int = 1,
+                  order: str = 'desc') -> List[dict]:
+    params = {
+        'fromHeight': from_height,
+        'toHeight': to_height,
+        'pageSize': page_size,
+        'pageNumber': page_number,
+        'order': order
+    }
+    payload = {key: val for key, val in params.items() if val is not None}
+    answer = requests.get(f'{node_selector.url}/blocks', params=payload)
+    if answer.status_code == HTTPStatus.OK:
+        return answer.json()['data']
+    answer.raise_for_status()
+
+
+def get_fee_multipliers(url: Optional[str] = None):
     try:
-        answer = requests.get(f'{node_selector.url}/network/fees/transaction')
+        answer = requests.get(f'{url or node_selector.url}/network/fees/transaction')
     except RequestException as e:
         logger.exception(e)
         return None
@@ -463,49 +684,227 @@ class Monitor:
                  subscribers: List[str],
                  formatting: bool = False,
                  log: str = '',
-                 callback: Optional[Callable] = None):
+                 callback: Optional[Callable] = None,
+                 executor: ExecutorTypes = ExecutorTypes.THREAD,
+                 max_queue_size: int = 1000,
+                 overflow_policy: OverflowPolicies = OverflowPolicies.BLOCK,
+                 spill_path: Optional[str] = None,
+                 workers: int = 1):
+        """
+        Parameters
+        ----------
+        url
+            URL node in the form of http://ngl-dual-001.testnet.symboldev.network:3000
+        subscribers
+            Channels to subscribe to, for example `block` or `confirmedAdded/<address>`
+        formatting
+            Formatted output
+        log
+            Path to the log file
+        callback
+            Event handler, by default events are printed and written to the log.
+            Events are passed to it through a bounded queue, so a slow handler does not stall receiving
+            from the websocket
+        executor
+            Where the handler is executed: in a pool of threads (default), in a pool of processes
+            or in the event loop (`ExecutorTypes.INLINE`, blocks receiving while the handler works)
+        max_queue_size
+            Maximum number of events waiting for processing
+        overflow_policy
+            What to do with a new event when the queue is full: wait for free space,
+            drop the oldest event or spill events to disk
+        spill_path
+            Path to the spill file, by default a temporary file is used
+        workers
+            Number of parallel handlers for thread and process executors
+        """
         self.url = url
         self.subscribers = subscribers
         self.formatting = formatting
         self.log = log
-        self.callback = callback
+        if callback is None and executor == ExecutorTypes.PROCESS:
+            raise ValueError('The default output cannot be executed in a pool of processes, specify a callback')
+        self.callback = callback if callback is not None else self.output
+        self.dispatcher = Dispatcher(self.callback, executor, max_queue_size, overflow_policy, spill_path, workers)
         loop = asyncio.get_event_loop()
         loop.run_until_complete(self.monitoring())
 
-    async def monitoring(self):
-        result = urlparse(self.url)
-        url = f"ws://{result.hostname}:{result.port}/ws"
+    @staticmethod
+    def ws_url(url: str) -> str:
+        result = urlparse(url)
+        return f"ws://{result.hostname}:{result.port}/ws"
+
+    async def subscribe(self, ws) -> bool:
+        """Subscribes the connection to the channels, returns False if the node did not issue a UID"""
+        response = json.loads(await ws.recv())
+        if not isinstance(response, dict) or 'uid' not in response:
+            return False
+        logger.debug(f'UID: {response["uid"]}')
+        prepare = []
+        for subscriber in self.subscribers:
+            added = json.dumps({"uid": response["uid"], "subscribe": f"{subscriber}"})
+            await ws.send(added)
+            # print(f'Subscribed to: {subscriber}')
+            prepare.append([subscriber])
+        table = tabulate(prepare, headers=['Subscribers'], tablefmt='grid')
+        print(table)
+        return True
+
+    async def emit(self, res: str):
+        """Passes the received event to the handler"""
+        await self.dispatcher.put(json.loads(res))
+
+    def output(self, event: dict):
+        """The default handler: prints the event and writes it to the log"""
+        res = json.dumps(event, indent=4 if self.formatting else None)
+        print(res)
+        if self.log:
+            with open(self.log, 'a+') as f:
+                res += '\n'
+                f.write(res)
+
+    async def listening(self):
+        url = self.ws_url(self.url)
         print(f'MONITORING: {url}')
         try:
             async with websockets.connect(url) as ws:
-                response = json.loads(await ws.recv())
-                print(f'UID: {response["uid"]}')
-                if 'uid' in response:
-                    prepare = []
-                    for subscriber in self.subscribers:
-                        added = json.dumps({"uid": response["uid"], "subscribe": f"{subscriber}"})
-                        await ws.send(added)
-                        # print(f'Subscribed to: {subscriber}')
-                        prepare.append([subscriber])
-                    table = tabulate(prepare, headers=['Subscribers'], tablefmt='grid')
-                    print(table)
+                if await self.subscribe(ws):
                     print('Listening... `Ctrl+C` for abort')
                     while True:
-                        res = await ws.recv()
-                        if self.formatting:
-                            res = json.dumps(json.loads(res), indent=4)
-                        if self.callback is not None:
-                            self.callback(json.loads(res))
-                            continue
-                        print(res)
-                        if self.log:
-                            with open(self.log, 'a+') as f:
-                                res += '\n'
-                                f.write(res)
+                        await self.emit(await ws.recv())
         except exceptions.WebSocketException as e:
             logger.exception(e)
             raise
 
+    async def monitoring(self):
+        dispatching = asyncio.create_task(self.dispatcher.start().run())
+        try:
+            await self.listening()
+        finally:
+            dispatching.cancel()
+            await asyncio.gather(dispatching, return_exceptions=True)
+            logger.debug(f'Dispatcher metrics: {self.dispatcher.metrics}')
+
+
+class NodeArrivalStats(BaseModel):
+    """Statistics of event arrivals from one node of the redundant monitoring"""
+    url: str
+    is_connected: bool = False
+    reconnects: int = 0
+    events: int = 0  #: events received from the node
+    first: int = 0  #: events for which the node was the first
+    average_lag: float = 0.0  #: seconds behind the first arrival of the same event
+    max_lag: float = 0.0
+
+    def add_lag(self, lag: float):
+        self.events += 1
+        if lag == 0:
+            self.first += 1
+        self.max_lag = max(self.max_lag, lag)
+        self.average_lag += (lag - self.average_lag) / self.events
+
+
+class RedundantMonitor(Monitor):
+    """Subscribes to the same channels on several nodes at once.
+    Events are deduplicated by topic and hash and emitted on the first arrival,
+    so the handler gets the earliest of the nodes and the monitoring survives the loss of a node.
+    """
+
+    def __init__(self,
+                 urls: List[str],
+                 subscribers: List[str],
+                 formatting: bool = False,
+                 log: str = '',
+                 callback: Optional[Callable] = None,
+                 history_size: int = 10000,
+                 reconnect_delay: float = 3,
+                 **dispatcher_params):
+        """
+        Parameters
+        ----------
+        urls
+            Node URLs in the form of http://ngl-dual-001.testnet.symboldev.network:3000
+        history_size
+            Number of recent events remembered for deduplication
+        reconnect_delay
+            Delay in seconds before reconnecting to a lost node
+        dispatcher_params
+            `executor`, `max_queue_size`, `overflow_policy`, `spill_path` and `workers` as for `Monitor`
+        """
+        for url in urls:
+            url_validation(url)
+        self.urls = urls
+        self.history_size = history_size
+        self.reconnect_delay = reconnect_delay
+        self.history: 'OrderedDict[str, float]' = OrderedDict()
+        self.stats: Dict[str, NodeArrivalStats] = {url: NodeArrivalStats(url=url) for url in urls}
+        super().__init__(urls[0], subscribers, formatting, log, callback, **dispatcher_params)
+
+    @staticmethod
+    def event_key(event: dict) -> str:
+        """Identifies the event by topic and transaction or block hash"""
+        topic = event.get('topic', '')
+        data = event.get('data', {})
+        entity_hash = data.get('meta', {}).get('hash') or data.get('hash')
+        if topic.startswith('cosignature/'):
+            entity_hash = f'{data.get("parentHash")}:{data.get("signerPublicKey")}'
+        if entity_hash is None:
+            entity_hash = hashlib.sha3_256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        return f'{topic}:{entity_hash}'
+
+    def arrival(self, url: str, event: dict) -> bool:
+        """Registers the arrival of the event from the node, returns True if the event arrived for the first time"""
+        key = self.event_key(event)
+        now = time.time()
+        first_arrival = self.history.get(key)
+        if first_arrival is None:
+            self.history[key] = now
+            if len(self.history) > self.history_size:
+                self.history.popitem(last=False)
+            self.stats[url].add_lag(0)
+            return True
+        self.stats[url].add_lag(now - first_arrival)
+        return False
+
+    async def listening_node(self, url: str):
+        stats = self.stats[url]
+        while True:
+            try:
+                async with websockets.connect(self.ws_url(url)) as ws:
+                    print(f'MONITORING: {url}')
+                    if not await self.subscribe(ws):
+                        raise exceptions.InvalidMessage(f'The node {url} did not issue a UID')
+                    stats.is_connected = True
+                    while True:
+                        res = await ws.recv()
+                        event = json.loads(res)
+                        if not isinstance(event, dict):
+                            raise exceptions.InvalidMessage(f'Unexpected frame from {url}: {res}')
+                        if self.arrival(url, event):
+                            await self.emit(res)
+            except (exceptions.WebSocketException, OSError, KeyError, json.JSONDecodeError) as e:
+                # a misbehaving node is reconnected without stopping the others
+                logger.warning(f'Connection to {url} lost: {e}')
+            finally:
+                stats.is_connected = False
+            stats.reconnects += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def listening(self):
+        print('Listening... `Ctrl+C` for abort')
+        try:
+            await asyncio.gather(*[self.listening_node(url) for url in self.urls])
+        finally:
+            print(self.report())
+
+    def report(self) -> str:
+        """Table of the per-node arrival statistics"""
+        prepare = [[stats.url, stats.is_connected, stats.events, stats.first,
+                    f'{stats.average_lag * 1000:.1f}', f'{stats.max_lag * 1000:.1f}', stats.reconnects]
+                   for stats in self.stats.values()]
+        headers = ['Node', 'Connected', 'Events', 'First', 'Avg lag (ms)', 'Max lag (ms)', 'Reconnects']
+        return tabulate(prepare, headers=headers, tablefmt='grid')
+
 
 class Timing:
     """Works with network time"""
@@ -536,6 +935,11 @@ class Timing:
         deadline = int(td.total_seconds() * 1000)
         return deadline
 
+    def now(self) -> int:
+        """Current network time in milliseconds, the same scale as transaction deadlines"""
+        td = datetime.datetime.now(tz=datetime.timezone.utc) - self.epoch_time
+        return int(td.total_seconds() * 1000)
+
     def deadline_to_date(self, deadline: int, is_local: bool = False) -> datetime:
         def utc2local(utc):
             utc_epoch = time.mktime(utc.timetuple())
@@ -819,5 +1223,270 @@ class NodeSelector:
         return float(s_runtime)
 
 
+class NetworkContext:
+    """Network metadata required to build transactions: network type, generation hash seed,
+    `SymFacade`, fee multipliers and limits of aggregates. Loaded on first use and refreshed in the background every `ttl` seconds,
+    so that creating transactions does not make requests to the node.
+    It is reloaded on the spot if the selected node has changed.
+    """
+
+    def __init__(self, ttl: int = 60):
+        self.ttl = ttl
+        self.thread = Thread()
+        self.lock = threading.Lock()
+        self.url: Optional[str] = None
+        self.updated_at: float = 0
+        self.is_offline = False
+        self._network_type: Optional[NetworkType] = None
+        self._generation_hash_seed: Optional[str] = None
+        self._sym_facade: Optional[SymFacade] = None
+        self._fee_multipliers: Optional[dict] = None
+        self._max_transactions_per_aggregate: Optional[int] = None
+
+    @property
+    def network_type(self) -> NetworkType:
+        self.actualize()
+        return self._network_type
+
+    @property
+    def generation_hash_seed(self) -> str:
+        self.actualize()
+        return self._generation_hash_seed
+
+    @property
+    def sym_facade(self) -> SymFacade:
+        self.actualize()
+        return self._sym_facade
+
+    @property
+    def fee_multipliers(self) -> Optional[dict]:
+        self.actualize()
+        return self._fee_multipliers
+
+    @property
+    def max_transactions_per_aggregate(self) -> int:
+        """`maxTransactionsPerAggregate` of the network, the default of the protocol if it is not known (offline)"""
+        self.actualize()
+        return self._max_transactions_per_aggregate or constants.TransactionMetrics.MAX_TRANSACTIONS_PER_AGGREGATE
+
+    def actualize(self):
+        """Loads the context if it is missing, outdated or belongs to another node"""
+        if self.is_offline:
+            return
+        url = node_selector.url
+        # the background refresh keeps the data fresh, twice the TTL means it has stopped working
+        if url != self.url or time.time() - self.updated_at > self.ttl * 2 or not self.thread.is_started:
+            with self.lock:
+                if url != self.url or time.time() - self.updated_at > self.ttl * 2:
+                    self.update(url)
+                # checked under the lock, so that concurrent first calls start only one refresh thread
+                if not self.thread.is_started:
+                    self.thread.start(self.context_actualizer, interval=self.ttl)
+
+    def update(self, url: str):
+        node_info = get_node_info(url)
+        if node_info is None:
+            raise EnvironmentError(f'Failed to get node information from {url}')
+        generation_hash_seed = node_info['networkGenerationHashSeed']
+        network_type = network_type_by_seed(generation_hash_seed)
+        if network_type is None:
+            raise EnvironmentError('It is not possible to determine the type of network')
+        if network_type != self._network_type:
+            self._sym_facade = SymFacade(network_type.value)
+        self._network_type = network_type
+        self._generation_hash_seed = generation_hash_seed
+        fee_multipliers = get_fee_multipliers(url)
+        if fee_multipliers is not None:
+            self._fee_multipliers = fee_multipliers
+        if url != self.url or self._max_transactions_per_aggregate is None:
+            # chain properties do not change, they are requested once for each node
+            self._max_transactions_per_aggregate = self.load_max_transactions_per_aggregate(url)
+        self.url = url
+        self.updated_at = time.time()
+        logger.debug(f'Network context updated from {url}: {network_type.name}')
+
+    @staticmethod
+    def load_max_transactions_per_aggregate(url: str) -> Optional[int]:
+        try:
+            properties = get_network_properties(url)
+            # numbers of the node configuration have thousands separators: "1'000"
+            value = properties['plugins']['aggregate']['maxTransactionsPerAggregate']
+            return int(str(value).replace("'", ''))
+        except (RequestException, KeyError, TypeError, ValueError) as e:
+            logger.warning(f'Failed to get the aggregate limits from {url}: {e}')
+            return None
+
+    def context_actualizer(self, interval, stop_event, updated):
+        while not stop_event.wait(interval):
+            try:
+                with self.lock:
+                    self.update(node_selector.url)
+            except (RequestException, EnvironmentError) as e:
+                logger.warning(f'Network context was not updated: {e}')
+            updated.set()
+
+    def set_offline(self, network_type: NetworkType, generation_hash_seed: str, fee_multipliers: dict):
+        """Switches the context to the given data without any requests to the node, see `offline.load_snapshot`"""
+        self.thread.stop()
+        with self.lock:
+            self.is_offline = True
+            self._network_type = network_type
+            self._generation_hash_seed = generation_hash_seed
+            self._sym_facade = SymFacade(network_type.value)
+            self._fee_multipliers = fee_multipliers
+            self._max_transactions_per_aggregate = None
+        logger.debug(f'Network context is offline: {network_type.name}')
+
+    def reset(self):
+        """Forgets the loaded data and stops the background refresh"""
+        self.thread.stop()
+        with self.lock:
+            self.is_offline = False
+            self.url = None
+            self.updated_at = 0
+            self._network_type = None
+            self._generation_hash_seed = None
+            self._sym_facade = None
+            self._fee_multipliers = None
+            self._max_transactions_per_aggregate = None
+
+
+class PublicKeyDirectory:
+    """Directory of known public keys by address.
+    A public key never changes once the account has sent a transaction, so it is requested at most once.
+    The directory is filled from account lookups, from signers of `search_transactions(..., directory=...)` results
+    and from `Monitor` events, and can be persisted to a JSON file between runs.
+    """
+
+    # the node returns zeros for accounts that have not yet sent transactions
+    UNKNOWN_PUBLIC_KEY = '0' * 64
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.public_keys: Dict[str, str] = {}
+        self.is_changed = False
+        self._facades: Dict[int, SymFacade] = {}
+
+    def __len__(self):
+        return len(self.public_keys)
+
+    def __contains__(self, address: str) -> bool:
+        return address.replace('-', '') in self.public_keys
+
+    def get(self, address: str) -> Optional[str]:
+        """Public key from the directory without requests to the node"""
+        return self.public_keys.get(address.replace('-', ''))
+
+    def address(self, public_key: str, network_id: int) -> str:
+        """Address of the public key for the network identifier (`network` field of transactions and blocks)"""
+        if (facade := self._facades.get(network_id)) is None:
+            for network_type in NetworkType:
+                facade = SymFacade(network_type.value)
+                self._facades[facade.network.identifier] = facade
+            if (facade := self._facades.get(network_id)) is None:
+                raise ValueError(f'Unknown network identifier: {network_id}')
+        return str(facade.network.public_key_to_address(Hash256(public_key)))
+
+    def set(self, address: str, public_key: str):
+        if public_key == self.UNKNOWN_PUBLIC_KEY:
+            return
+        address = address.replace('-', '')
+        with self.lock:
+            if self.public_keys.get(address) != public_key:
+                self.public_keys[address] = public_key
+                self.is_changed = True
+
+    def add(self, public_key: str, network_id: int):
+        """Adds the public key of a signer, the address is derived from the key"""
+        if public_key != self.UNKNOWN_PUBLIC_KEY:
+            self.set(self.address(public_key, network_id), public_key)
+
+    def add_account_info(self, account_info: dict):
+        """Adds the public key from the answer of `get_accounts_info` or `get_accounts_infos`"""
+        account = account_info['account']
+        # the node returns the raw address in hex
+        address = b32encode(unhexlify(account['address'])).decode('utf-8')[:-1]
+        self.set(address, account['publicKey'])
+
+    def on_transactions(self, transactions: Iterable['TransactionResponse']):
+        for transaction in transactions:
+            self.add(transaction.transaction.signerPublicKey, transaction.transaction.network)
+
+    def on_event(self, event: dict):
+        """Callback for `Monitor`, collects signers of transactions and blocks"""
+        data = event.get('data', {})
+        for key in ('transaction', 'block'):
+            if isinstance(entity := data.get(key), dict) and 'signerPublicKey' in entity:
+                self.add(entity['signerPublicKey'], int(entity['network']))
+
+    def lookup(self, address: str) -> Optional[str]:
+        """
+        Public key of the account from the directory, requested from the node if it is missing
+
+        Parameters
+        ----------
+        address
+            Account address
+        Returns
+        -------
+        Optional[str]
+            Public key or None if the account is unknown or has not yet sent transactions
+        """
+        if (public_key := self.get(address)) is not None:
+            return public_key
+        address = address.replace('-', '')
+        account_info = get_accounts_info(address)
+        if account_info is None:
+            return None
+        self.set(address, account_info['account']['publicKey'])
+        self.save()
+        return self.get(address)
+
+    def prefetch(self, addresses: Iterable[str], chunk_size: int = 100, max_workers: int = 8) -> int:
+        """
+        Requests public keys of all missing addresses with bulk requests
+
+        Returns
+        -------
+        int
+            Number of the addresses whose public keys are known
+        """
+        addresses = list(dict.fromkeys(address.replace('-', '') for address in addresses))
+        missing = [address for address in addresses if address not in self.public_keys]
+        if missing:
+            for account_info in get_accounts_infos(missing, chunk_size, max_workers).values():
+                self.add_account_info(account_info)
+            self.save()
+        return sum(address in self.public_keys for address in addresses)
+
+    def load(self, path: str) -> int:
+        """Loads the directory from the JSON file, which is then used for saving; returns the number of keys"""
+        self.path = path
+        if os.path.exists(path):
+            with open(path) as opened_file:
+                public_keys = json.load(opened_file)
+            with self.lock:
+                self.public_keys.update(public_keys)
+        return len(self.public_keys)
+
+    def save(self):
+        """Saves the directory if it has changed and has a file"""
+        if self.path is None or not self.is_changed:
+            return
+        with self.lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # the file is replaced at once so that it is not damaged by an interrupted write
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as opened_file:
+                json.dump(self.public_keys, opened_file)
+            os.replace(tmp_path, self.path)
+            self.is_changed = False
+
+
 # singleton for background work with the list of nodes
 node_selector = NodeSelector(config.TEST_NODE_URLs)
+# singleton with the cached network metadata
+network_context = NetworkContext()
+# singleton with the known public keys of accounts
+public_keys = PublicKeyDirectory()
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+from binascii import unhexlify
+from typing import Iterable, List, Tuple, Optional
+
+from pydantic import BaseModel
+
+from . import network
+from .api import Mosaic, dividers, aliases
+from .constants import NetworkType, TransactionMetrics
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot(BaseModel):
+    """Network data required to create transactions without a node"""
+    version: int = SNAPSHOT_VERSION
+    network_type: NetworkType
+    generation_hash_seed: str
+    fee_multipliers: dict
+    dividers: dict = {}  #: divisibility by mosaic ID
+    aliases: dict = {}  #: mosaic ID by namespace name
+
+
+class SignedPayload(BaseModel):
+    """Signed transaction carried from an offline signer to an online announcer"""
+    hash: str
+    payload: str  #: announce request body, as returned by `Transaction.create`
+    deadline: int
+
+
+def save_snapshot(path: str, mosaics: Iterable[str] = ('@symbol.xym',)) -> Snapshot:
+    """
+    Saves the current network data to the snapshot file, must be called online
+
+    Parameters
+    ----------
+    path
+        Path to the snapshot file
+    mosaics
+        Mosaic IDs or aliases (with `@`) whose divisibility will be required offline.
+        Mosaics used earlier in this process are saved as well
+    Returns
+    -------
+    Snapshot
+        The saved snapshot
+    """
+    if network.network_context.is_offline:
+        raise RuntimeError('Snapshot can only be taken online')
+    for mosaic_id in mosaics:
+        # resolves and caches the alias and divisibility
+        Mosaic(mosaic_id, 0)
+    snapshot = Snapshot(network_type=network.network_context.network_type,
+                        generation_hash_seed=network.network_context.generation_hash_seed,
+                        fee_multipliers=network.network_context.fee_multipliers,
+                        dividers={key: dividers.get(key) for key in dividers},
+                        aliases={key: aliases.get(key) for key in aliases})
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as opened_file:
+        opened_file.write(snapshot.json(indent=2))
+    logger.debug(f'Snapshot saved: {path}')
+    return snapshot
+
+
+def load_snapshot(path: str) -> Snapshot:
+    """Switches to offline mode with the data of the snapshot file: `Transaction` and `Mosaic` stop making requests"""
+    snapshot = Snapshot.parse_file(path)
+    if snapshot.version != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported snapshot version: {snapshot.version}')
+    network.network_context.set_offline(snapshot.network_type, snapshot.generation_hash_seed,
+                                        snapshot.fee_multipliers)
+    for key, value in snapshot.dividers.items():
+        dividers.set(key, value)
+    for key, value in snapshot.aliases.items():
+        aliases.set(key, value)
+    logger.debug(f'Snapshot loaded: {path}')
+    return snapshot
+
+
+def payload_deadline(payload: bytes) -> int:
+    """Extracts the deadline from the announce request body"""
+    transaction = unhexlify(json.loads(payload)['payload'])
+    # the deadline follows the fee in the transaction body
+    deadline_offset = TransactionMetrics.TRANSACTION_BODY_INDEX - 8
+    return int.from_bytes(transaction[deadline_offset:TransactionMetrics.TRANSACTION_BODY_INDEX], 'little')
+
+
+def export_payloads(path: str, transactions: Iterable[Tuple[str, bytes]]) -> int:
+    """
+    Writes signed transactions to a file, one JSON object per line
+
+    Parameters
+    ----------
+    path
+        Path to the export file, the transactions are appended
+    transactions
+        Pairs of the transaction hash and payload, as returned by `Transaction.create`
+    Returns
+    -------
+    int
+        Number of written transactions
+    """
+    count = 0
+    with open(path, 'a') as opened_file:
+        for entity_hash, payload in transactions:
+            signed = SignedPayload(hash=entity_hash, payload=payload.decode(), deadline=payload_deadline(payload))
+            opened_file.write(signed.json() + '\n')
+            count += 1
+    return count
+
+
+def import_payloads(path: str, skip_expired: bool = True,
+                    network_type: Optional[NetworkType] = None) -> List[SignedPayload]:
+    """
+    Reads the signed transactions of `export_payloads`, they can be passed to `Announcer.submit`
+    or `network.send_transaction`
+
+    Parameters
+    ----------
+    path
+        Path to the export file
+    skip_expired
+        Skip transactions whose deadline has passed
+    network_type
+        Network type for calculating the network time
+    Returns
+    -------
+    List[SignedPayload]
+        Signed transactions in the order of the file
+    """
+    with open(path) as opened_file:
+        transactions = [SignedPayload.parse_raw(line) for line in opened_file if line.strip()]
+    if skip_expired:
+        now = network.Timing(network_type).now()
+        expired = [signed for signed in transactions if signed.deadline < now]
+        for signed in expired:
+            logger.warning(f'Transaction {signed.hash} has expired')
+        transactions = [signed for signed in transactions if signed.deadline >= now]
+    return transactions
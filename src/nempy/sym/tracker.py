@@ -0,0 +1,297 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Optional, Dict, List, Set
+from urllib.parse import urlparse
+
+import websockets
+from pydantic import BaseModel
+from requests.exceptions import RequestException
+
+from . import network
+from .constants import TransactionStatus, PAST_DEADLINE_CODE, NetworkType
+
+logger = logging.getLogger(__name__)
+
+
+class ConfirmationResult(BaseModel):
+    """The final state of the tracked transaction"""
+    hash: str
+    status: TransactionStatus
+    code: Optional[str] = None  #: rejection code, `Failure_Core_Past_Deadline` for expired transactions
+    height: Optional[int] = None
+
+    @property
+    def is_confirmed(self) -> bool:
+        return self.status == TransactionStatus.CONFIRMED_ADDED
+
+
+class PendingTransaction:
+    """Transaction waiting for the final state"""
+
+    def __init__(self, entity_hash: str, address: str, deadline: int):
+        self.hash = entity_hash
+        self.address = address
+        self.deadline = deadline
+        self.height: Optional[int] = None  #: height of the block in which the transaction is confirmed
+        self.future = Future()
+
+
+class ConfirmationTracker:
+    """Tracks the confirmation of many transactions over a single websocket connection.
+    Listens to the `confirmedAdded` and `status` channels of the signers and to `finalizedBlock`,
+    every registered hash gets its own future. Only while the socket is down are the statuses polled over REST.
+    """
+
+    DEADLINE_GRACE = 15000  #: ms after the deadline, before considering a transaction expired
+
+    def __init__(self,
+                 url: Optional[str] = None,
+                 network_type: Optional[NetworkType] = None,
+                 wait_finalization: bool = False,
+                 poll_interval: float = 5,
+                 reconnect_delay: float = 3):
+        """
+        Parameters
+        ----------
+        url
+            URL node in the form of http://ngl-dual-001.testnet.symboldev.network:3000.
+            By default, the selected node is used
+        network_type
+            Network type for calculating the network time
+        wait_finalization
+            Resolve confirmed transactions only after their block has been finalized
+        poll_interval
+            Interval in seconds to check deadlines and poll statuses while the socket is down
+        reconnect_delay
+            Delay in seconds before reconnecting the socket
+        """
+        self.url = url
+        self.timing = network.Timing(network_type)
+        self.wait_finalization = wait_finalization
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.pending: Dict[str, PendingTransaction] = {}
+        self.subscriptions: Set[str] = set()
+        self.lock = threading.Lock()
+        self.is_connected = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.task: Optional[asyncio.Task] = None
+        self.ws = None
+        self.uid: Optional[str] = None
+
+    def start(self) -> 'ConfirmationTracker':
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self.tracking())
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        logger.debug(f'Confirmation tracker thread started: {self.thread.name}')
+        return self
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.task)
+        finally:
+            # shutdown_default_executor is available since Python 3.9
+            if hasattr(self.loop, 'shutdown_default_executor'):
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.task.cancel)
+            self.thread.join()
+            logger.debug(f'Confirmation tracker thread {self.thread.name} has been stopped.')
+        self.fail_pending(RuntimeError('Confirmation tracker has been stopped'))
+
+    def fail_pending(self, exception: BaseException):
+        """Resolves the futures of all pending transactions with the exception, so that no waiter hangs"""
+        with self.lock:
+            pending, self.pending = list(self.pending.values()), {}
+        for transaction in pending:
+            if not transaction.future.done():
+                transaction.future.set_exception(exception)
+
+    def __enter__(self) -> 'ConfirmationTracker':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def track(self, entity_hash: str, signer_address: str, deadline: int) -> Future:
+        """
+        Registers a transaction for tracking
+
+        Parameters
+        ----------
+        entity_hash
+            Transaction hash
+        signer_address
+            Address of the transaction signer, its channels are used to receive events
+        deadline
+            Transaction deadline in network milliseconds (see `Timing.calc_deadline`)
+        Returns
+        -------
+        Future
+            Future resolved with `ConfirmationResult`
+        """
+        entity_hash = entity_hash.upper()
+        signer_address = signer_address.replace('-', '')
+        with self.lock:
+            if entity_hash in self.pending:
+                return self.pending[entity_hash].future
+            pending = PendingTransaction(entity_hash, signer_address, deadline)
+            self.pending[entity_hash] = pending
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.subscribe(), self.loop)
+        return pending.future
+
+    def channels(self) -> Set[str]:
+        with self.lock:
+            addresses = {pending.address for pending in self.pending.values()}
+        channels = {'finalizedBlock'}
+        for address in addresses:
+            channels.add(f'confirmedAdded/{address}')
+            channels.add(f'status/{address}')
+        return channels
+
+    async def subscribe(self):
+        """Brings subscriptions in line with the addresses of the pending transactions"""
+        if not self.is_connected:
+            return
+        channels = self.channels()
+        try:
+            for channel in channels - self.subscriptions:
+                await self.ws.send(json.dumps({'uid': self.uid, 'subscribe': channel}))
+            for channel in self.subscriptions - channels:
+                await self.ws.send(json.dumps({'uid': self.uid, 'unsubscribe': channel}))
+        except websockets.exceptions.WebSocketException as e:
+            logger.error(e)
+            return
+        self.subscriptions = channels
+
+    def resolve(self, entity_hash: str, status: TransactionStatus,
+                code: Optional[str] = None, height: Optional[int] = None):
+        with self.lock:
+            pending = self.pending.pop(entity_hash, None)
+        if pending is None or pending.future.done():
+            return
+        result = ConfirmationResult(hash=entity_hash, status=status, code=code, height=height)
+        logger.debug(f'Transaction {entity_hash}: {status.name} {code or ""}')
+        pending.future.set_result(result)
+
+    def confirmed(self, entity_hash: str, height: Optional[int]):
+        with self.lock:
+            pending = self.pending.get(entity_hash)
+        if pending is None:
+            return
+        if self.wait_finalization and height is not None:
+            pending.height = height
+            return
+        self.resolve(entity_hash, TransactionStatus.CONFIRMED_ADDED, height=height)
+
+    def finalized(self, height: int):
+        with self.lock:
+            finalized = [pending for pending in self.pending.values()
+                         if pending.height is not None and pending.height <= height]
+        for pending in finalized:
+            self.resolve(pending.hash, TransactionStatus.CONFIRMED_ADDED, height=pending.height)
+
+    def handle(self, event: dict):
+        topic = event.get('topic', '')
+        data = event.get('data', {})
+        if topic.startswith('confirmedAdded/'):
+            meta = data.get('meta', {})
+            entity_hash = meta.get('hash', '').upper()
+            self.confirmed(entity_hash, int(meta['height']) if 'height' in meta else None)
+        elif topic.startswith('status/'):
+            self.resolve(data.get('hash', '').upper(), TransactionStatus.FAILED, code=data.get('code'))
+        elif topic == 'finalizedBlock':
+            self.finalized(int(data['height']))
+
+    def poll(self, hashes: List[str]):
+        """Requests the statuses of the transactions with the bulk REST request"""
+        if not hashes:
+            return
+        try:
+            states = network.check_transaction_states(hashes, url=self.url)
+        except (RequestException, network.SymbolNetworkException) as e:
+            logger.error(e)
+            return
+        for entity_hash, state in states.items():
+            if state.group == TransactionStatus.CONFIRMED_ADDED:
+                self.confirmed(entity_hash, state.height)
+            elif state.group == TransactionStatus.FAILED:
+                self.resolve(entity_hash, TransactionStatus.FAILED, code=state.code)
+
+    def expire(self):
+        """Resolves transactions whose deadline has passed, after a final check of their status"""
+        now = self.timing.now()
+        with self.lock:
+            expired = [pending.hash for pending in self.pending.values()
+                       if pending.height is None and pending.deadline + self.DEADLINE_GRACE < now]
+        if not expired:
+            return
+        self.poll(expired)
+        with self.lock:
+            expired = [entity_hash for entity_hash in expired
+                       if entity_hash in self.pending and self.pending[entity_hash].height is None]
+        for entity_hash in expired:
+            self.resolve(entity_hash, TransactionStatus.FAILED, code=PAST_DEADLINE_CODE)
+
+    async def watchdog(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self.is_connected:
+                with self.lock:
+                    hashes = list(self.pending.keys())
+                await loop.run_in_executor(None, self.poll, hashes)
+            await loop.run_in_executor(None, self.expire)
+            # drop the channels of addresses without pending transactions
+            await self.subscribe()
+
+    async def listening(self):
+        while True:
+            url = urlparse(self.url or network.node_selector.url)
+            try:
+                async with websockets.connect(f'ws://{url.hostname}:{url.port}/ws') as ws:
+                    self.ws = ws
+                    self.uid = json.loads(await ws.recv())['uid']
+                    self.subscriptions = set()
+                    self.is_connected = True
+                    await self.subscribe()
+                    # events could be missed while the socket was down
+                    with self.lock:
+                        hashes = list(self.pending.keys())
+                    await asyncio.get_event_loop().run_in_executor(None, self.poll, hashes)
+                    while True:
+                        frame = await ws.recv()
+                        try:
+                            self.handle(json.loads(frame))
+                        except (KeyError, ValueError, AttributeError) as e:
+                            # a malformed frame is skipped, the other transactions are still tracked
+                            logger.warning(f'Confirmation tracker skipped a malformed frame {frame!r}: {e!r}')
+            except (websockets.exceptions.WebSocketException, OSError, KeyError, json.JSONDecodeError) as e:
+                logger.warning(f'Confirmation tracker socket is down: {e}')
+            finally:
+                self.is_connected = False
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def tracking(self):
+        tasks = [asyncio.create_task(self.listening()), asyncio.create_task(self.watchdog())]
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            self.fail_pending(RuntimeError('Confirmation tracker has been stopped'))
+        except Exception as e:
+            logger.exception(e)
+            self.fail_pending(e)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
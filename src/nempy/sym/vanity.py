@@ -0,0 +1,200 @@
+import logging
+import os
+import time
+from binascii import hexlify
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, List, Tuple, Iterable, Iterator, Callable
+
+from pydantic import BaseModel
+
+from . import ed25519
+from .constants import NetworkType
+
+logger = logging.getLogger(__name__)
+
+BASE32_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+#: network byte of addresses
+NETWORK_BYTES = {NetworkType.TEST_NET: 0x98, NetworkType.MAIN_NET: 0x68}
+ADDRESS_LENGTH = 39
+#: bits of the address: the network byte, the hash of the public key and the checksum
+ADDRESS_BITS = 8 * 24
+
+
+class VanityMatch(BaseModel):
+    private_key: str
+    public_key: str
+    address: str
+
+
+def pattern_bits(pattern: str, position: int, network_byte: int) -> Optional[int]:
+    """
+    Number of random bits of the address that must match the base32 pattern placed at `position`,
+    None if no address can match it: the first characters encode the network byte,
+    the last one has two significant bits
+    """
+    bits = 0
+    for offset, char in enumerate(pattern):
+        value = BASE32_ALPHABET.index(char)
+        for k in range(5):
+            bit = (value >> (4 - k)) & 1
+            j = 5 * (position + offset) + k
+            if j < 8:
+                if bit != (network_byte >> (7 - j)) & 1:
+                    return None
+            elif j >= ADDRESS_BITS:
+                if bit:
+                    return None
+            else:
+                bits += 1
+    return bits
+
+
+# settings of the process searching for addresses
+_prefixes: Tuple[str, ...] = ()
+_suffixes: Tuple[str, ...] = ()
+_network_byte = NETWORK_BYTES[NetworkType.TEST_NET]
+
+
+def _init_searcher(backend_name: str, network_byte: int, prefixes: Tuple[str, ...], suffixes: Tuple[str, ...]):
+    global _prefixes, _suffixes, _network_byte
+    ed25519.set_backend(backend_name)
+    _network_byte, _prefixes, _suffixes = network_byte, prefixes, suffixes
+
+
+def _search_chunk(count: int) -> Tuple[int, List[Tuple[str, str, str]]]:
+    """Generates `count` keys and returns those whose addresses match"""
+    seed = os.urandom(32 * count)
+    private_keys = [hexlify(seed[i:i + 32]).upper() for i in range(0, len(seed), 32)]
+    public_keys = ed25519.Ed25519().public_keys(private_keys)
+    addresses = ed25519.public_keys_to_addresses(public_keys, prefix=bytes([_network_byte]))
+    matches = []
+    for private_key, public_key, address in zip(private_keys, public_keys, addresses):
+        if address.startswith(_prefixes) or address.endswith(_suffixes):
+            matches.append((private_key.decode(), public_key.decode(), address))
+    return count, matches
+
+
+class VanitySearch:
+    """Searches for private keys whose addresses start with one of the prefixes or end with one of the suffixes.
+    Random keys are generated in a pool of processes with the selected crypto backend,
+    public keys are computed with the fixed-base table (or natively) and addresses in batches.
+    """
+
+    def __init__(self,
+                 prefixes: Iterable[str] = (),
+                 suffixes: Iterable[str] = (),
+                 network_type: NetworkType = NetworkType.TEST_NET):
+        """
+        Parameters
+        ----------
+        prefixes
+            Beginnings of the address in base32, including the first character of the network (`T` or `N`)
+        suffixes
+            Endings of the address in base32
+        network_type
+            Network of the addresses
+        """
+        self.network_type = network_type
+        self.network_byte = NETWORK_BYTES[network_type]
+        self.prefixes = tuple(self.normalize(prefix) for prefix in prefixes)
+        self.suffixes = tuple(self.normalize(suffix) for suffix in suffixes)
+        if not self.prefixes and not self.suffixes:
+            raise ValueError('Specify at least one prefix or suffix')
+        probability = 0.0
+        for pattern, position in [(prefix, 0) for prefix in self.prefixes] + \
+                                 [(suffix, ADDRESS_LENGTH - len(suffix)) for suffix in self.suffixes]:
+            bits = pattern_bits(pattern, position, self.network_byte) if len(pattern) <= ADDRESS_LENGTH else None
+            if bits is None:
+                raise ValueError(f'No {network_type.name} address can match `{pattern}`')
+            probability += 2.0 ** -bits
+        #: average number of keys to check for a match
+        self.expected_keys = 1 / min(probability, 1.0)
+        self.checked = 0
+        self.found = 0
+        self.started_at: Optional[float] = None
+
+    @staticmethod
+    def normalize(pattern: str) -> str:
+        pattern = pattern.replace('-', '').upper()
+        if not pattern or any(char not in BASE32_ALPHABET for char in pattern):
+            raise ValueError(f'`{pattern}` is not a base32 string, allowed characters: {BASE32_ALPHABET}')
+        return pattern
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+    @property
+    def keys_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.checked / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def expected_seconds(self) -> Optional[float]:
+        """Average time to the next match at the current rate, None until the rate is known"""
+        rate = self.keys_per_second
+        return self.expected_keys / rate if rate > 0 else None
+
+    def matches(self,
+                max_workers: Optional[int] = None,
+                chunk_size: int = 2000,
+                on_progress: Optional[Callable[['VanitySearch'], None]] = None,
+                timeout: Optional[float] = None) -> Iterator[VanityMatch]:
+        """
+        Yields the matching keys until the iteration is stopped or the timeout has expired
+
+        Parameters
+        ----------
+        max_workers
+            Number of processes, by default all cores
+        chunk_size
+            Number of keys generated by a process at a time
+        on_progress
+            Called after each chunk, for example to display `keys_per_second` and `expected_seconds`
+        timeout
+            Seconds of the search, unlimited by default
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        self.checked = 0
+        self.found = 0
+        self.started_at = time.monotonic()
+        logger.debug(f'Vanity search of {self.prefixes + self.suffixes} in {max_workers} processes, '
+                     f'expected keys: {self.expected_keys:.0f}')
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_searcher,
+                                 initargs=(ed25519.backend.name, self.network_byte,
+                                           self.prefixes, self.suffixes)) as executor:
+            # two chunks per process keep the processes busy while the results are handled
+            pending = {executor.submit(_search_chunk, chunk_size) for _ in range(2 * max_workers)}
+            try:
+                while True:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        checked, matches = future.result()
+                        self.checked += checked
+                        if on_progress is not None:
+                            on_progress(self)
+                        for private_key, public_key, address in matches:
+                            self.found += 1
+                            yield VanityMatch(private_key=private_key, public_key=public_key, address=address)
+                        pending.add(executor.submit(_search_chunk, chunk_size))
+                    if timeout is not None and self.elapsed >= timeout:
+                        logger.debug(f'Vanity search timed out after {self.checked} keys')
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def search(self,
+               count: int = 1,
+               timeout: Optional[float] = None,
+               max_workers: Optional[int] = None,
+               chunk_size: int = 2000,
+               on_progress: Optional[Callable[['VanitySearch'], None]] = None) -> List[VanityMatch]:
+        """Collects `count` matches or fewer if the timeout in seconds has expired, see `matches`"""
+        found = []
+        for match in self.matches(max_workers, chunk_size, on_progress, timeout):
+            found.append(match)
+            if len(found) >= count:
+                break
+        return found
@@ -0,0 +1,129 @@
+import logging
+from binascii import unhexlify
+from typing import Optional, List, Tuple
+
+from symbolchain.core.facade.SymFacade import SymFacade
+
+from . import ed25519, network
+from .constants import NetworkType, TransactionMetrics, TransactionTypes
+from .constants import NETWORK_GENERATION_HASH_SEED_PUBLIC, NETWORK_GENERATION_HASH_SEED_TEST
+from .network import TransactionResponse
+
+logger = logging.getLogger(__name__)
+
+#: network types by the identifier in the transaction
+NETWORK_TYPES = {152: NetworkType.TEST_NET, 104: NetworkType.MAIN_NET}
+GENERATION_HASH_SEEDS = {NetworkType.TEST_NET: NETWORK_GENERATION_HASH_SEED_TEST,
+                         NetworkType.MAIN_NET: NETWORK_GENERATION_HASH_SEED_PUBLIC}
+
+# facades are created once for each network
+_facades = {}
+
+
+def _facade(network_type: NetworkType) -> SymFacade:
+    if network_type not in _facades:
+        _facades[network_type] = SymFacade(network_type.value)
+    return _facades[network_type]
+
+
+def signing_data(transaction: TransactionResponse, generation_hash_seed: Optional[str] = None) -> Optional[bytes]:
+    """
+    Rebuilds the data signed by the signer of the transfer: the generation hash seed and the transaction
+    without its header
+
+    Parameters
+    ----------
+    transaction
+        Transfer received without humanization, see `search_transactions`
+    generation_hash_seed
+        Seed of the network, by default the seed of the public network of the transaction
+    Returns
+    -------
+    Optional[bytes]
+        The signed data or None for embedded transactions, which are signed as part of the aggregate
+    """
+    info = transaction.transaction
+    if isinstance(info.type, str):
+        raise ValueError('Signatures are verified on transactions without humanization')
+    if info.type != TransactionTypes.TRANSFER:
+        raise ValueError(f'Unsupported transaction type: {info.type}')
+    if info.signature is None:
+        return None
+    network_type = NETWORK_TYPES.get(info.network)
+    if network_type is None:
+        raise ValueError(f'Unknown network identifier: {info.network}')
+    if generation_hash_seed is None:
+        generation_hash_seed = GENERATION_HASH_SEEDS[network_type]
+    descriptor = {
+        'type': 'transfer',
+        'version': info.version,
+        'signer_public_key': unhexlify(info.signerPublicKey),
+        'recipient_address': unhexlify(info.recipientAddress),
+        'mosaics': [(int(mosaic.id, 16), int(mosaic.amount)) for mosaic in info.mosaics],
+        'fee': info.maxFee,
+        'deadline': info.deadline,
+        'message': unhexlify(info.message) if info.message is not None else b''
+    }
+    payload = _facade(network_type).transaction_factory.create(descriptor).serialize()
+    return unhexlify(generation_hash_seed) + payload[TransactionMetrics.TRANSACTION_HEADER_SIZE:]
+
+
+def verify_transactions(transactions: List[TransactionResponse],
+                        generation_hash_seed: Optional[str] = None,
+                        max_workers: int = 1) -> List[Optional[bool]]:
+    """
+    Verifies the signatures of downloaded transfers in batches, see `ed25519.verify_signatures`
+
+    Parameters
+    ----------
+    transactions
+        Transfers received without humanization, for example `search_transactions(..., humanization=False)`
+    generation_hash_seed
+        Seed of the network, by default the seed of the public network of each transaction
+    max_workers
+        Number of processes for verification
+    Returns
+    -------
+    List[Optional[bool]]
+        Result for each transaction, None for embedded transactions that have no signature of their own
+    """
+    items: List[Tuple[bytes, bytes, bytes]] = []
+    indexes = []
+    for i, transaction in enumerate(transactions):
+        data = signing_data(transaction, generation_hash_seed)
+        if data is None:
+            continue
+        info = transaction.transaction
+        items.append((unhexlify(info.signerPublicKey), data, unhexlify(info.signature)))
+        indexes.append(i)
+    result: List[Optional[bool]] = [None] * len(transactions)
+    for i, is_valid in zip(indexes, ed25519.verify_signatures(items, max_workers=max_workers)):
+        result[i] = is_valid
+    invalid = result.count(False)
+    if invalid:
+        logger.warning(f'Invalid signatures: {invalid} of {len(items)}')
+    return result
+
+
+def verify_block(height: int,
+                 generation_hash_seed: Optional[str] = None,
+                 max_workers: int = 1) -> List[Tuple[TransactionResponse, Optional[bool]]]:
+    """
+    Downloads the transfers of the block and verifies their signatures
+
+    Returns
+    -------
+    List[Tuple[TransactionResponse, Optional[bool]]]
+        Transfers of the block with the result of the verification, None for embedded transactions
+    """
+    transactions = []
+    page_number = 1
+    while True:
+        page = network.search_transactions(height=height, page_size=100, page_number=page_number,
+                                           order='asc', humanization=False)
+        transactions += page
+        if len(page) < 100:
+            break
+        page_number += 1
+    result = verify_transactions(transactions, generation_hash_seed, max_workers)
+    return [(transaction, is_valid) for transaction, is_valid in zip(transactions, result)]
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import math
+from base64 import b32decode, b32encode
+from binascii import unhexlify
+from functools import lru_cache
+from typing import Iterable, Optional, Callable, List
+
+from pydantic import BaseModel
+from symbolchain.core.CryptoTypes import PublicKey
+from symbolchain.core.facade.SymFacade import SymFacade
+
+from . import network
+from .constants import NetworkType, TransactionTypes, ExecutorTypes, OverflowPolicies
+from .network import TransactionResponse
+
+logger = logging.getLogger(__name__)
+
+RAW_ADDRESS_SIZE = 24
+
+
+def address_to_raw(address: str) -> bytes:
+    """Converts a base32 address to the raw 24 bytes"""
+    return b32decode((address.replace('-', '') + '=').encode())
+
+
+def raw_to_address(raw: bytes) -> str:
+    return b32encode(raw).decode('utf-8')[:-1]
+
+
+@lru_cache(maxsize=65536)
+def public_key_to_raw_address(public_key: str, network_type: NetworkType) -> bytes:
+    facade = SymFacade(network_type.value)
+    return facade.network.public_key_to_address(PublicKey(unhexlify(public_key))).bytes
+
+
+class BloomFilter:
+    """Probabilistic set: no false negatives, false positives with the given probability"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError('Capacity must be positive and the error rate must be between 0 and 1')
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item: bytes):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        # double hashing - k positions from two independent halves of the digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: bytes):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+class AddressIndex:
+    """Compact in-memory index of watched addresses as raw 24-byte values.
+    An optional Bloom filter in front of the set rejects most unknown addresses without touching the set.
+    """
+
+    def __init__(self, addresses: Iterable[str] = (), bloom_capacity: Optional[int] = None,
+                 bloom_error_rate: float = 0.001):
+        self.addresses = set()
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate) if bloom_capacity else None
+        self.update(addresses)
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def add(self, address: str):
+        raw = address_to_raw(address)
+        if len(raw) != RAW_ADDRESS_SIZE:
+            raise ValueError(f'Incorrect account address: `{address}`')
+        self.addresses.add(raw)
+        if self.bloom is not None:
+            self.bloom.add(raw)
+
+    def update(self, addresses: Iterable[str]):
+        for address in addresses:
+            self.add(address)
+
+    def __contains__(self, raw: bytes) -> bool:
+        if self.bloom is not None and raw not in self.bloom:
+            return False
+        return raw in self.addresses
+
+
+class AddressMatch(BaseModel):
+    """A transaction of the block related to a watched address"""
+    address: str
+    role: str  #: `recipient` or `signer`
+    height: int
+    transaction: TransactionResponse
+
+
+class BlockAddressWatcher:
+    """Watches a large list of addresses through the `block` channel only.
+    For each new block, its transfers are fetched and matched against the address index,
+    so the cost depends on the size of the block, not on the number of watched addresses.
+    """
+
+    def __init__(self,
+                 addresses: Iterable[str],
+                 callback: Callable[[AddressMatch], None],
+                 url: Optional[str] = None,
+                 network_type: Optional[NetworkType] = None,
+                 bloom_capacity: Optional[int] = None,
+                 page_size: int = 100):
+        """
+        Parameters
+        ----------
+        addresses
+            Watched addresses
+        callback
+            Called for each transaction matched with a watched address
+        url
+            URL node in the form of http://ngl-dual-001.testnet.symboldev.network:3000.
+            By default, the selected node is used
+        network_type
+            Network type to calculate the signer addresses
+        bloom_capacity
+            Expected number of addresses to put a Bloom filter in front of the index
+        page_size
+            Page size of the block transactions request
+        """
+        self.index = AddressIndex(addresses, bloom_capacity)
+        self.callback = callback
+        self.url = url
+        self.network_type = network_type or network.node_selector.network_type
+        self.page_size = page_size
+        self.last_height = 0
+
+    def block_transactions(self, height: int) -> List[TransactionResponse]:
+        """All transfers of the block, including embedded in aggregates"""
+        transactions = []
+        page_number = 1
+        while True:
+            page = network.search_transactions(height=height,
+                                               type=TransactionTypes.TRANSFER.value,
+                                               embedded=True,
+                                               page_size=self.page_size,
+                                               page_number=page_number,
+                                               order='asc',
+                                               humanization=False)
+            transactions += page
+            if len(page) < self.page_size:
+                return transactions
+            page_number += 1
+
+    def match(self, transaction: TransactionResponse) -> List[AddressMatch]:
+        matches = []
+        height = transaction.meta.height
+        recipient = unhexlify(transaction.transaction.recipientAddress)
+        if recipient in self.index:
+            matches.append(AddressMatch(address=raw_to_address(recipient), role='recipient',
+                                        height=height, transaction=transaction))
+        signer = public_key_to_raw_address(transaction.transaction.signerPublicKey, self.network_type)
+        if signer in self.index:
+            matches.append(AddressMatch(address=raw_to_address(signer), role='signer',
+                                        height=height, transaction=transaction))
+        return matches
+
+    def on_block(self, event: dict):
+        height = int(event['data']['block']['height'])
+        if height <= self.last_height:
+            return
+        # blocks missed between frames or during a reconnect are fetched first
+        first_height = self.last_height + 1 if self.last_height else height
+        if first_height < height:
+            logger.warning(f'Blocks {first_height}..{height - 1} were missed, fetching them')
+        for block_height in range(first_height, height + 1):
+            for transaction in self.block_transactions(block_height):
+                for match in self.match(transaction):
+                    self.callback(match)
+            self.last_height = block_height
+
+    def run(self):
+        """Starts watching, blocks the current thread.
+        Blocks are processed in a separate thread so that fetching does not stall the socket"""
+        network.Monitor(self.url or network.node_selector.url,
+                        ['block'],
+                        callback=self.on_block,
+                        executor=ExecutorTypes.THREAD,
+                        overflow_policy=OverflowPolicies.BLOCK)
@@ -228,10 +228,12 @@ class AccountUI(AccountI):
     def ui_history_inquirer(address: str = None, page_size: int = 10):
         conf_transactions: List[TransactionResponse] = network.search_transactions(address=address,
                                                                                    page_size=page_size,
-                                                                                   transaction_status=TransactionStatus.CONFIRMED_ADDED)
+                                                                                   transaction_status=TransactionStatus.CONFIRMED_ADDED,
+                                                                                   directory=network.public_keys)
         unconf_transactions: List[TransactionResponse] = network.search_transactions(address=address,
                                                                                      page_size=page_size,
-                                                                                     transaction_status=TransactionStatus.UNCONFIRMED_ADDED)
+                                                                                     transaction_status=TransactionStatus.UNCONFIRMED_ADDED,
+                                                                                     directory=network.public_keys)
         transactions = unconf_transactions + conf_transactions
         short_names = {}
         for transaction in transactions:
@@ -3,6 +3,7 @@ import copy
 import logging
 import os
 import pickle
+import time
 from base64 import b64decode
 from base64 import b64encode
 from binascii import unhexlify
@@ -16,7 +17,7 @@ from Crypto.Util.Padding import pad
 from Crypto.Util.Padding import unpad
 from nempy.config import C
 from nempy.sym.constants import NetworkType, AccountValidationState
-from nempy.sym.ed25519 import check_address
+from nempy.sym.ed25519 import check_address, shared_keys
 from pydantic import BaseModel, validator, StrictStr, StrictBytes
 from symbolchain.core.Bip32 import Bip32
 from symbolchain.core.CryptoTypes import PrivateKey
@@ -215,6 +216,79 @@ class AccountData(UserData):
         return accounts
 
 
+class SigningSession:
+    """Holds the decrypted private key and key pair of the account in memory.
+    The account is decrypted once, the session expires after `idle_timeout` seconds without signing
+    and can be wiped explicitly. Python strings cannot be overwritten in place,
+    wiping drops the references to the key material.
+    """
+
+    def __init__(self, account: AccountData, password: str = '', idle_timeout: Optional[float] = 300):
+        """
+        Parameters
+        ----------
+        account
+            Encrypted or decrypted account data
+        password
+            Password for decrypting secret account data
+        idle_timeout
+            Seconds after the last use after which the session expires, None - never
+        Raises
+        ------
+        ValueError
+            `DecoderStatus.WRONG_PASS` if the account cannot be decrypted with the password
+        """
+        try:
+            decrypted = account.decrypt(password) if account.is_encrypted() else account
+            key_pair = KeyPair(PrivateKey(unhexlify(decrypted.private_key)))
+        except Exception as e:
+            # a wrong password may also give bytes that fail to unpickle or are not a key
+            raise ValueError(DecoderStatus.WRONG_PASS.value) from e
+        self.address = account.address
+        self.public_key = account.public_key
+        self.idle_timeout = idle_timeout
+        self._private_key: Optional[str] = decrypted.private_key
+        self._key_pair: Optional[KeyPair] = key_pair
+        self.last_used = time.monotonic()
+
+    def is_active(self) -> bool:
+        if self._key_pair is None:
+            return False
+        if self.idle_timeout is not None and time.monotonic() - self.last_used > self.idle_timeout:
+            logger.debug(f'Signing session of {self.address} has expired')
+            self.wipe()
+            return False
+        return True
+
+    def _touch(self):
+        if not self.is_active():
+            raise PermissionError('The signing session is locked, unlock the account again')
+        self.last_used = time.monotonic()
+
+    @property
+    def private_key(self) -> str:
+        self._touch()
+        return self._private_key
+
+    @property
+    def key_pair(self) -> KeyPair:
+        self._touch()
+        return self._key_pair
+
+    def wipe(self):
+        if self._private_key is not None:
+            # the message keys derived with the account are dropped together with it
+            shared_keys.evict(private_key=unhexlify(self._private_key))
+        self._private_key = None
+        self._key_pair = None
+
+    def __enter__(self) -> 'SigningSession':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wipe()
+
+
 class ProfileData(UserData):
     pass_hash: StrictBytes
 
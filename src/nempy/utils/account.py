@@ -3,12 +3,14 @@ import os
 
 import click
 import stdiomask
-from nempy.user_data import DecoderStatus
+from nempy.user_data import AccountData, DecoderStatus
 from nempy.config import C
 from nempy.engine import XYMEngine, EngineStatusCode
-from nempy.sym import ed25519
-from nempy.sym.constants import HexSequenceSizes
-from nempy.sym.network import Monitor, NetworkType
+from nempy.sym import ed25519, network, offline
+from nempy.sym.constants import HexSequenceSizes, PAST_DEADLINE_CODE
+from nempy.sym.network import NetworkType
+from nempy.sym.tracker import ConfirmationTracker, ConfirmationResult
+from nempy.sym.vanity import VanitySearch
 from nempy.wallet import Wallet
 from nempy.ui import AccountUI, ProfileUI, print_warning
 from tabulate import tabulate
@@ -94,17 +96,16 @@ def get_balance(address):
     print(json.dumps(balance, sort_keys=True, indent=2))
 
 
-def monitoring_callback(transaction_info: dict, addresses: list):
-    address = transaction_info['topic'].split('/')[1]
-    if 'unconfirmedAdded/' in transaction_info['topic'] and address in addresses:
-        print(
-            '[UNCONFIRMED] Transaction related to the given address enters the unconfirmed state, '
-            'waiting to be included in a block...')
-    elif 'confirmedAdded/' in transaction_info['topic'] and address in addresses:
-        print('[CONFIRMED] Transaction related to the given address is included in a block')
+def print_confirmation(result: ConfirmationResult):
+    if result.is_confirmed:
+        height = f' at height {result.height}' if result.height is not None else ''
+        print(f'[CONFIRMED] Transaction is included in a block{height}')
         exit(0)
-    elif 'status/' in transaction_info['topic'] and address in addresses:
-        print(f'[REJECTED] Transaction rejected: {transaction_info["data"]["code"]}')
+    elif result.code == PAST_DEADLINE_CODE:
+        print('[EXPIRED] Transaction was not confirmed before the deadline')
+        exit(1)
+    else:
+        print(f'[REJECTED] Transaction rejected: {result.code}')
         exit(1)
 
 
@@ -150,12 +151,7 @@ def send(address: str, plain_message: str, encrypted_message: str, mosaics: str,
     """
     send mosaics or messages to the addressee
     """
-    #  instead of the global variable 'addresses'
-    def _monitoring_callback(transaction_info: dict):
-        monitoring_callback(transaction_info, addresses)
-
     address = address.replace('-', '')
-    addresses = [address]
     if plain_message != '' and encrypted_message != '':
         print('Specify one of the message types.')
         exit(1)
@@ -174,20 +170,34 @@ def send(address: str, plain_message: str, encrypted_message: str, mosaics: str,
     is_encrypted = True if encrypted_message else False
     confirmation(address, mosaics, message, is_encrypted, fee, deadline, balance, wallet.profile.data.network_type)
     password = stdiomask.getpass(f'Enter your `{wallet.profile.data.name} [{wallet.profile.data.network_type.name}]` profile password: ')
-    entity_hash, status = engine.send_tokens(recipient_address=address,
-                                             mosaics=mosaics,
-                                             message=message,
-                                             is_encrypted=is_encrypted,
-                                             password=password,
-                                             deadline={'minutes': deadline})
-    if status != EngineStatusCode.ACCEPTED:
-        if status == EngineStatusCode.INVALID_ACCOUNT_INFO:
-            print(status.value, '\nThe account either does not exist, or there were no transactions on it.'
-                                '\nUnable to get the public key from the network')
+    signed = engine.sign_tokens(recipient_address=address,
+                                mosaics=mosaics,
+                                message=message,
+                                is_encrypted=is_encrypted,
+                                password=password,
+                                deadline={'minutes': deadline})
+    if signed is None:
+        print(EngineStatusCode.INVALID_ACCOUNT_INFO.value,
+              '\nThe account either does not exist, or there were no transactions on it.'
+              '\nUnable to get the public key from the network')
         exit(1)
-    subscribers = ['confirmedAdded', 'unconfirmedAdded', 'status']
-    subscribers = [os.path.join(subscribe, address) for subscribe in subscribers]
-    Monitor(engine.node_selector.url, subscribers, formatting=True, callback=_monitoring_callback)
+    entity_hash, payload = signed
+    if not network.send_transaction(payload):
+        print(EngineStatusCode.ANNOUNCE_ERROR.value)
+        exit(1)
+    # the tracker waits for the deadline signed into the transaction
+    signed_deadline = offline.payload_deadline(payload)
+    print('Waiting for confirmation...')
+    with ConfirmationTracker(engine.node_selector.url) as tracker:
+        future = tracker.track(entity_hash, wallet.profile.account.data.address, signed_deadline)
+        # the tracker resolves expired transactions itself, the timeout only guards against a dead tracker
+        timeout = (signed_deadline + 2 * tracker.DEADLINE_GRACE - engine.timing.now()) / 1000 + tracker.poll_interval
+        try:
+            result = future.result(timeout=max(timeout, 0))
+        except Exception as e:
+            print(f'[UNKNOWN] The confirmation could not be tracked: {e or type(e).__name__}')
+            exit(1)
+    print_confirmation(result)
 
 
 @main.command('history')
@@ -210,5 +220,65 @@ def setdefault():
     AccountUI.ui_default_account(wallet.profile.load_accounts())
 
 
+def format_duration(seconds: float) -> str:
+    for unit, size in [('years', 365 * 86400), ('days', 86400), ('hours', 3600), ('min', 60)]:
+        if seconds >= size:
+            return f'{seconds / size:.1f} {unit}'
+    return f'{seconds:.0f}s'
+
+
+def print_progress(search: VanitySearch):
+    expected = search.expected_seconds
+    expected = format_duration(expected) if expected is not None else '-'
+    print(f'\rKeys: {search.checked} ({search.keys_per_second:.0f} keys/sec), found: {search.found}, '
+          f'expected time to a match: {expected}   ', end='', flush=True)
+
+
+@main.command('vanity')
+@click.option('-p', '--prefix', 'prefixes', type=str, required=False, multiple=True,
+              help='Beginning of the address including the network character (example: TNEMPY)')
+@click.option('-s', '--suffix', 'suffixes', type=str, required=False, multiple=True, help='Ending of the address')
+@click.option('-c', '--count', type=int, required=False, default=1, show_default=True,
+              help='Number of accounts to find')
+@click.option('-n', '--name', type=str, required=False, default='vanity', show_default=True,
+              help='Name of the found accounts, a number is added if the name is taken')
+@click.option('-w', '--workers', type=int, required=False, default=None,
+              help='Number of processes. Default all cores')
+@click.option('-t', '--timeout', type=float, required=False, default=None, help='Search time limit in seconds')
+def vanity(prefixes, suffixes, count, name, workers, timeout):
+    """
+    Search for accounts with recognizable addresses
+    """
+    wallet = Wallet()
+    network_type = wallet.profile.data.network_type
+    try:
+        search = VanitySearch(prefixes, suffixes, network_type)
+    except ValueError as e:
+        print(e)
+        exit(1)
+    print(f'On average {search.expected_keys:.0f} keys are checked for a match')
+    password = ProfileUI.ui_check_pass(wallet.profile.data, attempts=3)
+    if password is None:
+        exit(1)
+    found = 0
+    for match in search.matches(max_workers=workers, on_progress=print_progress, timeout=timeout):
+        account_data = AccountData.create(match.private_key, network_type)
+        account_name, index = name, 1
+        while os.path.exists(os.path.join(wallet.accounts_dir, account_name + '.account')):
+            index += 1
+            account_name = f'{name}{index}'
+        account_data.name = account_name
+        account_data.profile = wallet.profile.data.name
+        account_path = os.path.join(wallet.accounts_dir, account_name + '.account')
+        account_data.encrypt(password).write(account_path)
+        print(f'\n{C.OKGREEN}{match.address}{C.END} saved at: {account_path}')
+        found += 1
+        if found >= count:
+            break
+    if found < count:
+        print(f'\nTime is over, found {found} of {count}')
+        exit(1)
+
+
 if __name__ == '__main__':
     main()
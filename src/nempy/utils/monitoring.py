@@ -4,12 +4,13 @@ import logging
 import os.path
 
 import click
-from nempy.sym.network import Monitor, node_selector
+from nempy.sym.network import Monitor, RedundantMonitor, node_selector
 
 
 @click.command('monitoring', help='- Monitor blocks, transactions and errors', context_settings=dict(max_content_width=300))
-@click.option('--url', type=str, required=False, default=None,
-              help='Node URL (example: http://ngl-dual-001.testnet.symboldev.network:3000)')
+@click.option('--url', 'urls', type=str, multiple=True, required=False,
+              help='Node URL (example: http://ngl-dual-001.testnet.symboldev.network:3000). '
+                   'When several are given, all nodes are monitored at once and events are deduplicated')
 @click.option('-c', '--channels', nargs=0,
               type=click.Choice(Monitor.where_to_subscribe.keys()), default='all',
               show_default=True, help='Channels available for subscribe')
@@ -17,14 +18,14 @@ from nempy.sym.network import Monitor, node_selector
 @click.option('-a', '--address', type=str, multiple=True, required=False, help='Account address')
 @click.option('-l', '--log', type=str, required=False, default='', help='Path to the log file')
 @click.option('-f', '--formatting', is_flag=True, help='Formatted output')
-def main(url, channels, address, formatting, log):
+def main(urls, channels, address, formatting, log):
     addresses = address
     if log and os.path.exists(log):
         answer = input(f'`{log}` file exists, overwrite? y/N: ')
         if answer.lower() != 'y':
             exit(0)
-    if url is not None:
-        node_selector.url = url
+    if len(urls) == 1:
+        node_selector.url = urls[0]
     if not len(channels):
         channels = Monitor.where_to_subscribe.keys()
     subscribers = []
@@ -38,7 +39,10 @@ def main(url, channels, address, formatting, log):
         else:
             subscribers.append(channel)
     logging.debug(subscribers)
-    Monitor(node_selector.url, subscribers, formatting, log)
+    if len(urls) > 1:
+        RedundantMonitor(list(urls), subscribers, formatting, log)
+    else:
+        Monitor(node_selector.url, subscribers, formatting, log)
 
 
 if __name__ == '__main__':
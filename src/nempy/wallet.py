@@ -4,6 +4,7 @@ import os
 from typing import Optional
 
 from nempy.config import WALLET_DIR, C
+from nempy.sym import network
 from nempy.ui import PasswordPolicyError, RepeatPasswordError, ProfileUI, AccountUI
 from nempy.user_data import ProfileData
 
@@ -17,11 +18,13 @@ class Wallet:
         self.profiles_dir = os.path.join(self.wallet_dir, 'profiles')
         self.accounts_dir = os.path.join(self.wallet_dir, 'accounts')
         self.config_file = os.path.join(wallet_dir, os.path.expanduser('config.ini'))
+        self.public_keys_file = os.path.join(self.wallet_dir, 'public_keys.json')
 
         os.makedirs(self.wallet_dir, exist_ok=True)
         os.makedirs(self.profiles_dir, exist_ok=True)
         os.makedirs(self.accounts_dir, exist_ok=True)
         self.init_config_file()
+        network.public_keys.load(self.public_keys_file)
         if init_only:
             return
         self._profile = ProfileUI(self.config_file, self.profiles_dir, self.accounts_dir)
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from nempy.sym import network
+
+
+@pytest.fixture
+def node():
+    """The test network node: requests of the node information, fee multipliers and network properties are mocked.
+    The global network context is loaded from the mocked node and reset after the test"""
+    fees = {'averageFeeMultiplier': 100, 'medianFeeMultiplier': 100, 'highestFeeMultiplier': 100,
+            'lowestFeeMultiplier': 10, 'minFeeMultiplier': 10}
+    node_info = {'networkGenerationHashSeed': network.constants.NETWORK_GENERATION_HASH_SEED_TEST}
+    properties = {'plugins': {'aggregate': {'maxTransactionsPerAggregate': '100',
+                                            'maxCosignaturesPerAggregate': '25'}}}
+    network.network_context.reset()
+    try:
+        with patch.object(network, 'get_node_info', return_value=node_info) as get_node_info, \
+                patch.object(network, 'get_fee_multipliers', return_value=fees) as get_fee_multipliers, \
+                patch.object(network, 'get_network_properties', return_value=properties) as get_network_properties:
+            yield SimpleNamespace(fees=fees, node_info=node_info, properties=properties,
+                                  get_node_info=get_node_info, get_fee_multipliers=get_fee_multipliers,
+                                  get_network_properties=get_network_properties)
+    finally:
+        network.network_context.reset()
+
+
+@pytest.fixture
+def public_keys():
+    """An empty directory of public keys in place of the global `network.public_keys`"""
+    directory = network.PublicKeyDirectory()
+    with patch.object(network, 'public_keys', directory):
+        yield directory
@@ -0,0 +1,90 @@
+import time
+from unittest.mock import patch
+
+from nempy.sym import network
+from nempy.sym.announcer import Announcer, AnnounceItem, RateLimiter
+from nempy.sym.constants import Fees, NetworkType, TransactionStatus
+from nempy.sym.network import TransactionStatusInfo
+
+
+class Answer:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ''
+
+
+class TestAnnouncer:
+
+    def setup(self):
+        self.announcer = Announcer('http://localhost:3000', NetworkType.TEST_NET,
+                                   max_concurrency=2, rate_limit=1000, rebroadcast_interval=0.1)
+        self.deadline = self.announcer.timing.calc_deadline(minutes=2)
+
+    def test_priority(self):
+        slow = AnnounceItem('A', b'', self.deadline, Fees.SLOWEST)
+        fast = AnnounceItem('B', b'', self.deadline, Fees.FAST)
+        later = AnnounceItem('C', b'', self.deadline + 60000, Fees.FAST)
+        for item in (later, slow, fast):
+            self.announcer.push(item)
+        self.announcer.stop_event.clear()
+        assert [self.announcer.pop().hash for _ in range(3)] == ['B', 'A', 'C']
+
+    def test_throttling_and_rebroadcast(self):
+        answers = [Answer(429, {'Retry-After': '0'}), Answer(503), Answer(202), Answer(202), Answer(202)]
+        statuses = iter([TransactionStatus.NOT_FOUND, TransactionStatus.CONFIRMED_ADDED])
+        self.announcer.DEFAULT_RETRY_AFTER = 0.1
+
+        def states(hashes, url=None):
+            assert url == 'http://localhost:3000'
+            group = next(statuses)
+            return {h: TransactionStatusInfo(hash=h, group=group) for h in hashes}
+
+        with patch('requests.put', side_effect=answers) as mock_put, \
+                patch.object(network, 'check_transaction_states', side_effect=states):
+            with self.announcer:
+                self.announcer.submit('a' * 64, b'{}', self.deadline)
+                assert self.announcer.join(timeout=10)
+        metrics = self.announcer.metrics
+        assert mock_put.call_count == 4
+        assert metrics.throttled == 2
+        assert metrics.announced == 2
+        assert metrics.rebroadcasts == 1
+        assert metrics.confirmed == 1
+        assert metrics.in_flight == 0
+        assert metrics.throughput > 0
+
+    def test_expired(self):
+        with patch('requests.put') as mock_put:
+            with self.announcer:
+                self.announcer.submit('a' * 64, b'{}', self.announcer.timing.now() - 1)
+                assert self.announcer.join(timeout=10)
+        mock_put.assert_not_called()
+        assert self.announcer.metrics.expired == 1
+
+    def test_stop_while_throttled(self):
+        self.announcer.limiter('http://localhost:3000').pause(60)
+        with patch('requests.put') as mock_put:
+            self.announcer.start()
+            self.announcer.submit('a' * 64, b'{}', self.deadline)
+            time.sleep(0.2)
+            self.announcer.stop()
+        mock_put.assert_not_called()
+        # the item waiting for the node is kept in the queue
+        assert self.announcer.metrics.in_flight == 0
+        assert [item.hash for _, _, item in self.announcer.queue] == ['A' * 64]
+
+    def test_metrics_snapshot(self):
+        metrics = self.announcer.metrics
+        self.announcer.count('failed', 2)
+        assert metrics.failed == 0
+        assert self.announcer.metrics.failed == 2
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(2)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert 0 < limiter.acquire() <= 0.5
+    limiter.pause(10)
+    assert limiter.acquire() > 9
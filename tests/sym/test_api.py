@@ -1,10 +1,13 @@
-from binascii import hexlify
+import json
+from binascii import hexlify, unhexlify
 
 import pytest
-from nempy.sym import ed25519, network
+from nempy.sym import api, ed25519, network, offline
 from nempy.sym.api import Message, PlainMessage, EncryptMessage, Namespace, Mosaic, Transaction, dividers
 from nempy.sym.constants import NetworkType, Fees, TransactionTypes
 from nempy.sym.network import Timing
+from symbol_catbuffer.AggregateCompleteTransactionBuilder import AggregateCompleteTransactionBuilder
+from symbolchain.core.CryptoTypes import Hash256, PublicKey, Signature
 
 from unittest.mock import patch
 
@@ -54,6 +57,17 @@ class TestMessage:
         message = ed25519.Ed25519.decrypt(recipient_priv, sender_pub, enc_message[1:])
         assert message == b'Hello NEM!'
 
+    @staticmethod
+    def test_encrypt_message_many():
+        account0, account1 = TestAccountData().setup()
+        messages = EncryptMessage.many('Hello NEM!', account0.private_key, [account1.public_key] * 3, max_workers=2)
+        assert len(messages) == 3
+        assert all(isinstance(message, EncryptMessage) and message[:1] == b'\x01' for message in messages)
+        # a fresh IV for each recipient
+        assert len(set(messages)) == 3
+        for message in messages:
+            assert ed25519.Ed25519.decrypt(account1.private_key, account0.public_key, message[1:]) == b'Hello NEM!'
+
 
 class TestNamespace:
 
@@ -157,7 +171,70 @@ class TestTransaction:
             type = TransactionTypes.AGGREGATE_BONDED
 
             def serialize(self):
-                return None
-        with pytest.raises(NotImplementedError):
-            Transaction.entity_hash_gen(None, None, T(), None)
-
+                return bytes(range(256))
+        signature, public_key, generation_hash = Signature(b'\x01' * 64), PublicKey(b'\x02' * 32), Hash256(b'\x03' * 32)
+        aggregate_hash = Transaction.entity_hash_gen(signature, public_key, T(), generation_hash)
+        # inner transactions and cosignatures do not affect the aggregate hash
+        T.serialize = lambda self: bytes(range(160)) + b'\x00' * 96
+        assert Transaction.entity_hash_gen(signature, public_key, T(), generation_hash) == aggregate_hash
+        T.type = TransactionTypes.TRANSFER
+        assert Transaction.entity_hash_gen(signature, public_key, T(), generation_hash) != aggregate_hash
+
+
+def test_create_many(node):
+    account0, account1 = TestAccountData().setup()
+    with patch.object(Timing, 'calc_deadline', return_value=1000000), \
+            patch.object(Mosaic, 'get_divisibility', return_value=6):
+        transaction = Transaction()
+        specs = [{'recipient_address': account1.address,
+                  'message': PlainMessage(f'payout {i}'),
+                  'mosaics': [Mosaic('091F837E059AE13C', i + 1)]} for i in range(5)]
+        expected = [transaction.create(account0.private_key, **spec) for spec in specs]
+        signed = list(transaction.create_many(account0.private_key, specs, max_workers=2, chunk_size=2))
+        # a single chunk is signed without a pool of processes
+        with patch.object(api, 'ProcessPoolExecutor', side_effect=AssertionError):
+            assert list(transaction.create_many(account0.private_key, specs, max_workers=2)) == expected
+    assert signed == expected
+    assert len({entity_hash for entity_hash, _ in signed}) == 5
+    assert offline.payload_deadline(signed[0][1]) == 1000000
+
+
+def test_create_aggregate(node):
+    account0, account1 = TestAccountData().setup()
+    # batches are limited by the network property
+    node.properties['plugins']['aggregate']['maxTransactionsPerAggregate'] = '3'
+    with patch.object(Mosaic, 'get_divisibility', return_value=6):
+        transaction = Transaction()
+        specs = [{'recipient_address': account1.address,
+                  'message': PlainMessage('x' * i),
+                  'mosaics': Mosaic('091F837E059AE13C', i + 1)} for i in range(7)]
+        aggregates = list(transaction.create_batches(account0.private_key, specs, Fees.SLOWEST))
+        with pytest.raises(ValueError):
+            transaction.create_aggregate(account0.private_key, [])
+        with pytest.raises(ValueError):
+            transaction.create_aggregate(account0.private_key, specs[:4])
+    assert len(aggregates) == 3
+    for entity_hash, payload in aggregates:
+        aggregate = AggregateCompleteTransactionBuilder.load_from_binary(unhexlify(json.loads(payload)['payload']))
+        assert transaction.sym_facade.verify_transaction(aggregate, Signature(aggregate.signature))
+        assert entity_hash == str(transaction.sym_facade.hash_transaction(aggregate))
+        assert aggregate.fee == aggregate.get_size() * node.fees['minFeeMultiplier']
+    assert [len(AggregateCompleteTransactionBuilder.load_from_binary(unhexlify(json.loads(payload)['payload'])).transactions)
+            for _, payload in aggregates] == [3, 3, 1]
+
+
+def test_create_aggregate_with_cosignatures(node):
+    fee_payer, deposit = TestAccountData().setup()
+    transaction = Transaction()
+    specs = [{'recipient_address': fee_payer.address, 'mosaics': [(0x091F837E059AE13C, 10)],
+              'signer_pr_key': deposit.private_key}] * 2
+    entity_hash, payload = transaction.create_aggregate(fee_payer.private_key, specs)
+    aggregate = AggregateCompleteTransactionBuilder.load_from_binary(unhexlify(json.loads(payload)['payload']))
+    assert entity_hash == str(transaction.sym_facade.hash_transaction(aggregate))
+    # one cosignature per cosigner, the fee covers it
+    assert len(aggregate.cosignatures) == 1
+    assert aggregate.fee == aggregate.get_size() * node.fees['minFeeMultiplier']
+    _, public_key, cosignature = aggregate.cosignatures[0]
+    assert public_key == unhexlify(deposit.public_key)
+    verifier = transaction.sym_facade.Verifier(PublicKey(public_key))
+    assert verifier.verify(unhexlify(entity_hash), Signature(cosignature))
@@ -0,0 +1,82 @@
+import asyncio
+import tempfile
+import threading
+
+import pytest
+from nempy.sym.constants import ExecutorTypes, OverflowPolicies
+from nempy.sym.dispatcher import Dispatcher, SpillBuffer
+
+
+def run_dispatcher(dispatcher: Dispatcher, events: list):
+    async def scenario():
+        dispatcher.start()
+        # events are queued before the handlers are started to fill the queue
+        for event in events:
+            await dispatcher.put(event)
+        dispatching = asyncio.create_task(dispatcher.run())
+        await dispatcher.join()
+        dispatching.cancel()
+    # a separate loop, the default loop of the thread is used by `Monitor`
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(scenario())
+    loop.close()
+
+
+def test_drop_oldest():
+    handled = []
+    dispatcher = Dispatcher(handled.append, max_queue_size=3, overflow_policy=OverflowPolicies.DROP_OLDEST)
+    run_dispatcher(dispatcher, [{'n': i} for i in range(10)])
+    assert handled == [{'n': 7}, {'n': 8}, {'n': 9}]
+    assert dispatcher.metrics.dropped == 7
+    assert dispatcher.metrics.max_queue_depth == 3
+    assert dispatcher.metrics.processed == 3
+
+
+def test_spill():
+    handled = []
+    with tempfile.NamedTemporaryFile() as spill:
+        dispatcher = Dispatcher(handled.append, max_queue_size=2,
+                                overflow_policy=OverflowPolicies.SPILL, spill_path=spill.name)
+        run_dispatcher(dispatcher, [{'n': i} for i in range(10)])
+    assert handled == [{'n': i} for i in range(10)]
+    assert dispatcher.metrics.spilled == 8
+    assert dispatcher.metrics.spill_depth == 0
+
+
+def test_spill_buffer():
+    buffer = SpillBuffer()
+    assert buffer.pop() is None
+    buffer.push((1.0, {'a': 1}))
+    buffer.push((2.0, {'b': 2}))
+    assert len(buffer) == 2
+    assert buffer.pop() == (1.0, {'a': 1})
+    buffer.push((3.0, {'c': 3}))
+    assert buffer.pop() == (2.0, {'b': 2})
+    assert buffer.pop() == (3.0, {'c': 3})
+    assert len(buffer) == 0
+    buffer.close()
+
+
+def test_thread_executor():
+    threads = set()
+    lock = threading.Lock()
+
+    def callback(event):
+        with lock:
+            threads.add(threading.current_thread().name)
+        if event['n'] == 3:
+            raise ValueError('Handler error')
+
+    dispatcher = Dispatcher(callback, executor=ExecutorTypes.THREAD, workers=2)
+    run_dispatcher(dispatcher, [{'n': i} for i in range(5)])
+    assert threading.current_thread().name not in threads
+    assert dispatcher.metrics.processed == 4
+    assert dispatcher.metrics.failed == 1
+    assert dispatcher.metrics.max_lag >= dispatcher.metrics.average_lag > 0
+
+
+def test_init():
+    with pytest.raises(ValueError):
+        Dispatcher(print, max_queue_size=0)
+    with pytest.raises(ValueError):
+        Dispatcher(print, workers=2)
@@ -1,4 +1,13 @@
-from nempy.sym.ed25519 import Ed25519
+import random
+import threading
+from unittest.mock import patch
+
+import pytest
+from symbolchain.core.CryptoTypes import PrivateKey
+from symbolchain.core.facade.SymFacade import SymFacade
+from nempy.sym import ed25519
+from nempy.sym.constants import AccountValidationState
+from nempy.sym.ed25519 import Ed25519, SignClass, Precomputation
 
 
 class TestEd25519:
@@ -17,3 +26,223 @@ class TestEd25519:
 
     def test_get_address(self):
         assert self.address == 'TB2BOAUT2JESCX4KMCKTVY27CYYJ4YK3RJD7FCQ'
+
+    def test_inner_outer(self):
+        B = self.ed25519.B
+        P = B
+        for n in range(1, 20):
+            assert self.ed25519.outer(B, n) == P
+            assert self.ed25519.is_on_curve(P)
+            P = self.ed25519.inner(P, B)
+        Q = self.ed25519.outer(B, 7)
+        assert self.ed25519.outer(Q, 2 ** 200 + 3) == self.ed25519.outer(B, 7 * (2 ** 200 + 3))
+        assert self.ed25519.outer(Q, 0) == (0, 1)
+
+    def test_public_keys(self):
+        secret_keys = self.ed25519.secret_keys(5) + [self.secret_key]
+        public_keys = [self.ed25519.public_key(secret_key) for secret_key in secret_keys]
+        assert public_keys[-1] == self.public_key
+        assert self.ed25519.public_keys(secret_keys) == public_keys
+        ed25519.set_backend(ed25519.PythonBackend.name)
+        try:
+            assert self.ed25519.public_keys(secret_keys) == public_keys
+        finally:
+            ed25519.set_backend(ed25519.NativeBackend.name)
+
+
+class TestSignClass:
+
+    def setup(self):
+        self.ecc = SignClass()
+        self.random = random.Random(25519)
+
+    def double_and_add(self, P, e):
+        Q = self.ecc.ident
+        for i in reversed(range(e.bit_length())):
+            Q = self.ecc.edwards_double(Q)
+            if (e >> i) & 1:
+                Q = self.ecc.edwards_add(Q, P)
+        return Q
+
+    def test_wnaf(self):
+        for _ in range(20):
+            e = self.random.getrandbits(256)
+            digits = SignClass.wnaf(e, 5)
+            assert sum(digit << i for i, digit in enumerate(digits)) == e
+            assert all(digit % 2 and abs(digit) < 16 for digit in digits if digit)
+
+    def test_scalarmult(self):
+        P = self.double_and_add(self.ecc.B, self.random.getrandbits(252))
+        for e in [0, 1, 2, 15, 16, self.ecc.l - 1, self.ecc.l, self.ecc.l + 1] + \
+                [self.random.getrandbits(256) for _ in range(10)]:
+            expected = self.ecc.encodepoint(self.double_and_add(self.ecc.B, e))
+            assert self.ecc.encodepoint(self.ecc.scalarmult_B(e)) == expected
+            assert self.ecc.encodepoint(self.ecc.scalarmult(self.ecc.B, e)) == expected
+            assert self.ecc.encodepoint(self.ecc.scalarmult(P, e)) == \
+                   self.ecc.encodepoint(self.double_and_add(P, e))
+
+    def test_codecs(self):
+        points = [self.ecc.scalarmult_B(self.random.getrandbits(256)) for _ in range(10)]
+        encoded = [self.ecc.encodepoint(point) for point in points]
+        for point, data in zip(points, encoded):
+            assert data[31] >> 7 == point[0] * self.ecc.inv(point[2]) % ed25519.q & 1
+            assert self.ecc.encodepoint(self.ecc.decodepoint(data)) == data
+            assert self.ecc.decodeint(data) == sum(2 ** i * SignClass.bit(data, i) for i in range(256))
+        assert self.ecc.decodepoints(encoded + encoded[:2]) == [self.ecc.decodepoint(data) for data in encoded + encoded[:2]]
+        with pytest.raises(ValueError):
+            # y = 2 has no point on the curve
+            self.ecc.decodepoint((2).to_bytes(32, 'little'))
+        assert self.ecc.secret_scalar(b'seed') == \
+               2 ** 254 + sum(2 ** i * SignClass.bit(SignClass.to_hash(b'seed'), i) for i in range(3, 254))
+        assert self.ecc.inv(0) == 0 and self.ecc.inv(5) * 5 % ed25519.q == 1
+
+    def test_precomputation(self):
+        precomputation = Precomputation()
+        tables = []
+        threads = [threading.Thread(target=lambda: tables.append(precomputation.base_table)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # built once and shared by all threads
+        assert all(table is tables[0] for table in tables)
+        assert tables[0] == ed25519.precomputation.base_table
+        assert self.ecc.Bpow is SignClass().Bpow
+
+        blob = precomputation.to_bytes()
+        restored = Precomputation()
+        restored.from_bytes(blob)
+        assert restored.base_table == tables[0]
+        with pytest.raises(ValueError):
+            restored.from_bytes(blob[:-1])
+        with pytest.raises(ValueError):
+            restored.from_bytes(blob[:len(Precomputation.MAGIC)] + bytes(32) + blob[len(Precomputation.MAGIC) + 32:])
+
+
+class TestSharedKeyCache:
+
+    def setup(self):
+        self.ed25519 = Ed25519()
+        self.keys = [self.ed25519.secret_key(bytes([i]) * 32) for i in range(3)]
+        self.public_keys = [self.ed25519.public_key(key) for key in self.keys]
+        ed25519.shared_keys.wipe()
+
+    def teardown(self):
+        ed25519.shared_keys.wipe()
+
+    def test_encrypt_decrypt(self):
+        with patch.object(SignClass, 'derive_shared_secret', wraps=SignClass().derive_shared_secret) as mock:
+            for i in range(3):
+                encrypted = Ed25519.encrypt(self.keys[0], self.public_keys[1], f'message {i}')
+                assert Ed25519.decrypt(self.keys[1], self.public_keys[0], encrypted) == f'message {i}'.encode()
+        # once for each side of the correspondence
+        assert mock.call_count == 2
+        assert len(ed25519.shared_keys) == 2
+
+    def test_lru_evict_wipe(self):
+        cache = ed25519.SharedKeyCache(maxsize=2)
+        keys = [bytearray([i]) * 32 for i in range(3)]
+        for i in range(3):
+            cache.put(b'own', bytes([i]), keys[i])
+        assert cache.get(b'own', b'\x00') is None
+        assert keys[0] == bytearray(32)
+        assert cache.get(b'own', b'\x01') == bytes(keys[1])
+        assert cache.evict(public_key=b'\x01') == 1
+        assert keys[1] == bytearray(32)
+        assert cache.evict(private_key=b'other') == 0
+        cache.wipe()
+        assert len(cache) == 0 and keys[2] == bytearray(32)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_decrypt_many(self):
+        messages = [(self.public_keys[i % 2 + 1], Ed25519.encrypt(self.keys[i % 2 + 1], self.public_keys[0], f'msg {i}'))
+                    for i in range(6)]
+        messages.append((self.public_keys[1], b'00' * 40))
+        decrypted = Ed25519.decrypt_many(self.keys[0], messages, max_workers=2, chunk_size=1)
+        assert decrypted == [f'msg {i}'.encode() for i in range(6)] + [None]
+        # a single chunk is decrypted without a pool of processes
+        with patch.object(ed25519, 'ProcessPoolExecutor', side_effect=AssertionError):
+            assert Ed25519.decrypt_many(self.keys[0], messages, max_workers=2) == decrypted
+
+    def test_encrypt_many(self):
+        recipients = self.public_keys[1:] * 3
+        with patch.object(ed25519, 'ProcessPoolExecutor', side_effect=AssertionError):
+            encrypted = Ed25519.encrypt_many(self.keys[0], recipients, 'Hello', max_workers=2)
+        encrypted += Ed25519.encrypt_many(self.keys[0], recipients, 'Hello', max_workers=2, chunk_size=2)
+        keys = dict(zip(self.public_keys, self.keys))
+        assert [Ed25519.decrypt(keys[public_key], self.public_keys[0], msg_hex)
+                for public_key, msg_hex in zip(recipients * 2, encrypted)] == [b'Hello'] * 12
+
+
+class TestBackends:
+
+    def setup(self):
+        self.random = random.Random(46)
+        ed25519.shared_keys.wipe()
+
+    def teardown(self):
+        ed25519.set_backend(ed25519.NativeBackend.name)
+        ed25519.shared_keys.wipe()
+
+    def test_agreement(self):
+        for _ in range(50):
+            private_key = self.random.getrandbits(256).to_bytes(32, 'little')
+            public_key = ed25519.PythonBackend.public_key(self.random.getrandbits(256).to_bytes(32, 'little'))
+            assert ed25519.NativeBackend.public_key(private_key) == ed25519.PythonBackend.public_key(private_key)
+            assert ed25519.NativeBackend.derive_shared_secret(private_key, public_key) == \
+                   ed25519.PythonBackend.derive_shared_secret(private_key, public_key)
+        # the identity and a point of order 4 are handled by the fallback
+        for public_key in [(1).to_bytes(32, 'little'), bytes(32)]:
+            assert ed25519.NativeBackend.derive_shared_secret(private_key, public_key) == \
+                   ed25519.PythonBackend.derive_shared_secret(private_key, public_key)
+
+    def test_set_backend(self):
+        ed25519.set_backend(ed25519.PythonBackend.name)
+        assert ed25519.backend is ed25519.PythonBackend
+        secret_key = Ed25519().secret_key(b'0000000000000000000000')
+        assert Ed25519().public_key(secret_key) == b'C4B8371902500B150BCFA9E4704AA504B4AFEDFFB472B26A777670EDD62FE4A7'
+        keys = [Ed25519().secret_key(bytes([i]) * 32) for i in range(2)]
+        encrypted = Ed25519.encrypt(keys[0], Ed25519().public_key(keys[1]), 'message')
+        ed25519.set_backend(ed25519.NativeBackend.name)
+        ed25519.shared_keys.wipe()
+        assert Ed25519.decrypt(keys[1], Ed25519().public_key(keys[0]), encrypted) == b'message'
+        with pytest.raises(ValueError):
+            ed25519.set_backend('unknown')
+
+    def test_verify_signatures(self):
+        items = []
+        for _ in range(20):
+            key = SymFacade.KeyPair(PrivateKey(self.random.getrandbits(256).to_bytes(32, 'little')))
+            message = self.random.getrandbits(800).to_bytes(100, 'little')
+            items.append((key.public_key.bytes, message, key.sign(message).bytes))
+        forged = list(items)
+        forged[3] = (items[3][0], items[3][1] + b'0', items[3][2])
+        forged[11] = (items[11][0], items[11][1], items[11][2][:32] + SignClass.l.to_bytes(32, 'little'))
+        forged[17] = (bytes(31) + b'\x80', items[17][1], items[17][2])
+        for backend in (ed25519.PythonBackend, ed25519.NativeBackend):
+            ed25519.set_backend(backend.name)
+            assert ed25519.verify_signatures(items) == [True] * 20
+            result = ed25519.verify_signatures(forged, chunk_size=8)
+            assert [i for i, is_valid in enumerate(result) if not is_valid] == [3, 11, 17]
+        assert ed25519.verify_signatures(forged, max_workers=2, chunk_size=8) == result
+
+
+def test_check_addresses():
+    address = 'TB2BOAUT2JESCX4KMCKTVY27CYYJ4YK3RJD7FCQ'
+    addresses = [address, address[:-1], address[:-1] + 'A', address.lower(), address[:-1] + '1']
+    expected = [AccountValidationState.OK, AccountValidationState.LENGTH_FAILURE] + \
+               [AccountValidationState.CHECKSUM_FAILURE] * 3
+    assert [ed25519.check_address(address) for address in addresses] == expected
+    states = ed25519.check_addresses(addresses)
+    assert [ed25519.ADDRESS_STATES[state] for state in states] == expected
+    assert ed25519.check_addresses(addresses * 100, max_workers=2, chunk_size=100) == states * 100
+
+
+def test_public_keys_to_addresses():
+    keys = Ed25519().public_keys(Ed25519().secret_keys(5))
+    for main_net in (False, True):
+        addresses = [Ed25519.get_address(key, main_net) for key in keys]
+        assert ed25519.public_keys_to_addresses(keys, main_net) == addresses
+        assert ed25519.public_keys_to_addresses([key.decode() for key in keys], main_net,
+                                                max_workers=2, chunk_size=2) == addresses
+    assert ed25519.public_keys_to_addresses(['00', 'XY' * 32, keys[0]]) == [None, None, Ed25519.get_address(keys[0])]
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+import pytest
+from nempy.sym import network
+from nempy.sym.constants import Fees
+from nempy.sym.estimator import FeeEstimator
+
+
+def test_rolling_window():
+    estimator = FeeEstimator(window=100, min_fee_multiplier=5)
+    assert estimator.fee_multiplier(Fees.FAST) is None
+    assert estimator.calc_max_fee(200, Fees.FAST) is None
+    assert estimator.fee_multiplier(Fees.ZERO) == 0
+    # the first 100 blocks are displaced by the next 100
+    for height, fee_multiplier in enumerate([1000] * 100 + list(range(1, 101)), start=1):
+        estimator.observe(fee_multiplier, height)
+    assert len(estimator) == 100
+    assert estimator.sorted == list(range(1, 101))
+    assert estimator.fee_multiplier(Fees.SLOWEST) == 11
+    assert estimator.fee_multiplier(Fees.SLOW) == 36
+    assert estimator.fee_multiplier(Fees.AVERAGE) == 66
+    assert estimator.fee_multiplier(Fees.FAST) == 91
+    assert estimator.calc_max_fee(200, Fees.FAST) == 91 * 200
+    # repeated and old blocks are ignored
+    estimator.observe(0, 150)
+    assert estimator.sorted == list(range(1, 101))
+    multipliers = estimator.fee_multipliers()
+    assert multipliers[Fees.ZERO] < multipliers[Fees.SLOWEST] < multipliers[Fees.SLOW] \
+           < multipliers[Fees.AVERAGE] < multipliers[Fees.FAST]
+    with pytest.raises(ValueError):
+        FeeEstimator(window=0)
+
+
+def test_min_fee_multiplier(node):
+    estimator = FeeEstimator(min_fee_multiplier=10)
+    estimator.on_block({'topic': 'block', 'data': {'block': {'height': '1', 'feeMultiplier': 0}}})
+    assert estimator.fee_multiplier(Fees.FAST) == 10
+    # by default the floor is the minimum multiplier of the node
+    estimator = FeeEstimator()
+    for height, fee_multiplier in enumerate([0] * 5 + [50] * 5, start=1):
+        estimator.observe(fee_multiplier, height)
+    assert estimator.fee_multiplier(Fees.SLOWEST) == node.fees['minFeeMultiplier']
+    assert estimator.fee_multiplier(Fees.FAST) == 50
+    assert estimator.fee_multiplier(Fees.ZERO) == 0
+
+
+def test_load():
+    blocks = [{'block': {'height': str(height), 'feeMultiplier': height}} for height in range(250, 0, -1)]
+    pages = [blocks[i:i + 100] for i in range(0, len(blocks), 100)]
+    estimator = FeeEstimator(window=120)
+    with patch.object(network, 'search_blocks', side_effect=pages) as mock:
+        estimator.load()
+    assert mock.call_count == 2
+    assert estimator.sorted == list(range(131, 251))
+    assert estimator.last_height == 250
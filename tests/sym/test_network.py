@@ -1,15 +1,18 @@
+import asyncio
+import base64
 import tempfile
 import threading
 import time
 import datetime
-from unittest.mock import patch, PropertyMock
+import json
+from unittest.mock import patch, PropertyMock, AsyncMock
 
 import pytest
-from nempy.sym import network
+from nempy.sym import ed25519, network
 from nempy.sym.constants import NetworkType
 import requests
 from requests import exceptions
-from nempy.sym.network import Monitor
+from nempy.sym.network import Monitor, RedundantMonitor
 
 
 def test_node_selector():
@@ -144,6 +147,43 @@ def test_check_transaction_state():
     assert network.check_transaction_state(transaction_hash.replace('B', '0')) == network.TransactionStatus.NOT_FOUND
 
 
+def test_check_transaction_states():
+    hashes = [f'{i:064X}' for i in range(250)]
+    requested = []
+
+    class Answer:
+        status_code = 200
+
+        def __init__(self, chunk):
+            self.chunk = chunk
+
+        def json(self):
+            return [{'group': 'failed', 'code': 'Failure_Core_Past_Deadline', 'hash': h, 'deadline': '1'}
+                    if int(h, 16) % 2 else
+                    {'group': 'confirmed', 'code': 'Success', 'hash': h, 'deadline': '1', 'height': '10'}
+                    for h in self.chunk if int(h, 16) < 200]
+
+    def post(url, json, headers, timeout):
+        assert url == 'http://node:3000/transactionStatus'
+        requested.append(json['hashes'])
+        return Answer(json['hashes'])
+
+    with patch('requests.post', side_effect=post):
+        states = network.check_transaction_states(hashes, url='http://node:3000')
+    assert sorted(len(chunk) for chunk in requested) == [50, 100, 100]
+    assert len(states) == 250
+    assert states[hashes[0]].group == network.TransactionStatus.CONFIRMED_ADDED
+    assert states[hashes[0]].height == 10
+    assert states[hashes[1]].group == network.TransactionStatus.FAILED
+    assert states[hashes[1]].code == 'Failure_Core_Past_Deadline'
+    assert states[hashes[249]].group == network.TransactionStatus.NOT_FOUND
+    with pytest.raises(network.SymbolNetworkException):
+        network.check_transaction_states(['V' * 64])
+    with patch('requests.post', side_effect=exceptions.RequestException):
+        with pytest.raises(exceptions.RequestException):
+            network.check_transaction_states(hashes)
+
+
 def test_get_node_network():
     network.node_selector.network_type = NetworkType.MAIN_NET
     assert network.get_node_network() == NetworkType.MAIN_NET
@@ -194,5 +234,225 @@ def test_monitor():
             Monitor(network.node_selector.url, subscribers, formatting=True, log=log, callback=monitoring_callback)
 
 
+def test_redundant_monitor():
+    urls = ['http://ngl-dual-301.testnet.symboldev.network:3000', 'http://ngl-dual-401.testnet.symboldev.network:3000']
+    with patch.object(RedundantMonitor, 'monitoring', new=AsyncMock()):
+        monitor = RedundantMonitor(urls, ['block'], history_size=2)
+    block = {'topic': 'block', 'data': {'meta': {'hash': 'A' * 64}}}
+    status = {'topic': 'status/TDPFLBK4NSCKUBGAZDWQWCUFNJOJB33Y5R5AWPQ', 'data': {'hash': 'A' * 64}}
+    assert RedundantMonitor.event_key(block) != RedundantMonitor.event_key(status)
+    assert monitor.arrival(urls[0], block) is True
+    time.sleep(0.01)
+    assert monitor.arrival(urls[1], block) is False
+    assert monitor.arrival(urls[1], status) is True
+    assert monitor.stats[urls[0]].first == 1
+    assert monitor.stats[urls[1]].events == 2
+    assert monitor.stats[urls[1]].max_lag >= 0.01
+    # the oldest event is forgotten when the history is full
+    monitor.arrival(urls[0], {'topic': 'finalizedBlock', 'data': {'hash': 'B' * 64}})
+    assert monitor.arrival(urls[0], block) is True
+    assert urls[0] in monitor.report()
+    with pytest.raises(ValueError):
+        RedundantMonitor(['http:/not-valid'], ['block'])
+
+
+def test_redundant_monitor_reconnect():
+    url = 'http://ngl-dual-301.testnet.symboldev.network:3000'
+    # frames of consecutive connections: no UID, a malformed frame, a frame that is not an event
+    connections = [['{}'], ['{"uid": "1"}', 'not json'], ['{"uid": "2"}', '[]']]
+
+    class Connection:
+        def __init__(self, frames):
+            self.frames = frames
+
+        async def __aenter__(self):
+            return self
 
+        async def __aexit__(self, *args):
+            return False
 
+        async def recv(self):
+            return self.frames.pop(0)
+
+        async def send(self, data):
+            pass
+
+    def connect(ws_url):
+        if not connections:
+            raise asyncio.CancelledError()
+        return Connection(connections.pop(0))
+
+    with patch.object(RedundantMonitor, 'monitoring', new=AsyncMock()):
+        monitor = RedundantMonitor([url], ['block'], reconnect_delay=0)
+    with patch('websockets.connect', side_effect=connect):
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.new_event_loop().run_until_complete(monitor.listening_node(url))
+    assert monitor.stats[url].reconnects == 3
+    assert monitor.stats[url].is_connected is False
+
+
+def test_get_accounts_infos():
+    addresses = ['TBTCYCIDRQ7TJBEAYDZLDPHOTGIRKZHO5CH2SMQ', 'TCULT7R63UUSG2NTE3FJTWJD3U2JEOWPOFYEQQA'] * 2
+    requested = []
+
+    class Answer:
+        status_code = 200
+
+        def __init__(self, chunk):
+            self.chunk = chunk
+
+        def json(self):
+            # the second account is unknown to the network
+            return [{'account': {'address': base64.b32decode(address + '=').hex().upper(), 'mosaics': []}}
+                    for address in self.chunk if address.startswith('TB')]
+
+    def post(url, json, headers, timeout):
+        requested.append(json['addresses'])
+        return Answer(json['addresses'])
+
+    with patch('requests.post', side_effect=post):
+        infos = network.get_accounts_infos(addresses, chunk_size=1)
+    assert sorted(requested) == [[addresses[0]], [addresses[1]]]
+    assert list(infos) == [addresses[0]]
+    with pytest.raises(network.SymbolNetworkException):
+        network.get_accounts_infos(['TBTCYCIDRQ7TJBEAYDZLDPHOTGIRKZHO5CH2SMA'])
+
+
+def test_network_context(node):
+    context = network.NetworkContext(ttl=3600)
+    try:
+        with patch.object(network.NodeSelector, 'url', new_callable=PropertyMock) as mock_url:
+            mock_url.return_value = 'http://node-1:3000'
+            node.properties['plugins']['aggregate']['maxTransactionsPerAggregate'] = "1'000"
+            for _ in range(10):
+                assert context.network_type == NetworkType.TEST_NET
+                assert context.fee_multipliers == node.fees
+                assert context.sym_facade.network.generation_hash_seed is not None
+                assert context.max_transactions_per_aggregate == 1000
+            assert node.get_node_info.call_count == 1
+            assert node.get_fee_multipliers.call_count == 1
+            assert node.get_network_properties.call_count == 1
+            assert context.thread.is_started
+            # another node - the context is reloaded
+            mock_url.return_value = 'http://node-2:3000'
+            assert context.generation_hash_seed == node.node_info['networkGenerationHashSeed']
+            assert node.get_node_info.call_count == 2
+            node.get_node_info.return_value = {'networkGenerationHashSeed': '0' * 64}
+            context.reset()
+            # nothing derived from the previous network survives the reset
+            assert context._generation_hash_seed is None and context._sym_facade is None
+            assert context._max_transactions_per_aggregate is None
+            # offline the limit of the protocol is used
+            context.set_offline(NetworkType.TEST_NET, node.node_info['networkGenerationHashSeed'], node.fees)
+            assert context.max_transactions_per_aggregate == 100
+            context.reset()
+            with pytest.raises(EnvironmentError):
+                context.network_type
+    finally:
+        context.reset()
+
+
+def test_network_context_single_thread(node):
+    context = network.NetworkContext(ttl=3600)
+    barrier = threading.Barrier(8)
+
+    def first_call():
+        barrier.wait()
+        context.network_type
+
+    try:
+        with patch.object(network.NodeSelector, 'url', new_callable=PropertyMock, return_value='http://node-1:3000'), \
+                patch.object(network.Thread, 'start', autospec=True, side_effect=network.Thread.start) as mock_start:
+            threads = [threading.Thread(target=first_call) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        context.reset()
+    assert mock_start.call_count == 1
+
+
+def test_public_key_directory():
+    public_key = 'F291486DAD4B920464FB701EEB516890224292EDE0CAD118FD5A8C4ECB0FECE1'
+    address = 'TBTCYCIDRQ7TJBEAYDZLDPHOTGIRKZHO5CH2SMQ'
+    unknown = 'TCULT7R63UUSG2NTE3FJTWJD3U2JEOWPOFYEQQA'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = f'{tmp_dir}/public_keys.json'
+        directory = network.PublicKeyDirectory()
+        assert directory.load(path) == 0
+        account_info = {'account': {'address': base64.b32decode(address + '=').hex().upper(), 'publicKey': public_key}}
+        with patch.object(network, 'get_accounts_info', return_value=account_info) as mock:
+            for _ in range(3):
+                assert directory.lookup(address) == public_key
+        assert mock.call_count == 1
+        # accounts without outgoing transactions have no public key yet
+        infos = {unknown: {'account': {'address': base64.b32decode(unknown + '=').hex().upper(),
+                                       'publicKey': '0' * 64}}}
+        with patch.object(network, 'get_accounts_infos', return_value=infos) as mock:
+            assert directory.prefetch([address, unknown]) == 1
+            assert directory.prefetch([address]) == 1
+        mock.assert_called_once_with([unknown], 100, 8)
+        # signers are collected from monitor events
+        directory.on_event({'topic': 'block', 'data': {'block': {'signerPublicKey': public_key.lower(),
+                                                                 'network': 104}}})
+        assert len(directory) == 2
+        assert directory.address(public_key, 152) == address
+
+        restored = network.PublicKeyDirectory()
+        assert restored.load(path) == 1
+        assert restored.get(address) == public_key
+
+
+def test_search_transactions_directory():
+    public_key = 'F291486DAD4B920464FB701EEB516890224292EDE0CAD118FD5A8C4ECB0FECE1'
+    address = 'TBTCYCIDRQ7TJBEAYDZLDPHOTGIRKZHO5CH2SMQ'
+    info = {'signerPublicKey': public_key, 'version': 1, 'network': 152, 'type': 16724,
+            'recipientAddress': base64.b32decode(address + '=').hex().upper(), 'mosaics': []}
+    answer = requests.Response()
+    answer.status_code = 200
+    answer._content = json.dumps({'data': [{'id': '0', 'meta': {'height': 1, 'index': 0},
+                                            'transaction': info}]}).encode()
+    directory = network.PublicKeyDirectory()
+    with patch.object(network.NodeSelector, 'url', new_callable=PropertyMock, return_value='http://node:3000'), \
+            patch('requests.get', return_value=answer), \
+            patch.object(network.PublicKeyDirectory, 'add', wraps=directory.add) as mock_add:
+        # signers are not collected unless the directory is given
+        assert len(network.search_transactions(humanization=False)) == 1
+        mock_add.assert_not_called()
+        network.search_transactions(humanization=False, directory=directory)
+    assert directory.get(address) == public_key
+
+
+def test_decrypt_messages(public_keys):
+    from ..test_user_data import TestAccountData
+    account0, account1 = TestAccountData().setup()
+
+    def transaction(signer, recipient_address, message):
+        info = {'signerPublicKey': signer.public_key, 'version': 1, 'network': 152, 'type': 16724,
+                'recipientAddress': base64.b32decode(recipient_address + '=').hex().upper(),
+                'message': message.hex().upper(), 'mosaics': []}
+        return network.TransactionResponse(id='0', meta=network.Meta(height=1, index=0),
+                                           transaction=network.TransactionInfo(**info))
+
+    incoming = [b'\x01' + ed25519.Ed25519.encrypt(account1.private_key, account0.public_key, f'in {i}')
+                for i in range(3)]
+    outgoing = b'\x01' + ed25519.Ed25519.encrypt(account0.private_key, account1.public_key, 'out')
+    transactions = [transaction(account1, account0.address, message) for message in incoming]
+    transactions += [transaction(account0, account1.address, outgoing),
+                     transaction(account1, account0.address, b'\x00plain'),
+                     transaction(account1, account0.address, incoming[0][:-2] + b'00')]
+    public_keys.set(account1.address, account1.public_key)
+    ed25519.shared_keys.wipe()
+    messages = network.decrypt_messages(account0.private_key, transactions, max_workers=1)
+    assert messages == ['in 0', 'in 1', 'in 2', 'out', None, None]
+    # one derivation for the only counterparty
+    assert len(ed25519.shared_keys) == 1
+    ed25519.shared_keys.wipe()
+    humanized = [transaction.copy(deep=True) for transaction in transactions]
+    with patch.object(network.NodeSelector, 'network_type', new_callable=PropertyMock,
+                      return_value=NetworkType.TEST_NET):
+        for transaction in humanized:
+            transaction.transaction.humanization()
+    assert [transaction.transaction.is_encrypted for transaction in humanized] == [True] * 4 + [False, True]
+    assert network.decrypt_messages(account0.private_key, humanized, max_workers=2) == messages
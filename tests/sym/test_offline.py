@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+import requests
+from nempy.sym import network, offline
+from nempy.sym.api import Transaction, Mosaic, PlainMessage, aliases, dividers
+from nempy.sym.constants import NetworkType
+
+from ..test_user_data import TestAccountData
+
+
+class TestOffline:
+
+    @pytest.fixture(autouse=True)
+    def snapshot_setup(self, node):
+        self.fees = node.fees
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.directory.name, 'snapshot.json')
+        self.export_path = os.path.join(self.directory.name, 'signed.jsonl')
+        self.account0, self.account1 = TestAccountData().setup()
+        namespace_info = {'namespace': {'alias': {'mosaicId': '7CDF3B117A3C40CC'}}}
+        try:
+            with patch.object(network, 'get_namespace_info', return_value=namespace_info), \
+                    patch.object(network, 'get_divisibility', return_value=3):
+                self.snapshot = offline.save_snapshot(self.snapshot_path, ['@offline.test'])
+            network.network_context.reset()
+            aliases.aliases.pop('offline.test', None)
+            dividers.dividers.pop('7CDF3B117A3C40CC', None)
+            yield
+        finally:
+            aliases.aliases.pop('offline.test', None)
+            dividers.dividers.pop('7CDF3B117A3C40CC', None)
+            self.directory.cleanup()
+
+    def test_snapshot(self):
+        assert self.snapshot.network_type == NetworkType.TEST_NET
+        assert self.snapshot.aliases['offline.test'] == '7CDF3B117A3C40CC'
+        assert self.snapshot.dividers['7CDF3B117A3C40CC'] == 3
+        assert self.snapshot.fee_multipliers == self.fees
+        with patch.object(network.network_context, 'is_offline', True):
+            with pytest.raises(RuntimeError):
+                offline.save_snapshot(self.snapshot_path)
+
+    def test_offline_signing(self):
+        offline.load_snapshot(self.snapshot_path)
+        # any request to the node fails the test
+        with patch.object(requests, 'get', side_effect=AssertionError), \
+                patch.object(requests, 'post', side_effect=AssertionError):
+            transaction = Transaction()
+            assert transaction.network_type == NetworkType.TEST_NET
+            mosaic = Mosaic('@offline.test', 1.5)
+            assert mosaic == (0x7CDF3B117A3C40CC, 1500)
+            with pytest.raises(ValueError):
+                Mosaic('@unknown.test', 1)
+            with pytest.raises(ValueError):
+                Mosaic('091F837E059AE13D', 1)
+            signed = [transaction.create(self.account0.private_key, self.account1.address, mosaic,
+                                         PlainMessage(f'offline {i}'), deadline={'minutes': 5}) for i in range(3)]
+        assert offline.export_payloads(self.export_path, signed) == 3
+        imported = offline.import_payloads(self.export_path, network_type=NetworkType.TEST_NET)
+        assert [(item.hash, item.payload.encode()) for item in imported] == signed
+        now = network.Timing(NetworkType.TEST_NET).now()
+        assert now < imported[0].deadline <= now + 5 * 60 * 1000
+        with patch.object(network.Timing, 'now', return_value=max(item.deadline for item in imported) + 1):
+            assert offline.import_payloads(self.export_path, network_type=NetworkType.TEST_NET) == []
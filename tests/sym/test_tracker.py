@@ -0,0 +1,123 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+import websockets
+
+from nempy.sym import network
+from nempy.sym.constants import TransactionStatus, PAST_DEADLINE_CODE, NetworkType
+from nempy.sym.tracker import ConfirmationTracker
+
+ADDRESS = 'TDPFLBK4NSCKUBGAZDWQWCUFNJOJB33Y5R5AWPQ'
+
+
+class FakeSocket:
+    """Websocket that returns the frames and then waits until it is closed"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def send(self, data):
+        pass
+
+    async def recv(self):
+        if self.frames:
+            return self.frames.pop(0)
+        await asyncio.Event().wait()
+
+
+class TestConfirmationTracker:
+
+    def setup(self):
+        self.tracker = ConfirmationTracker(network_type=NetworkType.TEST_NET)
+        self.deadline = self.tracker.timing.calc_deadline(minutes=2)
+
+    def test_channels(self):
+        assert self.tracker.channels() == {'finalizedBlock'}
+        self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        self.tracker.track('B' * 64, ADDRESS, self.deadline)
+        assert self.tracker.channels() == {'finalizedBlock', f'confirmedAdded/{ADDRESS}', f'status/{ADDRESS}'}
+
+    def test_confirmed(self):
+        future = self.tracker.track('a' * 64, ADDRESS, self.deadline)
+        assert self.tracker.track('A' * 64, ADDRESS, self.deadline) is future
+        self.tracker.handle({'topic': f'confirmedAdded/{ADDRESS}',
+                             'data': {'meta': {'hash': 'A' * 64, 'height': '100'}}})
+        result = future.result(0)
+        assert result.is_confirmed and result.height == 100
+        assert not self.tracker.pending
+
+    def test_rejected(self):
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        self.tracker.handle({'topic': f'status/{ADDRESS}',
+                             'data': {'hash': 'A' * 64, 'code': 'Failure_Core_Insufficient_Balance'}})
+        result = future.result(0)
+        assert result.status == TransactionStatus.FAILED
+        assert result.code == 'Failure_Core_Insufficient_Balance'
+
+    def test_finalization(self):
+        self.tracker.wait_finalization = True
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        self.tracker.handle({'topic': f'confirmedAdded/{ADDRESS}',
+                             'data': {'meta': {'hash': 'A' * 64, 'height': '100'}}})
+        self.tracker.handle({'topic': 'finalizedBlock', 'data': {'height': '99'}})
+        assert not future.done()
+        self.tracker.handle({'topic': 'finalizedBlock', 'data': {'height': '100'}})
+        assert future.result(0).is_confirmed
+
+    def test_expire(self):
+        expired = self.tracker.track('A' * 64, ADDRESS, self.tracker.timing.now() - 60000)
+        confirmed = self.tracker.track('B' * 64, ADDRESS, self.tracker.timing.now() - 60000)
+        alive = self.tracker.track('C' * 64, ADDRESS, self.deadline)
+
+        states = {'A' * 64: network.TransactionStatusInfo(hash='A' * 64, group=TransactionStatus.NOT_FOUND),
+                  'B' * 64: network.TransactionStatusInfo(hash='B' * 64, group=TransactionStatus.CONFIRMED_ADDED,
+                                                          height=100)}
+        with patch.object(network, 'check_transaction_states', return_value=states):
+            self.tracker.expire()
+        assert expired.result(0).code == PAST_DEADLINE_CODE
+        assert confirmed.result(0).is_confirmed
+        assert not alive.done()
+
+    def test_poll(self):
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        states = {'A' * 64: network.TransactionStatusInfo(hash='A' * 64, group=TransactionStatus.FAILED,
+                                                          code='Failure_Core_Insufficient_Balance')}
+        with patch.object(network, 'check_transaction_states', return_value=states):
+            self.tracker.poll(['A' * 64])
+        assert future.result(0).code == 'Failure_Core_Insufficient_Balance'
+
+    def test_stop(self):
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        self.tracker.start().stop()
+        with pytest.raises(RuntimeError):
+            future.result(0)
+        assert not self.tracker.pending
+
+    def test_failure(self):
+        async def listening():
+            raise ValueError('Unexpected error')
+
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        with patch.object(self.tracker, 'listening', new=listening):
+            self.tracker.start()
+            self.tracker.thread.join(5)
+        with pytest.raises(ValueError):
+            future.result(0)
+
+    def test_malformed_frames(self):
+        future = self.tracker.track('A' * 64, ADDRESS, self.deadline)
+        frames = [json.dumps({'uid': 'uid'}), 'not json', '[]', json.dumps({'topic': 'finalizedBlock', 'data': {}}),
+                  json.dumps({'topic': f'confirmedAdded/{ADDRESS}', 'data': {'meta': {'hash': 'A' * 64}}})]
+        self.tracker.url = 'http://node:3000'
+        with patch.object(websockets, 'connect', return_value=FakeSocket(frames)), \
+                patch.object(network, 'check_transaction_states', return_value={}):
+            with self.tracker:
+                assert future.result(5).is_confirmed
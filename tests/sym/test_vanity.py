@@ -0,0 +1,45 @@
+import pytest
+from nempy.sym import ed25519
+from nempy.sym.constants import NetworkType
+from nempy.sym.vanity import VanitySearch, pattern_bits
+
+
+def address_of(private_key: str) -> str:
+    return ed25519.Ed25519.get_address(ed25519.Ed25519().public_key(private_key))
+
+
+def test_pattern_bits():
+    # `T` is the network byte, the second character keeps 2 random bits
+    assert pattern_bits('T', 0, 0x98) == 0
+    assert pattern_bits('TA', 0, 0x98) == 2
+    assert pattern_bits('TAB', 0, 0x98) == 7
+    assert pattern_bits('TE', 0, 0x98) is None
+    assert pattern_bits('N', 0, 0x98) is None
+    assert pattern_bits('NC', 0, 0x68) == 2
+    # the last character holds the last 2 bits of the checksum
+    assert pattern_bits('AQ', 37, 0x98) == 7
+    assert pattern_bits('B', 38, 0x98) is None
+
+
+def test_patterns():
+    search = VanitySearch(prefixes=['ta-b'], suffixes=['Q'])
+    assert search.prefixes == ('TAB',)
+    assert search.expected_keys == 1 / (2 ** -7 + 2 ** -2)
+    assert VanitySearch(prefixes=['N'], network_type=NetworkType.MAIN_NET).expected_keys == 1
+    for prefixes, suffixes in [([], []), (['T0'], []), (['TE'], []), ([], ['B']), (['T' * 40], [])]:
+        with pytest.raises(ValueError):
+            VanitySearch(prefixes, suffixes)
+
+
+def test_search():
+    search = VanitySearch(prefixes=['TA'], suffixes=['AY'])
+    progress = []
+    matches = search.search(count=5, max_workers=1, chunk_size=50, on_progress=lambda s: progress.append(s.checked))
+    assert len(matches) == 5
+    assert progress and progress[-1] == search.checked
+    assert search.keys_per_second > 0 and search.expected_seconds > 0
+    for match in matches:
+        assert match.address.startswith('TA') or match.address.endswith('AY')
+        assert address_of(match.private_key) == match.address == ed25519.Ed25519.get_address(match.public_key)
+    # nothing is found in time
+    assert VanitySearch(prefixes=['TAAAAAAAAAAA']).search(timeout=0.1, max_workers=1, chunk_size=50) == []
@@ -0,0 +1,76 @@
+from binascii import hexlify
+from unittest.mock import patch
+
+import pytest
+from symbolchain.core.CryptoTypes import PrivateKey
+from symbolchain.core.facade.SymFacade import SymFacade
+from nempy.sym import network, verifier
+from nempy.sym.constants import NetworkType, NETWORK_GENERATION_HASH_SEED_TEST
+from nempy.sym.network import TransactionResponse
+
+PRIVATE_KEY = '8E5DE2C9E5ABFAF1B9F8C2A3B1A2E5C7D26FD1DA1B2E3F4A5B6C7D8E9F0A1B2C'
+RECIPIENT = 'TCKGO2HOIQZHAUUM6XYIHV63KHMMYTNQYJ6PX6Q'
+
+
+def signed_transfer(message: bytes = b'\x00hello', index: int = 0) -> TransactionResponse:
+    facade = SymFacade(NetworkType.TEST_NET.value)
+    key_pair = SymFacade.KeyPair(PrivateKey(PRIVATE_KEY))
+    transaction = facade.transaction_factory.create({
+        'type': 'transfer',
+        'signer_public_key': key_pair.public_key,
+        'recipient_address': SymFacade.Address(RECIPIENT).bytes,
+        'mosaics': [(0x091F837E059AE13C, 1000000)],
+        'fee': 17600,
+        'deadline': 123456789,
+        'message': message
+    })
+    signature = facade.sign_transaction(key_pair, transaction)
+    # the node returns raw fields as hex strings
+    return TransactionResponse(**{
+        'id': str(index),
+        'meta': {'height': 10, 'index': index, 'hash': 'A' * 64},
+        'transaction': {
+            'size': transaction.get_size(),
+            'signature': str(signature),
+            'signerPublicKey': str(key_pair.public_key),
+            'version': 1,
+            'network': 152,
+            'type': 16724,
+            'maxFee': 17600,
+            'deadline': 123456789,
+            'recipientAddress': hexlify(SymFacade.Address(RECIPIENT).bytes).decode().upper(),
+            'message': hexlify(message).decode().upper(),
+            'mosaics': [{'id': '091F837E059AE13C', 'amount': 1000000}]
+        }
+    })
+
+
+def test_signing_data():
+    transaction = signed_transfer()
+    data = verifier.signing_data(transaction)
+    assert data.startswith(bytes.fromhex(NETWORK_GENERATION_HASH_SEED_TEST))
+    transaction.transaction.signature = None
+    assert verifier.signing_data(transaction) is None
+    # humanized transactions have lost the raw fields
+    transaction.transaction.type = 'TRANSFER'
+    with pytest.raises(ValueError):
+        verifier.signing_data(transaction)
+
+
+def test_verify_transactions():
+    transactions = [signed_transfer(bytes([0]) + bytes([i]) * 8, i) for i in range(5)]
+    transactions[1].transaction.maxFee += 1
+    transactions[3].transaction.signature = None
+    assert verifier.verify_transactions(transactions) == [True, False, True, None, True]
+    # signatures of another network do not match
+    other_seed = '0' * 64
+    assert verifier.verify_transactions(transactions, other_seed) == [False, False, False, None, False]
+
+
+def test_verify_block():
+    transactions = [signed_transfer(index=i) for i in range(3)]
+    with patch.object(network, 'search_transactions', return_value=transactions) as mock:
+        result = verifier.verify_block(10)
+    assert mock.call_args.kwargs['height'] == 10
+    assert mock.call_args.kwargs['humanization'] is False
+    assert [is_valid for _, is_valid in result] == [True] * 3
@@ -0,0 +1,94 @@
+from binascii import hexlify
+from unittest.mock import patch
+
+import pytest
+from symbolchain.core.CryptoTypes import PublicKey
+from symbolchain.core.facade.SymFacade import SymFacade
+from nempy.sym import network
+from nempy.sym.constants import NetworkType
+from nempy.sym.network import TransactionResponse
+from nempy.sym.watcher import AddressIndex, BloomFilter, BlockAddressWatcher, address_to_raw, raw_to_address
+
+SIGNER_PUBLIC_KEY = 'E5EA94B6D1D9E8E4C4EA2C6B2AB1B69E10A7A1C6C0E05AB2D5CC4F2BB4C33D71'
+RECIPIENT = 'TCKGO2HOIQZHAUUM6XYIHV63KHMMYTNQYJ6PX6Q'
+UNKNOWN = 'TBDIVBW3V2NQIKBVWKUP7GOQIJHADBLW5Y3KDMA'
+
+
+def signer_address() -> str:
+    facade = SymFacade(NetworkType.TEST_NET.value)
+    return str(facade.network.public_key_to_address(PublicKey(SIGNER_PUBLIC_KEY)))
+
+
+def transfer(recipient: str, index: int = 0) -> TransactionResponse:
+    return TransactionResponse(**{
+        'id': str(index),
+        'meta': {'height': 10, 'index': index, 'aggregateHash': 'A' * 64, 'aggregateId': 'B' * 24},
+        'transaction': {
+            'signerPublicKey': SIGNER_PUBLIC_KEY,
+            'version': 1,
+            'network': 152,
+            'type': 16724,
+            'recipientAddress': hexlify(address_to_raw(recipient)).decode().upper(),
+            'message': None,
+            'mosaics': []
+        }
+    })
+
+
+def test_address_codec():
+    raw = address_to_raw(RECIPIENT)
+    assert len(raw) == 24
+    assert raw_to_address(raw) == RECIPIENT
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, 0.01)
+    items = [i.to_bytes(24, 'little') for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(i.to_bytes(24, 'big') in bloom for i in range(1000, 11000))
+    assert false_positives < 300
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+
+
+def test_address_index():
+    for capacity in (None, 100):
+        index = AddressIndex([RECIPIENT], bloom_capacity=capacity)
+        assert len(index) == 1
+        assert address_to_raw(RECIPIENT) in index
+        assert address_to_raw(UNKNOWN) not in index
+    with pytest.raises(ValueError):
+        AddressIndex(['TCKGO2HOIQZHAUUM'])
+
+
+def test_block_watcher():
+    matches = []
+    watcher = BlockAddressWatcher([RECIPIENT, signer_address()], matches.append,
+                                  network_type=NetworkType.TEST_NET, page_size=2)
+    pages = [[transfer(RECIPIENT, 0), transfer(UNKNOWN, 1)], [transfer(UNKNOWN, 2)]]
+    with patch.object(network, 'search_transactions', side_effect=pages) as mock:
+        watcher.on_block({'topic': 'block', 'data': {'block': {'height': '10'}}})
+        assert mock.call_count == 2
+        assert mock.call_args.kwargs['height'] == 10
+        assert mock.call_args.kwargs['page_number'] == 2
+        # the block is processed only once
+        watcher.on_block({'topic': 'block', 'data': {'block': {'height': '10'}}})
+        assert mock.call_count == 2
+    roles = [(match.role, match.address) for match in matches]
+    assert roles.count(('signer', signer_address())) == 3
+    assert roles.count(('recipient', RECIPIENT)) == 1
+    assert len(matches) == 4
+
+
+def test_block_watcher_gap():
+    matches = []
+    watcher = BlockAddressWatcher([RECIPIENT], matches.append, network_type=NetworkType.TEST_NET)
+    watcher.last_height = 10
+    with patch.object(network, 'search_transactions', return_value=[transfer(RECIPIENT)]) as mock:
+        watcher.on_block({'topic': 'block', 'data': {'block': {'height': '13'}}})
+    # the skipped blocks 11 and 12 are fetched before the new one
+    assert [call.kwargs['height'] for call in mock.call_args_list] == [11, 12, 13]
+    assert watcher.last_height == 13
+    assert len(matches) == 3
@@ -2,7 +2,7 @@ from unittest.mock import patch, PropertyMock
 
 import pytest
 from nempy.engine import XYMEngine, EngineStatusCode, NEMEngine
-from nempy.sym import network
+from nempy.sym import api as sym, network, offline
 from nempy.sym.constants import BlockchainStatuses, TransactionStatus
 
 from .test_user_data import TestAccountData
@@ -16,6 +16,7 @@ class TestEngine:
         self.account0 = self.account0.encrypt(self.pw)
         self.engine = XYMEngine(self.account0)
 
+    @pytest.mark.usefixtures('public_keys')
     def test_send_tokens(self):
         _, status = self.engine.send_tokens('TBRLIS-EH5QYA-KK76EF-IGHWQE-4DHDYO-JAWNYK-ZBA', [('@symbol.xym', 0.001)], 'Hello NEM!', True, self.pw)
         assert status == EngineStatusCode.INVALID_ACCOUNT_INFO
@@ -60,3 +61,49 @@ class TestEngine:
             nem_engine.send_tokens(None, None, None, None, None, None)
 
 
+def test_send_encrypted(node, public_keys):
+    account0, account1 = TestAccountData().setup()
+    unknown = 'TDPFLBK4NSCKUBGAZDWQWCUFNJOJB33Y5R5AWPQ'
+    recipients = [(account1.address, [('091F837E059AE13C', 0.1)]), (unknown, []), (account1.address, [])]
+    public_keys.set(account1.address, account1.public_key)
+    with patch.object(network, 'get_accounts_infos', return_value={}) as mock_infos, \
+            patch.object(network.NodeSelector, 'url', new_callable=PropertyMock, return_value='http://node:3000'), \
+            patch.object(sym.Mosaic, 'get_divisibility', return_value=6), \
+            patch.object(network, 'send_transaction', return_value=True) as mock_send:
+        engine = XYMEngine(account0)
+        results = engine.send_encrypted(recipients, 'Hello NEM!', max_workers=2)
+    mock_infos.assert_called_once_with([unknown], 100, 8)
+    assert mock_send.call_count == 2
+    assert [status for _, status in results] == [EngineStatusCode.ACCEPTED, EngineStatusCode.INVALID_ACCOUNT_INFO,
+                                                 EngineStatusCode.ACCEPTED]
+    assert results[0][0] != results[2][0]
+
+
+def test_sign_tokens(node):
+    account0, account1 = TestAccountData().setup()
+    with patch.object(network.NodeSelector, 'url', new_callable=PropertyMock, return_value='http://node:3000'), \
+            patch.object(sym.Mosaic, 'get_divisibility', return_value=6), \
+            patch.object(network, 'send_transaction') as mock_send:
+        engine = XYMEngine(account0)
+        entity_hash, payload = engine.sign_tokens(account1.address, [('091F837E059AE13C', 0.1)], 'Hello NEM!',
+                                                  deadline={'minutes': 5})
+    mock_send.assert_not_called()
+    assert entity_hash is not None
+    now = engine.timing.now()
+    assert now < offline.payload_deadline(payload) <= now + 5 * 60 * 1000
+
+
+def test_signing_session(node):
+    account0, _ = TestAccountData().setup()
+    with patch.object(network.NodeSelector, 'url', new_callable=PropertyMock, return_value='http://node:3000'):
+        engine = XYMEngine(account0)
+    # without an unlocked session, the keys of a one-off session are wiped after the call
+    with engine.signing_session('') as session:
+        assert session.is_active()
+    assert not session.is_active()
+    unlocked = engine.unlock('', idle_timeout=None)
+    with engine.signing_session('') as session:
+        assert session is unlocked
+    assert unlocked.is_active()
+    engine.lock()
+    assert not unlocked.is_active()
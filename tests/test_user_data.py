@@ -1,10 +1,11 @@
 import os
 import tempfile
+from unittest.mock import patch
 
 import bcrypt
 import pytest
 from nempy.sym.network import NetworkType
-from nempy.user_data import AccountData, DecoderStatus, ProfileData
+from nempy.user_data import AccountData, DecoderStatus, ProfileData, SigningSession
 
 
 class TestAccountData:
@@ -75,6 +76,47 @@ class TestAccountData:
             self.account_data.decrypt(self.password)
 
 
+class TestSigningSession:
+
+    def setup(self):
+        self.password = 'pass'
+        self.account_data, _ = TestAccountData().setup()
+        self.private_key = self.account_data.private_key
+        self.account_data.encrypt(self.password)
+
+    def test_unlock(self):
+        with patch.object(AccountData, 'decrypt', wraps=self.account_data.decrypt) as mock:
+            session = SigningSession(self.account_data, self.password)
+            for _ in range(3):
+                assert session.private_key == self.private_key
+                assert str(session.key_pair.public_key) == self.account_data.public_key
+        assert mock.call_count == 1
+        assert self.account_data.is_encrypted()
+        with pytest.raises(ValueError, match=DecoderStatus.WRONG_PASS.value):
+            SigningSession(self.account_data, self.password + 'random')
+        # a wrong password can also decrypt to bytes that are not a pickle
+        with patch('nempy.user_data.decryption', return_value=b'garbage'):
+            with pytest.raises(ValueError, match=DecoderStatus.WRONG_PASS.value):
+                SigningSession(self.account_data, self.password + 'random')
+
+    def test_idle_timeout(self):
+        with patch('time.monotonic', return_value=1000):
+            session = SigningSession(self.account_data, self.password, idle_timeout=10)
+        with patch('time.monotonic', return_value=1010):
+            assert session.key_pair is not None
+        with patch('time.monotonic', return_value=1021):
+            assert not session.is_active()
+            with pytest.raises(PermissionError):
+                session.key_pair
+
+    def test_wipe(self):
+        with SigningSession(self.account_data, self.password, idle_timeout=None) as session:
+            assert session.is_active()
+        assert not session.is_active()
+        with pytest.raises(PermissionError):
+            session.private_key
+
+
 class TestProfileData:
 
     def setup(self):